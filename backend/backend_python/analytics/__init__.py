@@ -23,11 +23,17 @@ from .screener import StockScreener
 from .technical_analysis import TechnicalAnalyzer
 from .ai_predictor import AIPredictor
 from .pattern_scanner import PatternScanner
+from .scan_session import ScanSession
+from .scan_panel import ScanPanel
+from .streaming_indicators import IndicatorState
 
 __all__ = [
     'MarketDataFetcher',
     'StockScreener', 
     'TechnicalAnalyzer',
     'AIPredictor',
-    'PatternScanner'
+    'PatternScanner',
+    'ScanSession',
+    'ScanPanel',
+    'IndicatorState'
 ] 
\ No newline at end of file
@@ -0,0 +1,312 @@
+"""
+Candlestick Engine
+==================
+
+Column-wise candlestick pattern detection:
+- Body, shadows and range computed once over the whole OHLC array
+- Pattern predicates evaluated as NumPy boolean masks
+- Shifted arrays for double and triple candle patterns
+- Emits the same pattern dicts as the per-row PatternScanner path
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Any
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bars of prior closes used for the hammer / shooting star trend context
+TREND_LOOKBACK = 5
+
+
+class CandlestickEngine:
+    """
+    Vectorized candlestick pattern detection over an OHLC DataFrame
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        self.index = data.index
+        self.open = data['Open'].to_numpy(dtype=float)
+        self.high = data['High'].to_numpy(dtype=float)
+        self.low = data['Low'].to_numpy(dtype=float)
+        self.close = data['Close'].to_numpy(dtype=float)
+
+        # Candle anatomy for every bar at once
+        self.body = np.abs(self.close - self.open)
+        self.total_range = self.high - self.low
+        self.upper_shadow = self.high - np.maximum(self.open, self.close)
+        self.lower_shadow = np.minimum(self.open, self.close) - self.low
+        self.bullish = self.close > self.open
+        self.bearish = self.close < self.open
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def single_candle_patterns(self) -> List[Dict[str, Any]]:
+        """Detect Doji, Hammer, Shooting Star and Spinning Top"""
+        body = self.body
+        total_range = self.total_range
+        upper_shadow = self.upper_shadow
+        lower_shadow = self.lower_shadow
+
+        trend = self._trend_context()
+        has_range = total_range != 0
+
+        doji = has_range & (body <= total_range * 0.05)
+        hammer = (has_range &
+                  (lower_shadow >= body * 2) &
+                  (upper_shadow <= body * 0.3) &
+                  self.bearish &
+                  (trend < -0.01))
+        shooting_star = (has_range &
+                         (upper_shadow >= body * 2) &
+                         (lower_shadow <= body * 0.3) &
+                         self.bearish &
+                         (trend > 0.01))
+        spinning_top = (has_range &
+                        (body <= total_range * 0.3) &
+                        (upper_shadow >= body * 0.5) &
+                        (lower_shadow >= body * 0.5))
+
+        # First matching pattern wins, same precedence as the per-row path
+        builders = [
+            (doji, self._doji),
+            (hammer, lambda i: self._hammer(i, trend[i])),
+            (shooting_star, lambda i: self._shooting_star(i, trend[i])),
+            (spinning_top, self._spinning_top),
+        ]
+        return self._emit(builders, len(self))
+
+    def double_candle_patterns(self) -> List[Dict[str, Any]]:
+        """Detect Engulfing, Piercing Pattern and Dark Cloud Cover"""
+        n = len(self)
+        if n < 2:
+            return []
+
+        p_open, c_open = self.open[:-1], self.open[1:]
+        p_close, c_close = self.close[:-1], self.close[1:]
+        p_high, p_low = self.high[:-1], self.low[:-1]
+        p_bear, c_bear = self.bearish[:-1], self.bearish[1:]
+        p_bull, c_bull = self.bullish[:-1], self.bullish[1:]
+        p_mid = (p_open + p_close) / 2
+
+        pad = np.zeros(1, dtype=bool)
+        bullish_engulfing = np.concatenate([pad, p_bear & c_bull & (c_open < p_close) & (c_close > p_open)])
+        bearish_engulfing = np.concatenate([pad, p_bull & c_bear & (c_open > p_close) & (c_close < p_open)])
+        piercing = np.concatenate([pad, p_bear & c_bull & (c_open < p_low) & (c_close > p_mid)])
+        dark_cloud = np.concatenate([pad, p_bull & c_bear & (c_open > p_high) & (c_close < p_mid)])
+
+        builders = [
+            (bullish_engulfing, lambda i: self._engulfing(i, True)),
+            (bearish_engulfing, lambda i: self._engulfing(i, False)),
+            (piercing, self._piercing),
+            (dark_cloud, self._dark_cloud),
+        ]
+        return self._emit(builders, n)
+
+    def triple_candle_patterns(self) -> List[Dict[str, Any]]:
+        """Detect Morning/Evening Star, Three White Soldiers and Three Black Crows"""
+        n = len(self)
+        if n < 3:
+            return []
+
+        o1, o2, o3 = self.open[:-2], self.open[1:-1], self.open[2:]
+        c1, c2, c3 = self.close[:-2], self.close[1:-1], self.close[2:]
+        b1, b2 = self.body[:-2], self.body[1:-1]
+        bull1, bull2, bull3 = self.bullish[:-2], self.bullish[1:-1], self.bullish[2:]
+        bear1, bear2, bear3 = self.bearish[:-2], self.bearish[1:-1], self.bearish[2:]
+        mid1 = (o1 + c1) / 2
+        small_middle = b2 < b1 * 0.3
+
+        pad = np.zeros(2, dtype=bool)
+        morning_star = np.concatenate([pad, bear1 & small_middle & bull3 & (c3 > mid1)])
+        evening_star = np.concatenate([pad, bull1 & small_middle & bear3 & (c3 < mid1)])
+        white_soldiers = np.concatenate([pad, bull1 & bull2 & bull3 &
+                                         (c2 > c1) & (c3 > c2) &
+                                         (o2 > o1) & (o3 > o2)])
+        black_crows = np.concatenate([pad, bear1 & bear2 & bear3 &
+                                      (c2 < c1) & (c3 < c2) &
+                                      (o2 < o1) & (o3 < o2)])
+
+        builders = [
+            (morning_star, lambda i: self._star(i, True)),
+            (evening_star, lambda i: self._star(i, False)),
+            (white_soldiers, self._three_white_soldiers),
+            (black_crows, self._three_black_crows),
+        ]
+        return self._emit(builders, n)
+
+    # Helper Methods
+    def _trend_context(self) -> np.ndarray:
+        """Linear regression slope of the previous TREND_LOOKBACK closes for every bar"""
+        n = len(self)
+        trend = np.full(n, np.nan)
+        if n <= TREND_LOOKBACK:
+            return trend
+
+        # Closed-form OLS slope with x = 0..k-1 is a fixed dot product per window
+        x = np.arange(TREND_LOOKBACK, dtype=float)
+        weights = (x - x.mean()) / ((x - x.mean()) ** 2).sum()
+        windows = np.lib.stride_tricks.sliding_window_view(self.close, TREND_LOOKBACK)
+        trend[TREND_LOOKBACK:] = (windows @ weights)[:n - TREND_LOOKBACK]
+        return trend
+
+    def _emit(self, builders: List[Any], n: int) -> List[Dict[str, Any]]:
+        """Resolve pattern precedence and build pattern dicts in date order"""
+        selected = np.full(n, -1)
+        for rank in range(len(builders) - 1, -1, -1):
+            selected[builders[rank][0]] = rank
+
+        patterns = []
+        for i in np.flatnonzero(selected >= 0):
+            pattern_info = builders[selected[i]][1](i)
+            patterns.append({
+                'pattern': pattern_info['name'],
+                'type': 'candlestick',
+                'date': self.index[i],
+                'strength': pattern_info['strength'],
+                'description': pattern_info['description'],
+                'bullish': pattern_info['bullish'],
+                'details': pattern_info['details']
+            })
+        return patterns
+
+    def _doji(self, i: int) -> Dict[str, Any]:
+        return {
+            'name': 'Doji',
+            'strength': 70,
+            'description': 'Indecision pattern with small body',
+            'bullish': None,
+            'details': {
+                'body_size': self.body[i],
+                'total_range': self.total_range[i],
+                'body_percentage': (self.body[i] / self.total_range[i]) * 100
+            }
+        }
+
+    def _hammer(self, i: int, trend: float) -> Dict[str, Any]:
+        return {
+            'name': 'Hammer',
+            'strength': 75,
+            'description': 'Bullish reversal pattern with long lower shadow',
+            'bullish': True,
+            'details': {
+                'lower_shadow_ratio': self.lower_shadow[i] / self.body[i],
+                'body_size': self.body[i],
+                'trend_context': trend
+            }
+        }
+
+    def _shooting_star(self, i: int, trend: float) -> Dict[str, Any]:
+        return {
+            'name': 'Shooting Star',
+            'strength': 75,
+            'description': 'Bearish reversal pattern with long upper shadow',
+            'bullish': False,
+            'details': {
+                'upper_shadow_ratio': self.upper_shadow[i] / self.body[i],
+                'body_size': self.body[i],
+                'trend_context': trend
+            }
+        }
+
+    def _spinning_top(self, i: int) -> Dict[str, Any]:
+        return {
+            'name': 'Spinning Top',
+            'strength': 60,
+            'description': 'Indecision pattern with small body and long shadows',
+            'bullish': None,
+            'details': {
+                'body_percentage': (self.body[i] / self.total_range[i]) * 100,
+                'upper_shadow': self.upper_shadow[i],
+                'lower_shadow': self.lower_shadow[i]
+            }
+        }
+
+    def _engulfing(self, i: int, bullish: bool) -> Dict[str, Any]:
+        if bullish:
+            name, description = 'Bullish Engulfing', 'Bullish reversal pattern engulfing previous bearish candle'
+        else:
+            name, description = 'Bearish Engulfing', 'Bearish reversal pattern engulfing previous bullish candle'
+        return {
+            'name': name,
+            'strength': 80,
+            'description': description,
+            'bullish': bullish,
+            'details': {
+                'prev_body': self.body[i-1],
+                'curr_body': self.body[i],
+                'engulfing_ratio': self.body[i] / self.body[i-1]
+            }
+        }
+
+    def _piercing(self, i: int) -> Dict[str, Any]:
+        return {
+            'name': 'Piercing Pattern',
+            'strength': 75,
+            'description': 'Bullish reversal pattern piercing into previous bearish candle',
+            'bullish': True,
+            'details': {
+                'gap_size': self.low[i-1] - self.open[i],
+                'penetration': self.close[i] - ((self.open[i-1] + self.close[i-1]) / 2)
+            }
+        }
+
+    def _dark_cloud(self, i: int) -> Dict[str, Any]:
+        return {
+            'name': 'Dark Cloud Cover',
+            'strength': 75,
+            'description': 'Bearish reversal pattern covering previous bullish candle',
+            'bullish': False,
+            'details': {
+                'gap_size': self.open[i] - self.high[i-1],
+                'penetration': ((self.open[i-1] + self.close[i-1]) / 2) - self.close[i]
+            }
+        }
+
+    def _star(self, i: int, bullish: bool) -> Dict[str, Any]:
+        if bullish:
+            name, description = 'Morning Star', 'Strong bullish reversal pattern with three candles'
+            reversal_strength = self.close[i] - self.close[i-2]
+        else:
+            name, description = 'Evening Star', 'Strong bearish reversal pattern with three candles'
+            reversal_strength = self.close[i-2] - self.close[i]
+        return {
+            'name': name,
+            'strength': 85,
+            'description': description,
+            'bullish': bullish,
+            'details': {
+                'first_candle_body': self.body[i-2],
+                'second_candle_body': self.body[i-1],
+                'third_candle_body': self.body[i],
+                'reversal_strength': reversal_strength
+            }
+        }
+
+    def _three_white_soldiers(self, i: int) -> Dict[str, Any]:
+        return {
+            'name': 'Three White Soldiers',
+            'strength': 90,
+            'description': 'Very strong bullish continuation pattern',
+            'bullish': True,
+            'details': {
+                'total_advance': self.close[i] - self.open[i-2],
+                'consistency': True,
+                'momentum': 'Strong'
+            }
+        }
+
+    def _three_black_crows(self, i: int) -> Dict[str, Any]:
+        return {
+            'name': 'Three Black Crows',
+            'strength': 90,
+            'description': 'Very strong bearish continuation pattern',
+            'bullish': False,
+            'details': {
+                'total_decline': self.open[i-2] - self.close[i],
+                'consistency': True,
+                'momentum': 'Strong'
+            }
+        }
@@ -18,28 +18,68 @@ Provides real-time and historical data for:
 
 import asyncio
 import aiohttp
+import threading
+import time
 import yfinance as yf
 import pandas as pd
 import numpy as np
 import os
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, List, Optional, Tuple, Union, Any
 from datetime import datetime, timedelta
 import logging
-from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache, LRUCache
 from alpha_vantage.timeseries import TimeSeries
 import finnhub
 from twelvedata import TDClient
 
+from .streaming_indicators import IndicatorState
+
 logger = logging.getLogger(__name__)
 
+# Calendar days covered by each Yahoo-style period string
+PERIOD_DAYS = {
+    '1d': 1, '5d': 5, '1mo': 30, '2mo': 60, '3mo': 90,
+    '6mo': 180, '1y': 365, '2y': 730, '5y': 1825, '10y': 3650
+}
+
+# Prior bars needed to recompute the rolling indicators (SMA_50 is the longest window)
+INDICATOR_LOOKBACK = 60
+
 class MarketDataFetcher:
     """
     Comprehensive market data fetcher supporting multiple APIs and exchanges
     """
     
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None, max_queue_depth: Optional[int] = None):
         self.cache = TTLCache(maxsize=1000, ttl=300)  # 5-minute cache
         
+        # Last known frame per cache key, kept past TTL expiry for incremental refresh
+        self.incremental_refresh = os.getenv("DATA_FETCHER_INCREMENTAL", "True").lower() == "true"
+        self._history = LRUCache(maxsize=1000)
+        self.refresh_stats = {'full': 0, 'incremental': 0, 'bars_appended': 0}
+        
+        # Streaming indicator state per (symbol, interval) for live ticks
+        self.indicator_states: Dict[Tuple[str, str], IndicatorState] = {}
+        
+        # Thread pool for the blocking SDK clients (yfinance, Alpha Vantage, Finnhub)
+        self.max_workers = max_workers or int(os.getenv("DATA_FETCHER_MAX_WORKERS", "16"))
+        self.max_queue_depth = max_queue_depth or int(os.getenv("DATA_FETCHER_MAX_QUEUE_DEPTH", "256"))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="market-data")
+        self._queue_slots = asyncio.Semaphore(self.max_queue_depth)
+        self._pool_lock = threading.Lock()
+        self._pool_stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'running': 0,
+            'in_flight': 0,
+            'peak_in_flight': 0,
+            'total_wait_seconds': 0.0,
+            'total_run_seconds': 0.0
+        }
+        
         # API configurations
         self.alpha_vantage_key = "3J52FQXN785RGJX0"  # Your provided API key
         self.finnhub_key = os.getenv("FINNHUB_API_KEY", None) 
@@ -50,6 +90,16 @@ class MarketDataFetcher:
         self.finnhub_client = finnhub.Client(api_key=self.finnhub_key) if self.finnhub_key else None
         self.td_client = TDClient(apikey=self.twelve_data_key) if self.twelve_data_key else None
         
+        # Bulk multi-ticker downloads for universe refreshes
+        self.bulk_chunk_size = int(os.getenv("DATA_FETCHER_BULK_CHUNK_SIZE", "100"))
+        self.bulk_threshold = 10  # get_multiple_stocks_data switches to bulk at this many symbols
+        
+        # Concurrent requests allowed per upstream provider
+        self.provider_limits = {'yahoo': 8, 'alpha_vantage': 1, 'finnhub': 5}
+        self._provider_semaphores = {
+            provider: asyncio.Semaphore(limit) for provider, limit in self.provider_limits.items()
+        }
+        
         # NSE symbol lists
         self.nse_symbols = self._load_nse_symbols()
         self.nifty_50 = self._load_nifty_50()
@@ -103,30 +153,42 @@ class MarketDataFetcher:
         if cache_key in self.cache:
             return self.cache[cache_key]
         
+        # Only fetch bars newer than the last known frame
+        if self.incremental_refresh and cache_key in self._history:
+            data = await self._refresh_incremental(symbol, period, interval, self._history[cache_key])
+            if data is not None:
+                self._cache_frame(cache_key, data)
+                return data
+        
         try:
+            self.refresh_stats['full'] += 1
+            
             # Primary: Yahoo Finance
-            data = await self._fetch_yahoo_data(symbol, period, interval)
+            async with self._provider_semaphores['yahoo']:
+                data = await self._fetch_yahoo_data(symbol, period, interval)
             
             if data is not None and not data.empty:
                 # Add technical indicators
                 data = self._add_basic_indicators(data)
-                self.cache[cache_key] = data
+                self._cache_frame(cache_key, data)
                 return data
             
             # Fallback: Alpha Vantage
             if self.alpha_vantage_key:
-                data = await self._fetch_alpha_vantage_data(symbol, interval)
+                async with self._provider_semaphores['alpha_vantage']:
+                    data = await self._fetch_alpha_vantage_data(symbol, interval)
                 if data is not None and not data.empty:
                     data = self._add_basic_indicators(data)
-                    self.cache[cache_key] = data
+                    self._cache_frame(cache_key, data)
                     return data
             
             # Fallback: Finnhub
             if self.finnhub_client:
-                data = await self._fetch_finnhub_data(symbol, period)
+                async with self._provider_semaphores['finnhub']:
+                    data = await self._fetch_finnhub_data(symbol, period)
                 if data is not None and not data.empty:
                     data = self._add_basic_indicators(data)
-                    self.cache[cache_key] = data
+                    self._cache_frame(cache_key, data)
                     return data
                     
         except Exception as e:
@@ -134,13 +196,80 @@ class MarketDataFetcher:
             
         return None
     
+    def _cache_frame(self, cache_key: str, data: pd.DataFrame):
+        """Cache a frame and keep it as the base for the next incremental refresh"""
+        self.cache[cache_key] = data
+        self._history[cache_key] = data
+    
+    async def _refresh_incremental(self, symbol: str, period: str, interval: str,
+                                   previous: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        Extend the last known frame with bars newer than its last timestamp
+        
+        The last stored bar is re-fetched as well since it may have been partial.
+        Returns None when the frame cannot be extended, so the caller falls back
+        to a full download.
+        """
+        if previous is None or previous.empty or not isinstance(previous.index, pd.DatetimeIndex):
+            return None
+        if len(previous) < INDICATOR_LOOKBACK:
+            # Too short to seed the rolling windows; skip the extra request
+            return None
+        
+        new_bars = await self._fetch_yahoo_since(symbol, previous.index[-1], interval)
+        if new_bars is None:
+            return None
+        
+        new_bars = new_bars[new_bars.index >= previous.index[-1]]
+        if new_bars.empty:
+            # Market closed since the last refresh - nothing newer upstream
+            return previous
+        
+        kept = previous[previous.index < new_bars.index[0]]
+        if len(kept) < INDICATOR_LOOKBACK:
+            return None
+        
+        data = pd.concat([kept, new_bars])
+        data = self._extend_indicators(data, len(new_bars))
+        
+        # Drop bars that fell out of the requested period
+        days = PERIOD_DAYS.get(period)
+        if days is not None:
+            data = data[data.index > data.index[-1] - timedelta(days=days)]
+        
+        self.refresh_stats['incremental'] += 1
+        self.refresh_stats['bars_appended'] += len(new_bars)
+        return data
+    
+    async def _fetch_yahoo_since(self, symbol: str, start: pd.Timestamp,
+                                 interval: str) -> Optional[pd.DataFrame]:
+        """Fetch Yahoo bars from `start` onwards (empty frame when there are none)"""
+        try:
+            async with self._provider_semaphores['yahoo']:
+                data = await self._run_blocking(
+                    lambda: yf.Ticker(symbol).history(start=start.to_pydatetime(), interval=interval,
+                                                      prepost=True, repair=True)
+                )
+            
+            if data.empty:
+                return data
+            
+            data = data[['Open', 'High', 'Low', 'Close', 'Volume']]
+            data.index.name = 'Datetime'
+            return data
+            
+        except Exception as e:
+            logger.error(f"Yahoo Finance incremental error for {symbol}: {e}")
+            return None
+    
     async def _fetch_yahoo_data(self, symbol: str, period: str, 
                                interval: str) -> Optional[pd.DataFrame]:
         """Fetch data from Yahoo Finance"""
         try:
-            ticker = yf.Ticker(symbol)
-            data = ticker.history(period=period, interval=interval, 
-                                prepost=True, repair=True)
+            data = await self._run_blocking(
+                lambda: yf.Ticker(symbol).history(period=period, interval=interval,
+                                                  prepost=True, repair=True)
+            )
             
             if data.empty:
                 return None
@@ -163,11 +292,13 @@ class MarketDataFetcher:
             clean_symbol = symbol.replace('.NS', '').replace('.BO', '')
             
             if interval in ['1m', '5m', '15m', '30m']:
-                data, _ = self.av_client.get_intraday(
+                data, _ = await self._run_blocking(
+                    self.av_client.get_intraday,
                     symbol=clean_symbol, interval=interval, outputsize='full'
                 )
             else:
-                data, _ = self.av_client.get_daily_adjusted(
+                data, _ = await self._run_blocking(
+                    self.av_client.get_daily_adjusted,
                     symbol=clean_symbol, outputsize='full'
                 )
             
@@ -200,7 +331,8 @@ class MarketDataFetcher:
             start_date = end_date - timedelta(days=days)
             
             # Fetch data
-            result = self.finnhub_client.stock_candles(
+            result = await self._run_blocking(
+                self.finnhub_client.stock_candles,
                 clean_symbol, 'D', 
                 int(start_date.timestamp()), 
                 int(end_date.timestamp())
@@ -228,6 +360,64 @@ class MarketDataFetcher:
             logger.error(f"Finnhub error for {symbol}: {e}")
             return None
     
+    async def _run_blocking(self, func, *args, **kwargs):
+        """
+        Run a blocking SDK call on the fetcher's thread pool
+        
+        At most max_queue_depth calls may be submitted at once; further
+        callers wait on the event loop instead of piling onto the pool queue.
+        """
+        async with self._queue_slots:
+            submitted_at = time.perf_counter()
+            with self._pool_lock:
+                self._pool_stats['submitted'] += 1
+                self._pool_stats['in_flight'] += 1
+                self._pool_stats['peak_in_flight'] = max(self._pool_stats['peak_in_flight'],
+                                                         self._pool_stats['in_flight'])
+            
+            def run():
+                started_at = time.perf_counter()
+                with self._pool_lock:
+                    self._pool_stats['running'] += 1
+                    self._pool_stats['total_wait_seconds'] += started_at - submitted_at
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    with self._pool_lock:
+                        self._pool_stats['running'] -= 1
+                        self._pool_stats['total_run_seconds'] += time.perf_counter() - started_at
+            
+            loop = asyncio.get_running_loop()
+            outcome = 'failed'
+            try:
+                result = await loop.run_in_executor(self._executor, run)
+                outcome = 'completed'
+                return result
+            finally:
+                with self._pool_lock:
+                    self._pool_stats['in_flight'] -= 1
+                    self._pool_stats[outcome] += 1
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get thread pool settings and utilisation metrics"""
+        with self._pool_lock:
+            stats = dict(self._pool_stats)
+        
+        finished = stats['completed'] + stats['failed']
+        return {
+            'max_workers': self.max_workers,
+            'max_queue_depth': self.max_queue_depth,
+            'queue_depth': stats['in_flight'] - stats['running'],
+            **stats,
+            'avg_wait_ms': round(stats['total_wait_seconds'] / stats['submitted'] * 1000, 2) if stats['submitted'] else 0.0,
+            'avg_run_ms': round(stats['total_run_seconds'] / finished * 1000, 2) if finished else 0.0
+        }
+    
+    def _fetch_yahoo_snapshot(self, symbol: str):
+        """Blocking Yahoo info + 2-day history used by get_quote"""
+        ticker = yf.Ticker(symbol)
+        return ticker.info, ticker.history(period="2d", interval="1d")
+    
     def _add_basic_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
         """Add basic technical indicators to the data"""
         try:
@@ -265,12 +455,99 @@ class MarketDataFetcher:
             logger.error(f"Error adding indicators: {e}")
             return data
     
+    def _extend_indicators(self, data: pd.DataFrame, new_bars: int) -> pd.DataFrame:
+        """
+        Fill indicator columns for the last `new_bars` rows only
+        
+        Rolling indicators are recomputed over just the bars their windows need;
+        EMAs continue from the previous row's value instead of restarting.
+        """
+        try:
+            start = len(data) - new_bars
+            
+            # Rolling windows (SMA/RSI/BB/volume) need at most INDICATOR_LOOKBACK prior bars
+            context = data[['Close', 'Volume']].iloc[max(0, start - INDICATOR_LOOKBACK):].copy()
+            tail = self._add_basic_indicators(context).iloc[-new_bars:]
+            for column in ('SMA_20', 'SMA_50', 'RSI', 'BB_Middle', 'BB_Upper', 'BB_Lower',
+                           'Volume_SMA', 'Volume_Ratio'):
+                data.iloc[start:, data.columns.get_loc(column)] = tail[column].to_numpy()
+            
+            closes = data['Close'].to_numpy(dtype=float)
+            for column, span in (('EMA_12', 12), ('EMA_26', 26)):
+                data.iloc[start:, data.columns.get_loc(column)] = self._continue_ewm(
+                    closes[start:], data[column].iloc[start - 1], start, span
+                )
+            
+            macd = data['EMA_12'].to_numpy(dtype=float) - data['EMA_26'].to_numpy(dtype=float)
+            data.iloc[start:, data.columns.get_loc('MACD')] = macd[start:]
+            data.iloc[start:, data.columns.get_loc('MACD_Signal')] = self._continue_ewm(
+                macd[start:], data['MACD_Signal'].iloc[start - 1], start, 9
+            )
+            data['MACD_Histogram'] = data['MACD'] - data['MACD_Signal']
+            
+            return data
+            
+        except Exception as e:
+            logger.error(f"Error extending indicators, recomputing: {e}")
+            return self._add_basic_indicators(data)
+    
+    @staticmethod
+    def _continue_ewm(values: np.ndarray, previous: float, observed: int, span: int) -> np.ndarray:
+        """
+        Continue pandas' ewm(span).mean() (adjust=True) from its last value
+        
+        `observed` is the number of rows behind `previous`; it sets the weight the
+        previous average carries, so the result matches a full recompute.
+        """
+        decay = 1 - 2 / (span + 1)
+        weight = (1 - decay ** observed) / (1 - decay) if not np.isnan(previous) else 0.0
+        
+        result = np.empty(len(values))
+        for i, value in enumerate(values):
+            if np.isnan(value):
+                weight *= decay
+            else:
+                carried = decay * weight
+                previous = value if carried == 0 else (value + carried * previous) / (carried + 1)
+                weight = carried + 1
+            result[i] = previous
+        return result
+    
+    async def get_indicator_state(self, symbol: str, period: str = "3mo",
+                                  interval: str = "1d") -> Optional[IndicatorState]:
+        """
+        Get the streaming indicator state for a symbol, rehydrating it on first use
+        
+        Live ticks go through state.update(close, volume, new_bar) in O(1)
+        instead of re-running _add_basic_indicators over the whole frame.
+        """
+        key = (symbol, interval)
+        if key not in self.indicator_states:
+            data = await self.get_stock_data(symbol, period, interval)
+            if data is None or data.empty:
+                return None
+            self.indicator_states[key] = IndicatorState.from_frame(data, symbol, interval)
+        
+        return self.indicator_states[key]
+    
     async def get_multiple_stocks_data(self, symbols: List[str], 
                                      period: str = "1d", 
-                                     interval: str = "1d") -> Dict[str, pd.DataFrame]:
+                                     interval: str = "1d",
+                                     bulk: Optional[bool] = None) -> Dict[str, pd.DataFrame]:
         """
         Fetch data for multiple stocks concurrently
+        
+        Args:
+            symbols: Stock symbols
+            period: Time period
+            interval: Data interval
+            bulk: Use chunked multi-ticker downloads (None to decide by universe size)
         """
+        if bulk is None:
+            bulk = len(symbols) >= self.bulk_threshold
+        if bulk:
+            return await self.get_bulk_stocks_data(symbols, period, interval)
+        
         tasks = []
         for symbol in symbols:
             task = self.get_stock_data(symbol, period, interval)
@@ -287,6 +564,83 @@ class MarketDataFetcher:
         
         return stock_data
     
+    async def get_bulk_stocks_data(self, symbols: List[str],
+                                   period: str = "1d",
+                                   interval: str = "1d") -> Dict[str, pd.DataFrame]:
+        """
+        Fetch many symbols with one Yahoo download per chunk of tickers
+        
+        Each symbol's frame gets indicators and its own cache entry, exactly as
+        get_stock_data would store it. Symbols missing from the bulk response
+        fall back to the per-symbol path.
+        """
+        stock_data = {}
+        missing = []
+        for symbol in dict.fromkeys(symbols):
+            cache_key = f"{symbol}_{period}_{interval}"
+            if cache_key in self.cache:
+                stock_data[symbol] = self.cache[cache_key]
+            else:
+                missing.append(symbol)
+        
+        chunks = [missing[i:i + self.bulk_chunk_size]
+                  for i in range(0, len(missing), self.bulk_chunk_size)]
+        chunk_results = await asyncio.gather(
+            *(self._fetch_yahoo_bulk(chunk, period, interval) for chunk in chunks),
+            return_exceptions=True
+        )
+        
+        for frames in chunk_results:
+            if isinstance(frames, Exception):
+                logger.error(f"Yahoo bulk download failed: {frames}")
+                continue
+            for symbol, data in frames.items():
+                data = self._add_basic_indicators(data)
+                self._cache_frame(f"{symbol}_{period}_{interval}", data)
+                stock_data[symbol] = data
+        
+        leftovers = [symbol for symbol in missing if symbol not in stock_data]
+        if leftovers:
+            logger.info(f"Bulk download missed {len(leftovers)} symbols, fetching individually")
+            stock_data.update(await self.get_multiple_stocks_data(leftovers, period, interval, bulk=False))
+        
+        logger.info(f"Bulk refresh: {len(missing)} symbols in {len(chunks)} requests, "
+                    f"{len(stock_data)}/{len(dict.fromkeys(symbols))} available")
+        return {symbol: stock_data[symbol] for symbol in dict.fromkeys(symbols) if symbol in stock_data}
+    
+    async def _fetch_yahoo_bulk(self, symbols: List[str], period: str,
+                                interval: str) -> Dict[str, pd.DataFrame]:
+        """Download a chunk of tickers in one Yahoo request and split per symbol"""
+        async with self._provider_semaphores['yahoo']:
+            raw = await self._run_blocking(
+                yf.download, tickers=symbols, period=period, interval=interval,
+                group_by='ticker', auto_adjust=True, prepost=True, repair=True,
+                threads=False, progress=False
+            )
+        
+        frames = {}
+        if raw is None or raw.empty:
+            return frames
+        
+        for symbol in symbols:
+            if isinstance(raw.columns, pd.MultiIndex):
+                if symbol not in raw.columns.get_level_values(0):
+                    continue
+                data = raw[symbol]
+            elif len(symbols) == 1:
+                data = raw
+            else:
+                continue
+            
+            # Standardize columns and drop dates where this ticker did not trade
+            data = data[['Open', 'High', 'Low', 'Close', 'Volume']].dropna(how='all').copy()
+            if data.empty:
+                continue
+            data.index.name = 'Datetime'
+            frames[symbol] = data
+        
+        return frames
+    
     async def get_nifty_data(self, period: str = "1d", 
                            interval: str = "1d") -> Optional[pd.DataFrame]:
         """Get Nifty 50 index data"""
@@ -327,11 +681,8 @@ class MarketDataFetcher:
     async def get_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
         """Get real-time quote for a symbol - Yahoo Finance (unlimited free)"""
         try:
-            ticker = yf.Ticker(symbol)
-            
             # Get current info and recent history for accurate data
-            info = ticker.info
-            hist = ticker.history(period="2d", interval="1d")
+            info, hist = await self._run_blocking(self._fetch_yahoo_snapshot, symbol)
             
             if not hist.empty:
                 current_price = hist['Close'].iloc[-1]
@@ -461,8 +812,7 @@ class MarketDataFetcher:
                         quote = await self.get_quote(symbol)
                         if quote:
                             # Get additional data
-                            ticker = yf.Ticker(symbol)
-                            info = ticker.info
+                            info = await self._run_blocking(lambda: yf.Ticker(symbol).info)
                             stock_data = {
                                 "symbol": symbol,
                                 "name": info.get("longName", symbol),
@@ -18,8 +18,30 @@ from datetime import datetime
 from scipy.signal import argrelextrema
 from scipy.stats import linregress
 
+from .candlestick_engine import CandlestickEngine
+
 logger = logging.getLogger(__name__)
 
+def _sliding_extreme(values: np.ndarray, size: int, mode: str = 'max') -> np.ndarray:
+    """
+    Max or min of every length-`size` window in O(n) (van Herk / Gil-Werman).
+    
+    Block-wise prefix and suffix extremes are combined so each window costs one
+    comparison regardless of its size. NaNs propagate to every window containing them.
+    """
+    op = np.maximum if mode == 'max' else np.minimum
+    fill = -np.inf if mode == 'max' else np.inf
+    n = len(values)
+    
+    blocks_count = -(-n // size)
+    padded = np.full(blocks_count * size, fill)
+    padded[:n] = values
+    blocks = padded.reshape(blocks_count, size)
+    
+    prefix = op.accumulate(blocks, axis=1).ravel()
+    suffix = op.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    return op(suffix[:n - size + 1], prefix[size - 1:n])
+
 class PatternScanner:
     """
     Advanced pattern detection and analysis
@@ -29,6 +51,7 @@ class PatternScanner:
         self.min_pattern_length = 5
         self.max_pattern_length = 50
         self.tolerance = 0.02  # 2% tolerance for pattern matching
+        self.vectorized_candles = True  # Column-wise candlestick engine instead of per-row scan
         
     def scan_all_patterns(self, data: pd.DataFrame, symbol: str) -> Dict[str, Any]:
         """
@@ -565,6 +588,9 @@ class PatternScanner:
         patterns = []
         
         try:
+            if self.vectorized_candles:
+                return CandlestickEngine(data).single_candle_patterns()
+            
             for i in range(len(data)):
                 candle = data.iloc[i]
                 pattern_info = self._analyze_single_candle(candle, i, data)
@@ -590,6 +616,9 @@ class PatternScanner:
         patterns = []
         
         try:
+            if self.vectorized_candles:
+                return CandlestickEngine(data).double_candle_patterns()
+            
             for i in range(1, len(data)):
                 prev_candle = data.iloc[i-1]
                 curr_candle = data.iloc[i]
@@ -617,6 +646,9 @@ class PatternScanner:
         patterns = []
         
         try:
+            if self.vectorized_candles:
+                return CandlestickEngine(data).triple_candle_patterns()
+            
             for i in range(2, len(data)):
                 candle1 = data.iloc[i-2]
                 candle2 = data.iloc[i-1]
@@ -920,24 +952,33 @@ class PatternScanner:
             logger.error(f"Error summarizing patterns: {e}")
             return {}
     
-    # Placeholder methods for complex calculations
+    # Pivot detection
+    def _find_pivots(self, data: pd.Series, kind: str = 'high', window: int = 5) -> List[Dict[str, Any]]:
+        """
+        Find pivot highs or lows: bars at least as extreme as `window` bars on each side
+        
+        One O(n) sliding-window pass per call, whatever the window size.
+        """
+        raw = data.to_numpy()
+        values = raw.astype(float)
+        n = len(values)
+        if n < 2 * window + 1:
+            return []
+        
+        # Window extreme over [i-window, i+window] for every candidate centre i
+        extreme = _sliding_extreme(values, 2 * window + 1, 'max' if kind == 'high' else 'min')
+        centre = values[window:n - window]
+        is_pivot = centre >= extreme if kind == 'high' else centre <= extreme
+        
+        return [{'index': int(i), 'value': raw[i]} for i in np.flatnonzero(is_pivot) + window]
+    
     def _find_pivot_highs(self, data: pd.Series, window: int = 5) -> List[Dict[str, Any]]:
         """Find pivot high points"""
-        # Simplified implementation
-        pivots = []
-        for i in range(window, len(data) - window):
-            if all(data.iloc[i] >= data.iloc[j] for j in range(i-window, i+window+1) if j != i):
-                pivots.append({'index': i, 'value': data.iloc[i]})
-        return pivots
+        return self._find_pivots(data, 'high', window)
     
     def _find_pivot_lows(self, data: pd.Series, window: int = 5) -> List[Dict[str, Any]]:
         """Find pivot low points"""
-        # Simplified implementation
-        pivots = []
-        for i in range(window, len(data) - window):
-            if all(data.iloc[i] <= data.iloc[j] for j in range(i-window, i+window+1) if j != i):
-                pivots.append({'index': i, 'value': data.iloc[i]})
-        return pivots
+        return self._find_pivots(data, 'low', window)
     
     def _calculate_trend(self, data: pd.Series) -> float:
         """Calculate trend slope"""
@@ -0,0 +1,103 @@
+"""
+Scan Panel
+==========
+
+Universe-wide OHLCV and indicator arrays for cross-sectional screening:
+- One 2-D array (bars x symbols) per column
+- Bars right-aligned so row -1 is every symbol's latest bar
+- Per-symbol bar counts for each scan period
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional
+import logging
+
+from .data_fetcher import PERIOD_DAYS
+from .scan_session import ScanSession
+
+logger = logging.getLogger(__name__)
+
+# Padding timestamp for symbols with shorter history than the panel
+_NO_BAR = np.iinfo(np.int64).min
+
+class ScanPanel:
+    """
+    Aligned bars x symbols arrays built from per-symbol frames
+    """
+
+    FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume',
+              'SMA_20', 'SMA_50', 'RSI', 'Volume_SMA', 'Volume_Ratio')
+
+    def __init__(self, frames: Dict[str, pd.DataFrame], period: Optional[str] = None):
+        """
+        Args:
+            frames: Indicator-enriched frames keyed by symbol
+            period: Period the frames were fetched with (bounds period trimming)
+        """
+        self.symbols = [s for s, f in frames.items() if f is not None and not f.empty]
+        self.period = period
+
+        lengths = np.array([len(frames[s]) for s in self.symbols], dtype=int)
+        self.depth = int(lengths.max()) if len(lengths) else 0
+        self.lengths = lengths
+
+        width = len(self.symbols)
+        block = np.full((len(self.FIELDS), self.depth, width), np.nan)
+        self.timestamps = np.full((self.depth, width), _NO_BAR, dtype=np.int64)
+
+        for j, symbol in enumerate(self.symbols):
+            frame = frames[symbol]
+            start = self.depth - len(frame)
+            # One copy per symbol; missing indicator columns stay NaN
+            values = frame.reindex(columns=self.FIELDS).to_numpy(dtype=float)
+            block[:, start:, j] = values.T
+            if isinstance(frame.index, pd.DatetimeIndex):
+                self.timestamps[start:, j] = frame.index.asi8
+
+        self.arrays = {field: block[k] for k, field in enumerate(self.FIELDS)}
+
+        self._period_lengths: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_session(cls, session: ScanSession,
+                     symbols: Optional[List[str]] = None) -> 'ScanPanel':
+        """Build a panel from the frames held by a scan session"""
+        frames = session.frames
+        if symbols is not None:
+            frames = {s: frames[s] for s in symbols if s in frames}
+        return cls(frames, period=session.period)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def field(self, name: str) -> np.ndarray:
+        """Full bars x symbols array for a column"""
+        return self.arrays[name]
+
+    def last(self, name: str, bars_back: int = 1) -> np.ndarray:
+        """Value of a column `bars_back` bars before the end, for every symbol"""
+        if self.depth < bars_back:
+            return np.full(len(self), np.nan)
+        return self.arrays[name][-bars_back]
+
+    def bars_in_period(self, period: str) -> np.ndarray:
+        """
+        Number of bars each symbol has within `period` of its latest bar,
+        matching what ScanSession hands a per-symbol scan
+        """
+        if period in self._period_lengths:
+            return self._period_lengths[period]
+
+        days = PERIOD_DAYS.get(period)
+        if days is None or days >= PERIOD_DAYS.get(self.period, 0) or self.depth == 0:
+            counts = self.lengths
+        else:
+            # Symbols without a datetime index cannot be trimmed by date
+            dated = self.timestamps[-1] != _NO_BAR
+            latest = np.where(dated, self.timestamps[-1], 0)
+            cutoff = latest - int(pd.Timedelta(days=days).value)
+            counts = np.where(dated, (self.timestamps > cutoff).sum(axis=0), self.lengths)
+
+        self._period_lengths[period] = counts
+        return counts
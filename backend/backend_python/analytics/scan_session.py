@@ -0,0 +1,109 @@
+"""
+Scan Session
+============
+
+Shared per-symbol OHLCV data for a screening run:
+- Prefetches the universe once with bounded concurrency
+- Holds the indicator-enriched frames for the life of the session
+- Hands every scan a frame trimmed to the period it asks for
+"""
+
+import asyncio
+import pandas as pd
+from typing import Dict, List, Optional, Set, Any
+from datetime import timedelta
+import logging
+
+from .data_fetcher import MarketDataFetcher, PERIOD_DAYS
+
+logger = logging.getLogger(__name__)
+
+class ScanSession:
+    """
+    One fetch per symbol shared by every scan in a screening run
+    """
+
+    def __init__(self, data_fetcher: MarketDataFetcher, period: str = "6mo",
+                 interval: str = "1d", max_concurrency: int = 10):
+        self.data_fetcher = data_fetcher
+        self.period = period  # Longest period any scan in the session needs
+        self.interval = interval
+        self.max_concurrency = max_concurrency
+
+        self.frames: Dict[str, pd.DataFrame] = {}
+        self.failed: Set[str] = set()
+        self.fetch_count = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def prefetch(self, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch every symbol not already held by the session
+
+        Args:
+            symbols: Symbols to load
+
+        Returns:
+            Frames held by the session, keyed by symbol
+        """
+        pending = [s for s in dict.fromkeys(symbols)
+                   if s not in self.frames and s not in self.failed]
+        if pending:
+            await asyncio.gather(*(self._fetch(symbol) for symbol in pending))
+            logger.info(f"Scan session loaded {len(pending) - len(self.failed & set(pending))}/{len(pending)} symbols")
+        return self.frames
+
+    async def get(self, symbol: str, period: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """
+        Get the session frame for a symbol, trimmed to the requested period
+
+        Args:
+            symbol: Stock symbol
+            period: Period the scan would have requested (None for the full frame)
+        """
+        if symbol not in self.frames and symbol not in self.failed:
+            await self._fetch(symbol)
+
+        data = self.frames.get(symbol)
+        if data is None:
+            return None
+        return self._trim(data, period)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get session statistics"""
+        return {
+            'period': self.period,
+            'interval': self.interval,
+            'symbols_loaded': len(self.frames),
+            'symbols_failed': len(self.failed),
+            'fetch_count': self.fetch_count,
+            'max_concurrency': self.max_concurrency
+        }
+
+    async def _fetch(self, symbol: str):
+        """Fetch a single symbol under the session's concurrency limit"""
+        async with self._semaphore:
+            # Another waiter may have loaded it while we queued
+            if symbol in self.frames or symbol in self.failed:
+                return
+            self.fetch_count += 1
+            try:
+                data = await self.data_fetcher.get_stock_data(
+                    symbol, period=self.period, interval=self.interval
+                )
+            except Exception as e:
+                logger.error(f"Scan session fetch failed for {symbol}: {e}")
+                data = None
+
+        if data is None or data.empty:
+            self.failed.add(symbol)
+        else:
+            self.frames[symbol] = data
+
+    def _trim(self, data: pd.DataFrame, period: Optional[str]) -> pd.DataFrame:
+        """Keep only the bars a fetch for `period` would have returned"""
+        days = PERIOD_DAYS.get(period) if period else None
+        if days is None or days >= PERIOD_DAYS.get(self.period, 0):
+            return data
+
+        cutoff = data.index[-1] - timedelta(days=days)
+        return data[data.index > cutoff]
@@ -52,16 +52,20 @@ ADVANCED STRATEGIES:
 """
 
 import asyncio
+import time
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime, timedelta
 import logging
+import warnings
 from dataclasses import dataclass
 from enum import Enum
 
 from .data_fetcher import MarketDataFetcher
 from .technical_analysis import TechnicalAnalyzer
+from .scan_session import ScanSession
+from .scan_panel import ScanPanel
 
 logger = logging.getLogger(__name__)
 
@@ -142,9 +146,17 @@ class StockScreener:
         self.max_price = 50000.0  # Maximum stock price
         self.lookback_days = 252  # 1 year lookback
         
+        # Shared data sessions
+        self.session_period = "6mo"       # Longest period any built-in scan needs
+        self.max_concurrent_fetches = 10  # Parallel fetches per scan or session prefetch
+        
+        # Wall time per scan type
+        self.scan_metrics: Dict[str, Dict[str, Any]] = {}
+        
     async def run_scan(self, scan_type: ScanType, 
                       symbols: Optional[List[str]] = None,
-                      exchange: str = "NSE") -> List[ScanResult]:
+                      exchange: str = "NSE",
+                      session: Optional[ScanSession] = None) -> List[ScanResult]:
         """
         Run a specific scan on given symbols or all symbols
         
@@ -152,6 +164,7 @@ class StockScreener:
             scan_type: Type of scan to run
             symbols: List of symbols to scan (None for all)
             exchange: Exchange to scan (NSE, NIFTY50, etc.)
+            session: Shared data session (None to fetch per scan)
         
         Returns:
             List of scan results sorted by signal strength
@@ -169,7 +182,9 @@ class StockScreener:
             return []
         
         # Execute scan
-        results = await scan_method(symbols)
+        start_time = time.perf_counter()
+        results = await scan_method(symbols, session)
+        self._record_scan_time(scan_type, time.perf_counter() - start_time, len(symbols))
         
         # Filter and sort results
         filtered_results = self._filter_results(results)
@@ -221,6 +236,97 @@ class StockScreener:
         
         return scan_methods.get(scan_type)
     
+    async def create_session(self, symbols: Optional[List[str]] = None,
+                             exchange: str = "NSE") -> ScanSession:
+        """
+        Create a data session and prefetch the universe once
+        
+        Args:
+            symbols: List of symbols to load (None for all)
+            exchange: Exchange to load (NSE, NIFTY50, etc.)
+        
+        Returns:
+            ScanSession holding the enriched frames
+        """
+        if symbols is None:
+            symbols = self.data_fetcher.get_available_symbols(exchange)
+        
+        session = ScanSession(self.data_fetcher, period=self.session_period,
+                              max_concurrency=self.max_concurrent_fetches)
+        await session.prefetch(symbols)
+        return session
+    
+    async def _get_scan_data(self, symbol: str, period: str,
+                             session: Optional[ScanSession] = None) -> Optional[pd.DataFrame]:
+        """Get daily data for a scan from the session, or fetch it directly"""
+        if session is not None:
+            return await session.get(symbol, period)
+        
+        return await self.data_fetcher.get_stock_data(
+            symbol, period=period, interval="1d"
+        )
+    
+    async def _stream_scan_data(self, symbols: List[str], period: str,
+                                session: Optional[ScanSession] = None):
+        """
+        Yield (symbol, data) pairs as fetches complete
+        
+        At most max_concurrent_fetches requests are in flight; provider limits
+        are enforced by the data fetcher. With a session, resident frames are
+        yielded in symbol order.
+        """
+        if session is not None:
+            await session.prefetch(symbols)
+            for symbol in symbols:
+                yield symbol, await session.get(symbol, period)
+            return
+        
+        semaphore = asyncio.Semaphore(self.max_concurrent_fetches)
+        
+        async def fetch(symbol: str):
+            async with semaphore:
+                try:
+                    return symbol, await self._get_scan_data(symbol, period)
+                except Exception as e:
+                    logger.error(f"Error fetching {symbol} for scan: {e}")
+                    return symbol, None
+        
+        tasks = [asyncio.ensure_future(fetch(symbol)) for symbol in symbols]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            # Scan stopped early - drop fetches still queued
+            for task in tasks:
+                task.cancel()
+    
+    def _record_scan_time(self, scan_type: ScanType, elapsed: float, symbol_count: int):
+        """Record wall time for a scan run"""
+        metric = self.scan_metrics.setdefault(scan_type.value, {
+            'runs': 0,
+            'total_seconds': 0.0,
+            'last_seconds': 0.0,
+            'max_seconds': 0.0,
+            'last_symbol_count': 0
+        })
+        metric['runs'] += 1
+        metric['total_seconds'] += elapsed
+        metric['last_seconds'] = elapsed
+        metric['max_seconds'] = max(metric['max_seconds'], elapsed)
+        metric['last_symbol_count'] = symbol_count
+        
+        logger.info(f"{scan_type.value} scan took {elapsed:.2f}s for {symbol_count} symbols")
+    
+    def get_scan_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Get wall time metrics per scan type"""
+        return {
+            code: {
+                **metric,
+                'avg_seconds': metric['total_seconds'] / metric['runs'] if metric['runs'] else 0.0
+            }
+            for code, metric in self.scan_metrics.items()
+        }
+    
     def _filter_results(self, results: List[ScanResult]) -> List[ScanResult]:
         """Filter results based on minimum criteria"""
         filtered = []
@@ -235,16 +341,12 @@ class StockScreener:
         return filtered
     
     # MOMENTUM SCANS
-    async def _scan_breakout(self, symbols: List[str]) -> List[ScanResult]:
+    async def _scan_breakout(self, symbols: List[str], session: Optional[ScanSession] = None) -> List[ScanResult]:
         """Scan for breakout patterns - stocks breaking above resistance"""
         results = []
         
-        for symbol in symbols:
+        async for symbol, data in self._stream_scan_data(symbols, "3mo", session):
             try:
-                data = await self.data_fetcher.get_stock_data(
-                    symbol, period="3mo", interval="1d"
-                )
-                
                 if data is None or len(data) < 50:
                     continue
                 
@@ -286,16 +388,12 @@ class StockScreener:
         
         return results
     
-    async def _scan_breakdown(self, symbols: List[str]) -> List[ScanResult]:
+    async def _scan_breakdown(self, symbols: List[str], session: Optional[ScanSession] = None) -> List[ScanResult]:
         """Scan for breakdown patterns - stocks breaking below support"""
         results = []
         
-        for symbol in symbols:
+        async for symbol, data in self._stream_scan_data(symbols, "3mo", session):
             try:
-                data = await self.data_fetcher.get_stock_data(
-                    symbol, period="3mo", interval="1d"
-                )
-                
                 if data is None or len(data) < 50:
                     continue
                 
@@ -337,16 +435,12 @@ class StockScreener:
         
         return results
     
-    async def _scan_bull_flag(self, symbols: List[str]) -> List[ScanResult]:
+    async def _scan_bull_flag(self, symbols: List[str], session: Optional[ScanSession] = None) -> List[ScanResult]:
         """Scan for bull flag patterns - bullish continuation after pullback"""
         results = []
         
-        for symbol in symbols:
+        async for symbol, data in self._stream_scan_data(symbols, "2mo", session):
             try:
-                data = await self.data_fetcher.get_stock_data(
-                    symbol, period="2mo", interval="1d"
-                )
-                
                 if data is None or len(data) < 30:
                     continue
                 
@@ -405,16 +499,12 @@ class StockScreener:
         
         return results
     
-    async def _scan_ma_crossover(self, symbols: List[str]) -> List[ScanResult]:
+    async def _scan_ma_crossover(self, symbols: List[str], session: Optional[ScanSession] = None) -> List[ScanResult]:
         """Scan for moving average crossover signals"""
         results = []
         
-        for symbol in symbols:
+        async for symbol, data in self._stream_scan_data(symbols, "6mo", session):
             try:
-                data = await self.data_fetcher.get_stock_data(
-                    symbol, period="6mo", interval="1d"
-                )
-                
                 if data is None or len(data) < 100:
                     continue
                 
@@ -461,16 +551,12 @@ class StockScreener:
         return results
     
     # REVERSAL SCANS
-    async def _scan_rsi_reversal(self, symbols: List[str]) -> List[ScanResult]:
+    async def _scan_rsi_reversal(self, symbols: List[str], session: Optional[ScanSession] = None) -> List[ScanResult]:
         """Scan for RSI reversal signals"""
         results = []
         
-        for symbol in symbols:
+        async for symbol, data in self._stream_scan_data(symbols, "2mo", session):
             try:
-                data = await self.data_fetcher.get_stock_data(
-                    symbol, period="2mo", interval="1d"
-                )
-                
                 if data is None or len(data) < 30:
                     continue
                 
@@ -548,16 +634,12 @@ class StockScreener:
         return results
     
     # VOLUME SCANS
-    async def _scan_volume_breakout(self, symbols: List[str]) -> List[ScanResult]:
+    async def _scan_volume_breakout(self, symbols: List[str], session: Optional[ScanSession] = None) -> List[ScanResult]:
         """Scan for volume breakouts with price confirmation"""
         results = []
         
-        for symbol in symbols:
+        async for symbol, data in self._stream_scan_data(symbols, "2mo", session):
             try:
-                data = await self.data_fetcher.get_stock_data(
-                    symbol, period="2mo", interval="1d"
-                )
-                
                 if data is None or len(data) < 30:
                     continue
                 
@@ -605,16 +687,12 @@ class StockScreener:
         
         return results
     
-    async def _scan_volume_spike(self, symbols: List[str]) -> List[ScanResult]:
+    async def _scan_volume_spike(self, symbols: List[str], session: Optional[ScanSession] = None) -> List[ScanResult]:
         """Scan for unusual volume spikes without immediate price confirmation"""
         results = []
         
-        for symbol in symbols:
+        async for symbol, data in self._stream_scan_data(symbols, "1mo", session):
             try:
-                data = await self.data_fetcher.get_stock_data(
-                    symbol, period="1mo", interval="1d"
-                )
-                
                 if data is None or len(data) < 20:
                     continue
                 
@@ -658,16 +736,12 @@ class StockScreener:
         return results
     
     # CONSOLIDATION SCANS
-    async def _scan_consolidation(self, symbols: List[str]) -> List[ScanResult]:
+    async def _scan_consolidation(self, symbols: List[str], session: Optional[ScanSession] = None) -> List[ScanResult]:
         """Scan for consolidation patterns ready for breakout"""
         results = []
         
-        for symbol in symbols:
+        async for symbol, data in self._stream_scan_data(symbols, "2mo", session):
             try:
-                data = await self.data_fetcher.get_stock_data(
-                    symbol, period="2mo", interval="1d"
-                )
-                
                 if data is None or len(data) < 30:
                     continue
                 
@@ -729,16 +803,12 @@ class StockScreener:
         return results
     
     # CANDLESTICK PATTERN SCANS
-    async def _scan_candlestick(self, symbols: List[str]) -> List[ScanResult]:
+    async def _scan_candlestick(self, symbols: List[str], session: Optional[ScanSession] = None) -> List[ScanResult]:
         """Scan for bullish/bearish candlestick patterns"""
         results = []
         
-        for symbol in symbols:
+        async for symbol, data in self._stream_scan_data(symbols, "1mo", session):
             try:
-                data = await self.data_fetcher.get_stock_data(
-                    symbol, period="1mo", interval="1d"
-                )
-                
                 if data is None or len(data) < 10:
                     continue
                 
@@ -852,78 +922,495 @@ class StockScreener:
         return prev_bullish and curr_bearish and engulfs
     
     # ADDITIONAL SCAN METHODS (Placeholder implementations)
-    async def _scan_bear_flag(self, symbols: List[str]) -> List[ScanResult]:
+    async def _scan_bear_flag(self, symbols: List[str], session: Optional[ScanSession] = None) -> List[ScanResult]:
         """Placeholder for bear flag scan"""
         return []
     
-    async def _scan_macd_bullish(self, symbols: List[str]) -> List[ScanResult]:
+    async def _scan_macd_bullish(self, symbols: List[str], session: Optional[ScanSession] = None) -> List[ScanResult]:
         """Placeholder for MACD bullish scan"""
         return []
     
-    async def _scan_macd_bearish(self, symbols: List[str]) -> List[ScanResult]:
+    async def _scan_macd_bearish(self, symbols: List[str], session: Optional[ScanSession] = None) -> List[ScanResult]:
         """Placeholder for MACD bearish scan"""
         return []
     
-    async def _scan_support_resistance(self, symbols: List[str]) -> List[ScanResult]:
+    async def _scan_support_resistance(self, symbols: List[str], session: Optional[ScanSession] = None) -> List[ScanResult]:
         """Placeholder for support/resistance scan"""
         return []
     
-    async def _scan_double_bottom(self, symbols: List[str]) -> List[ScanResult]:
+    async def _scan_double_bottom(self, symbols: List[str], session: Optional[ScanSession] = None) -> List[ScanResult]:
         """Placeholder for double bottom scan"""
         return []
     
-    async def _scan_double_top(self, symbols: List[str]) -> List[ScanResult]:
+    async def _scan_double_top(self, symbols: List[str], session: Optional[ScanSession] = None) -> List[ScanResult]:
         """Placeholder for double top scan"""
         return []
     
-    async def _scan_triangle(self, symbols: List[str]) -> List[ScanResult]:
+    async def _scan_triangle(self, symbols: List[str], session: Optional[ScanSession] = None) -> List[ScanResult]:
         """Placeholder for triangle pattern scan"""
         return []
     
-    async def _scan_rectangle(self, symbols: List[str]) -> List[ScanResult]:
+    async def _scan_rectangle(self, symbols: List[str], session: Optional[ScanSession] = None) -> List[ScanResult]:
         """Placeholder for rectangle pattern scan"""
         return []
     
-    async def _scan_inside_bar(self, symbols: List[str]) -> List[ScanResult]:
+    async def _scan_inside_bar(self, symbols: List[str], session: Optional[ScanSession] = None) -> List[ScanResult]:
         """Placeholder for inside bar scan"""
         return []
     
-    async def _scan_outside_bar(self, symbols: List[str]) -> List[ScanResult]:
+    async def _scan_outside_bar(self, symbols: List[str], session: Optional[ScanSession] = None) -> List[ScanResult]:
         """Placeholder for outside bar scan"""
         return []
     
-    async def _scan_engulfing(self, symbols: List[str]) -> List[ScanResult]:
+    async def _scan_engulfing(self, symbols: List[str], session: Optional[ScanSession] = None) -> List[ScanResult]:
         """Placeholder for engulfing pattern scan"""
         return []
     
-    async def _scan_trend_continuation(self, symbols: List[str]) -> List[ScanResult]:
+    async def _scan_trend_continuation(self, symbols: List[str], session: Optional[ScanSession] = None) -> List[ScanResult]:
         """Placeholder for trend continuation scan"""
         return []
     
-    async def _scan_trend_reversal(self, symbols: List[str]) -> List[ScanResult]:
+    async def _scan_trend_reversal(self, symbols: List[str], session: Optional[ScanSession] = None) -> List[ScanResult]:
         """Placeholder for trend reversal scan"""
         return []
     
-    async def _scan_gap_trading(self, symbols: List[str]) -> List[ScanResult]:
+    async def _scan_gap_trading(self, symbols: List[str], session: Optional[ScanSession] = None) -> List[ScanResult]:
         """Placeholder for gap trading scan"""
         return []
     
+    # PANEL SCANS (vectorized over a ScanPanel, one column per symbol)
+    def _get_panel_scan_method(self, scan_type: ScanType):
+        """Get the vectorized panel implementation for the scan type"""
+        panel_methods = {
+            ScanType.BREAKOUT: self._panel_scan_breakout,
+            ScanType.BREAKDOWN: self._panel_scan_breakdown,
+            ScanType.BULL_FLAG: self._panel_scan_bull_flag,
+            ScanType.MA_CROSSOVER: self._panel_scan_ma_crossover,
+            ScanType.RSI_REVERSAL: self._panel_scan_rsi_reversal,
+            ScanType.VOLUME_BREAKOUT: self._panel_scan_volume_breakout,
+            ScanType.VOLUME_SPIKE: self._panel_scan_volume_spike,
+            ScanType.CONSOLIDATION: self._panel_scan_consolidation,
+            ScanType.CANDLESTICK: self._panel_scan_candlestick,
+        }
+        
+        return panel_methods.get(scan_type)
+    
+    def _panel_scan_breakout(self, panel: ScanPanel) -> List[ScanResult]:
+        """Vectorized breakout scan"""
+        current_price = panel.last('Close')
+        # Max of the 20-bar rolling highs over the 20 bars before today
+        resistance = np.nanmax(panel.field('High')[-40:-1], axis=0)
+        volume_ratio = panel.last('Volume_Ratio')
+        
+        hits = (panel.bars_in_period("3mo") >= 50) & (current_price > resistance * 1.02)
+        
+        breakout_strength = np.minimum(((current_price - resistance) / resistance) * 100, 100)
+        volume_strength = np.minimum(volume_ratio * 20, 50)
+        signal_strength = (breakout_strength + volume_strength) / 2
+        
+        return [
+            ScanResult(
+                symbol=panel.symbols[j],
+                name=panel.symbols[j].replace('.NS', ''),
+                scan_type="Breakout",
+                signal_strength=signal_strength[j],
+                current_price=current_price[j],
+                target_price=current_price[j] * 1.10,
+                stop_loss=resistance[j] * 0.98,
+                volume_ratio=volume_ratio[j],
+                pattern_details={
+                    'resistance_level': resistance[j],
+                    'breakout_percentage': breakout_strength[j],
+                    'days_above_resistance': 1
+                },
+                timestamp=datetime.now()
+            )
+            for j in np.flatnonzero(hits)
+        ]
+    
+    def _panel_scan_breakdown(self, panel: ScanPanel) -> List[ScanResult]:
+        """Vectorized breakdown scan"""
+        current_price = panel.last('Close')
+        support = np.nanmin(panel.field('Low')[-40:-1], axis=0)
+        volume_ratio = panel.last('Volume_Ratio')
+        
+        hits = (panel.bars_in_period("3mo") >= 50) & (current_price < support * 0.98)
+        
+        breakdown_strength = np.minimum(((support - current_price) / support) * 100, 100)
+        volume_strength = np.minimum(volume_ratio * 20, 50)
+        signal_strength = (breakdown_strength + volume_strength) / 2
+        
+        return [
+            ScanResult(
+                symbol=panel.symbols[j],
+                name=panel.symbols[j].replace('.NS', ''),
+                scan_type="Breakdown",
+                signal_strength=signal_strength[j],
+                current_price=current_price[j],
+                target_price=current_price[j] * 0.90,
+                stop_loss=support[j] * 1.02,
+                volume_ratio=volume_ratio[j],
+                pattern_details={
+                    'support_level': support[j],
+                    'breakdown_percentage': breakdown_strength[j],
+                    'days_below_support': 1
+                },
+                timestamp=datetime.now()
+            )
+            for j in np.flatnonzero(hits)
+        ]
+    
+    def _panel_scan_bull_flag(self, panel: ScanPanel) -> List[ScanResult]:
+        """Vectorized bull flag scan"""
+        closes = panel.field('Close')
+        current_price = panel.last('Close')
+        volume_ratio = panel.last('Volume_Ratio')
+        
+        flagpole_start = panel.last('Close', 20)
+        flagpole_peak = np.nanmax(closes[-10:-5], axis=0)
+        flag_high = np.nanmax(closes[-5:], axis=0)
+        flag_low = np.nanmin(closes[-5:], axis=0)
+        flag_range = (flag_high - flag_low) / flag_high
+        
+        hits = ((panel.bars_in_period("2mo") >= 30) &
+                ~(flagpole_peak / flagpole_start < 1.15) &
+                ~((flag_range > 0.08) | (flag_high < flagpole_peak * 0.95)) &
+                (current_price > flag_high * 1.01))
+        
+        flagpole_strength = ((flagpole_peak - flagpole_start) / flagpole_start) * 100
+        consolidation_strength = 100 - (flag_range * 100)
+        volume_strength = np.minimum(volume_ratio * 25, 50)
+        signal_strength = (flagpole_strength + consolidation_strength + volume_strength) / 3
+        
+        return [
+            ScanResult(
+                symbol=panel.symbols[j],
+                name=panel.symbols[j].replace('.NS', ''),
+                scan_type="Bull Flag",
+                signal_strength=min(signal_strength[j], 100),
+                current_price=current_price[j],
+                target_price=flag_high[j] + (flagpole_peak[j] - flagpole_start[j]),
+                stop_loss=flag_low[j] * 0.98,
+                volume_ratio=volume_ratio[j],
+                pattern_details={
+                    'flagpole_gain': flagpole_strength[j],
+                    'flag_range': flag_range[j] * 100,
+                    'flag_high': flag_high[j],
+                    'flag_low': flag_low[j]
+                },
+                timestamp=datetime.now()
+            )
+            for j in np.flatnonzero(hits)
+        ]
+    
+    def _panel_scan_ma_crossover(self, panel: ScanPanel) -> List[ScanResult]:
+        """Vectorized moving average crossover scan"""
+        current_price = panel.last('Close')
+        sma_20, prev_sma_20 = panel.last('SMA_20'), panel.last('SMA_20', 2)
+        sma_50, prev_sma_50 = panel.last('SMA_50'), panel.last('SMA_50', 2)
+        volume_ratio = panel.last('Volume_Ratio')
+        
+        hits = ((panel.bars_in_period("6mo") >= 100) &
+                (sma_20 > sma_50) & (prev_sma_20 <= prev_sma_50))
+        
+        ma_distance = ((sma_20 - sma_50) / sma_50) * 100
+        price_position = ((current_price - sma_20) / sma_20) * 100
+        volume_strength = np.minimum(volume_ratio * 30, 50)
+        signal_strength = np.minimum(np.abs(ma_distance) * 50 + np.abs(price_position) * 25 + volume_strength, 100)
+        
+        return [
+            ScanResult(
+                symbol=panel.symbols[j],
+                name=panel.symbols[j].replace('.NS', ''),
+                scan_type="MA Crossover",
+                signal_strength=signal_strength[j],
+                current_price=current_price[j],
+                target_price=current_price[j] * 1.08,
+                stop_loss=sma_50[j] * 0.97,
+                volume_ratio=volume_ratio[j],
+                pattern_details={
+                    'sma_20': sma_20[j],
+                    'sma_50': sma_50[j],
+                    'ma_distance_percent': ma_distance[j],
+                    'crossover_type': 'Golden Cross'
+                },
+                timestamp=datetime.now()
+            )
+            for j in np.flatnonzero(hits)
+        ]
+    
+    def _panel_scan_rsi_reversal(self, panel: ScanPanel) -> List[ScanResult]:
+        """Vectorized RSI reversal scan"""
+        current_price = panel.last('Close')
+        current_rsi, prev_rsi = panel.last('RSI'), panel.last('RSI', 2)
+        min_rsi = np.nanmin(panel.field('RSI')[-5:], axis=0)
+        max_rsi = np.nanmax(panel.field('RSI')[-5:], axis=0)
+        volume_ratio = panel.last('Volume_Ratio')
+        volume_strength = np.minimum(volume_ratio * 25, 40)
+        enough_bars = panel.bars_in_period("2mo") >= 30
+        
+        oversold = enough_bars & (current_rsi > 30) & (prev_rsi <= 30) & (min_rsi < 25)
+        overbought = (enough_bars & ~oversold &
+                      (current_rsi < 70) & (prev_rsi >= 70) & (max_rsi > 75))
+        
+        results = []
+        for j in np.flatnonzero(oversold | overbought):
+            if oversold[j]:
+                recovery_strength = current_rsi[j] - prev_rsi[j]
+                signal_strength = min((30 - min_rsi[j]) * 8 + recovery_strength * 5 + volume_strength[j], 100)
+                target_price, stop_loss = current_price[j] * 1.12, current_price[j] * 0.95
+                pattern_details = {
+                    'current_rsi': current_rsi[j],
+                    'min_rsi_5_days': min_rsi[j],
+                    'rsi_change': recovery_strength,
+                    'reversal_type': 'Oversold Recovery'
+                }
+            else:
+                decline_strength = prev_rsi[j] - current_rsi[j]
+                signal_strength = min((max_rsi[j] - 70) * 8 + decline_strength * 5 + volume_strength[j], 100)
+                target_price, stop_loss = current_price[j] * 0.88, current_price[j] * 1.05
+                pattern_details = {
+                    'current_rsi': current_rsi[j],
+                    'max_rsi_5_days': max_rsi[j],
+                    'rsi_change': -decline_strength,
+                    'reversal_type': 'Overbought Decline'
+                }
+            
+            results.append(ScanResult(
+                symbol=panel.symbols[j],
+                name=panel.symbols[j].replace('.NS', ''),
+                scan_type="RSI Reversal",
+                signal_strength=signal_strength,
+                current_price=current_price[j],
+                target_price=target_price,
+                stop_loss=stop_loss,
+                volume_ratio=volume_ratio[j],
+                pattern_details=pattern_details,
+                timestamp=datetime.now()
+            ))
+        
+        return results
+    
+    def _panel_scan_volume_breakout(self, panel: ScanPanel) -> List[ScanResult]:
+        """Vectorized volume breakout scan"""
+        current_price, prev_price = panel.last('Close'), panel.last('Close', 2)
+        volume_ratio = panel.last('Volume_Ratio')
+        avg_volume = panel.last('Volume_SMA')
+        
+        hits = ((panel.bars_in_period("2mo") >= 30) &
+                (volume_ratio >= 3.0) &
+                (np.abs(current_price - prev_price) / prev_price >= 0.03))
+        
+        price_change = (current_price - prev_price) / prev_price * 100
+        signal_strength = np.minimum(volume_ratio * 20, 60) + np.minimum(np.abs(price_change) * 10, 40)
+        
+        return [
+            ScanResult(
+                symbol=panel.symbols[j],
+                name=panel.symbols[j].replace('.NS', ''),
+                scan_type="Volume Breakout",
+                signal_strength=signal_strength[j],
+                current_price=current_price[j],
+                target_price=current_price[j] * (1.10 if price_change[j] > 0 else 0.90),
+                stop_loss=current_price[j] * (0.95 if price_change[j] > 0 else 1.05),
+                volume_ratio=volume_ratio[j],
+                pattern_details={
+                    'volume_spike_ratio': volume_ratio[j],
+                    'price_change_percent': price_change[j],
+                    'direction': 'Bullish' if price_change[j] > 0 else 'Bearish',
+                    'avg_volume_20d': avg_volume[j]
+                },
+                timestamp=datetime.now()
+            )
+            for j in np.flatnonzero(hits)
+        ]
+    
+    def _panel_scan_volume_spike(self, panel: ScanPanel) -> List[ScanResult]:
+        """Vectorized volume spike scan"""
+        current_price = panel.last('Close')
+        volume_ratio = panel.last('Volume_Ratio')
+        volume_trend = np.nanmean(panel.field('Volume_Ratio')[-3:], axis=0)
+        avg_volume = panel.last('Volume_SMA')
+        
+        hits = (panel.bars_in_period("1mo") >= 20) & (volume_ratio >= 2.5)
+        
+        signal_strength = np.minimum(volume_ratio * 25, 70) + np.minimum(volume_trend * 15, 30)
+        
+        return [
+            ScanResult(
+                symbol=panel.symbols[j],
+                name=panel.symbols[j].replace('.NS', ''),
+                scan_type="Volume Spike",
+                signal_strength=signal_strength[j],
+                current_price=current_price[j],
+                target_price=current_price[j] * 1.08,
+                stop_loss=current_price[j] * 0.95,
+                volume_ratio=volume_ratio[j],
+                pattern_details={
+                    'volume_spike_ratio': volume_ratio[j],
+                    'volume_trend_3d': volume_trend[j],
+                    'interpretation': 'Accumulation' if volume_trend[j] > 1.5 else 'Single Day Spike',
+                    'avg_volume_20d': avg_volume[j]
+                },
+                timestamp=datetime.now()
+            )
+            for j in np.flatnonzero(hits)
+        ]
+    
+    def _panel_scan_consolidation(self, panel: ScanPanel) -> List[ScanResult]:
+        """Vectorized consolidation scan"""
+        closes = panel.field('Close')
+        current_price = panel.last('Close')
+        volume_ratio = panel.last('Volume_Ratio')
+        
+        consol_high = np.nanmax(closes[-15:], axis=0)
+        consol_low = np.nanmin(closes[-15:], axis=0)
+        consol_range = (consol_high - consol_low) / consol_low
+        
+        hits = (panel.bars_in_period("2mo") >= 30) & (consol_range <= 0.10)
+        
+        price_position = (current_price - consol_low) / (consol_high - consol_low)
+        volatility_recent = np.nanstd(closes[-5:], axis=0, ddof=1)
+        volatility_earlier = np.nanstd(closes[-15:-10], axis=0, ddof=1)
+        volatility_compression = np.where(volatility_recent > 0, volatility_earlier / volatility_recent, 1)
+        
+        tightness_strength = np.maximum(100 - (consol_range * 1000), 0)
+        position_strength = price_position * 50
+        compression_strength = np.minimum(volatility_compression * 20, 30)
+        signal_strength = (tightness_strength + position_strength + compression_strength) / 3
+        
+        return [
+            ScanResult(
+                symbol=panel.symbols[j],
+                name=panel.symbols[j].replace('.NS', ''),
+                scan_type="Consolidation",
+                signal_strength=signal_strength[j],
+                current_price=current_price[j],
+                target_price=consol_high[j] * 1.08,
+                stop_loss=consol_low[j] * 0.97,
+                volume_ratio=volume_ratio[j],
+                pattern_details={
+                    'consolidation_range_percent': consol_range[j] * 100,
+                    'consolidation_high': consol_high[j],
+                    'consolidation_low': consol_low[j],
+                    'price_position_in_range': price_position[j],
+                    'volatility_compression': volatility_compression[j],
+                    'days_in_pattern': 15
+                },
+                timestamp=datetime.now()
+            )
+            for j in np.flatnonzero(hits)
+        ]
+    
+    def _panel_scan_candlestick(self, panel: ScanPanel) -> List[ScanResult]:
+        """Vectorized candlestick scan"""
+        opens, highs = panel.last('Open'), panel.last('High')
+        lows, closes = panel.last('Low'), panel.last('Close')
+        prev_open, prev_close = panel.last('Open', 2), panel.last('Close', 2)
+        volume_ratio = panel.last('Volume_Ratio')
+        enough_bars = panel.bars_in_period("1mo") >= 10
+        
+        body = np.abs(closes - opens)
+        total_range = highs - lows
+        upper_shadow = highs - np.maximum(opens, closes)
+        lower_shadow = np.minimum(opens, closes) - lows
+        
+        # Same order and base strengths as _scan_candlestick
+        pattern_masks = [
+            ('Hammer', 'Bullish', 75,
+             (lower_shadow >= body * 2) & (upper_shadow <= body * 0.5) & (body > 0)),
+            ('Doji', 'Neutral', 60,
+             (body <= total_range * 0.05) & (total_range > 0)),
+            ('Bullish Engulfing', 'Bullish', 80,
+             (prev_close < prev_open) & (closes > opens) & (opens < prev_close) & (closes > prev_open)),
+            ('Bearish Engulfing', 'Bearish', 80,
+             (prev_close > prev_open) & (closes < opens) & (opens > prev_close) & (closes < prev_open)),
+        ]
+        any_pattern = np.zeros(len(panel), dtype=bool)
+        for _, _, _, mask in pattern_masks:
+            any_pattern |= mask
+        
+        results = []
+        for j in np.flatnonzero(enough_bars & any_pattern):
+            for pattern_name, direction, base_strength, mask in pattern_masks:
+                if not mask[j]:
+                    continue
+                
+                target_multiplier = 1.06 if direction == 'Bullish' else 0.94
+                stop_multiplier = 0.96 if direction == 'Bullish' else 1.04
+                
+                results.append(ScanResult(
+                    symbol=panel.symbols[j],
+                    name=panel.symbols[j].replace('.NS', ''),
+                    scan_type=f"Candlestick - {pattern_name}",
+                    signal_strength=min(base_strength + (volume_ratio[j] * 10), 100),
+                    current_price=closes[j],
+                    target_price=closes[j] * target_multiplier,
+                    stop_loss=closes[j] * stop_multiplier,
+                    volume_ratio=volume_ratio[j],
+                    pattern_details={
+                        'pattern_name': pattern_name,
+                        'direction': direction,
+                        'candle_open': opens[j],
+                        'candle_high': highs[j],
+                        'candle_low': lows[j],
+                        'candle_close': closes[j]
+                    },
+                    timestamp=datetime.now()
+                ))
+        
+        return results
+    
     # BULK SCANNING METHODS
-    async def run_multiple_scans(self, scan_types: List[ScanType], 
-                               symbols: Optional[List[str]] = None,
-                               exchange: str = "NSE") -> Dict[str, List[ScanResult]]:
-        """Run multiple scans concurrently"""
-        tasks = []
-        for scan_type in scan_types:
-            task = self.run_scan(scan_type, symbols, exchange)
-            tasks.append(task)
+    async def run_panel_scans(self, scan_types: Optional[List[ScanType]] = None,
+                              symbols: Optional[List[str]] = None,
+                              exchange: str = "NSE",
+                              session: Optional[ScanSession] = None) -> Dict[str, List[ScanResult]]:
+        """
+        Run scans cross-sectionally over the whole universe as array operations
         
-        results = await asyncio.gather(*tasks)
+        Args:
+            scan_types: Scans to run (None for all)
+            symbols: List of symbols to scan (None for all)
+            exchange: Exchange to scan (NSE, NIFTY50, etc.)
+            session: Shared data session (None to create and prefetch one)
         
-        return {
-            scan_types[i].value: results[i] 
-            for i in range(len(scan_types))
-        }
+        Returns:
+            Scan results keyed by scan code, sorted by signal strength
+        """
+        if session is None:
+            session = await self.create_session(symbols, exchange)
+        
+        panel = ScanPanel.from_session(session, symbols)
+        return self.scan_panel(panel, scan_types)
+    
+    def scan_panel(self, panel: ScanPanel,
+                   scan_types: Optional[List[ScanType]] = None) -> Dict[str, List[ScanResult]]:
+        """Run scans over an already-built panel"""
+        if scan_types is None:
+            scan_types = list(ScanType)
+        
+        logger.info(f"Running {len(scan_types)} panel scans on {len(panel)} symbols")
+        
+        results = {}
+        with warnings.catch_warnings():
+            # All-NaN columns and zero divisions just fail the scan masks
+            warnings.simplefilter('ignore', RuntimeWarning)
+            
+            for scan_type in scan_types:
+                scan_method = self._get_panel_scan_method(scan_type)
+                if scan_method is None:
+                    if self._get_scan_method(scan_type) is None:
+                        logger.error(f"Unknown scan type: {scan_type}")
+                    results[scan_type.value] = []
+                    continue
+                
+                filtered_results = self._filter_results(scan_method(panel))
+                results[scan_type.value] = sorted(filtered_results,
+                                                  key=lambda x: x.signal_strength,
+                                                  reverse=True)
+        
+        return results
     
     def get_available_scans(self) -> List[Dict[str, str]]:
         """Get list of all available scan types with descriptions"""
@@ -1069,11 +1556,19 @@ class StockScreener:
 
     async def run_multiple_scans(self, scan_types: List[ScanType],
                                symbols: Optional[List[str]] = None,
-                               exchange: str = "NSE") -> Dict[str, List[ScanResult]]:
-        """Run multiple scans concurrently"""
+                               exchange: str = "NSE",
+                               session: Optional[ScanSession] = None) -> Dict[str, List[ScanResult]]:
+        """Run multiple scans concurrently over one shared data session"""
+        if symbols is None:
+            symbols = self.data_fetcher.get_available_symbols(exchange)
+        
+        # One fetch per symbol for the whole batch instead of one per scan
+        if session is None:
+            session = await self.create_session(symbols, exchange)
+        
         tasks = []
         for scan_type in scan_types:
-            task = self.run_scan(scan_type, symbols, exchange)
+            task = self.run_scan(scan_type, symbols, exchange, session)
             tasks.append(task)
         
         results = await asyncio.gather(*tasks)
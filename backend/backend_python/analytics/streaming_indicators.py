@@ -0,0 +1,283 @@
+"""
+Streaming Indicators
+====================
+
+Constant-time indicator updates for live bars:
+- SMA 20/50, EMA 12/26, RSI 14, MACD, Bollinger Bands, volume SMA
+- Same column names and values as MarketDataFetcher._add_basic_indicators
+- Rehydrates from a historical frame, then updates in O(1) per bar
+- Ticks can revise the forming bar instead of appending a new one
+"""
+
+import math
+from collections import deque
+import pandas as pd
+import numpy as np
+from typing import Dict, Optional, Any
+import logging
+
+logger = logging.getLogger(__name__)
+
+class _RollingWindow:
+    """Fixed-size window with running sum and sum of squares"""
+
+    # Re-sum from the stored values every this many pushes to cap float drift
+    RESYNC_EVERY = 1000
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.nan_count = 0
+        self._pushes = 0
+
+    def push(self, value: float):
+        self.values.append(value)
+        self._add(value)
+        if len(self.values) > self.size:
+            self._remove(self.values.popleft())
+
+        self._pushes += 1
+        if self._pushes % self.RESYNC_EVERY == 0:
+            self._resync()
+
+    def replace_last(self, value: float):
+        self._remove(self.values[-1])
+        self.values[-1] = value
+        self._add(value)
+
+    def mean(self) -> float:
+        if len(self.values) < self.size or self.nan_count:
+            return np.nan
+        return self.total / self.size
+
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1), as pandas rolling().std()"""
+        if len(self.values) < self.size or self.nan_count:
+            return np.nan
+        variance = (self.total_sq - self.total * self.total / self.size) / (self.size - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def _add(self, value: float):
+        if math.isnan(value):
+            self.nan_count += 1
+        else:
+            self.total += value
+            self.total_sq += value * value
+
+    def _remove(self, value: float):
+        if math.isnan(value):
+            self.nan_count -= 1
+        else:
+            self.total -= value
+            self.total_sq -= value * value
+
+    def _resync(self):
+        finite = [v for v in self.values if not math.isnan(v)]
+        self.total = math.fsum(finite)
+        self.total_sq = math.fsum(v * v for v in finite)
+
+
+class _EwmState:
+    """pandas ewm(span).mean() with adjust=True, one observation at a time"""
+
+    def __init__(self, span: int):
+        self.decay = 1 - 2 / (span + 1)
+        self.value = np.nan
+        self.weight = 0.0
+        self._previous = (np.nan, 0.0)
+
+    def push(self, value: float) -> float:
+        self._previous = (self.value, self.weight)
+        return self._apply(value)
+
+    def replace_last(self, value: float) -> float:
+        self.value, self.weight = self._previous
+        return self._apply(value)
+
+    def seed(self, value: float, observed: int, previous: float = np.nan):
+        """Resume from a known average over `observed` rows (`previous` is the row before)"""
+        self.value = value
+        self.weight = self._weight(value, observed)
+        self._previous = (previous, self._weight(previous, observed - 1))
+
+    def _weight(self, value: float, observed: int) -> float:
+        """Total weight behind an average of `observed` rows"""
+        if np.isnan(value) or observed <= 0:
+            return 0.0
+        return (1 - self.decay ** observed) / (1 - self.decay)
+
+    def _apply(self, value: float) -> float:
+        if math.isnan(value):
+            self.weight *= self.decay
+        else:
+            carried = self.decay * self.weight
+            self.value = value if carried == 0 else (value + carried * self.value) / (carried + 1)
+            self.weight = carried + 1
+        return self.value
+
+
+class IndicatorState:
+    """
+    Per (symbol, interval) indicator state updated in constant time per bar
+    """
+
+    COLUMNS = [
+        'SMA_20', 'SMA_50', 'EMA_12', 'EMA_26', 'RSI',
+        'MACD', 'MACD_Signal', 'MACD_Histogram',
+        'BB_Middle', 'BB_Upper', 'BB_Lower',
+        'Volume_SMA', 'Volume_Ratio'
+    ]
+
+    def __init__(self, symbol: Optional[str] = None, interval: str = "1d"):
+        self.symbol = symbol
+        self.interval = interval
+        self.bars = 0
+
+        self._sma_20 = _RollingWindow(20)
+        self._sma_50 = _RollingWindow(50)
+        self._gain = _RollingWindow(14)
+        self._loss = _RollingWindow(14)
+        self._volume = _RollingWindow(20)
+        self._ema_12 = _EwmState(12)
+        self._ema_26 = _EwmState(26)
+        self._signal = _EwmState(9)
+
+        self._prev_close = np.nan          # Close of the bar before the forming one
+        self._last_close = np.nan
+        self._last_volume = np.nan
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame, symbol: Optional[str] = None,
+                   interval: str = "1d") -> 'IndicatorState':
+        """
+        Rehydrate state from a historical OHLCV frame
+
+        Frames that already carry the indicator columns are resumed from their
+        last row in O(50); otherwise every bar is replayed once.
+        """
+        state = cls(symbol, interval)
+        if data is None or data.empty:
+            return state
+
+        if not all(column in data.columns for column in ('EMA_12', 'EMA_26', 'MACD_Signal')):
+            for close, volume in zip(data['Close'].to_numpy(dtype=float),
+                                     data['Volume'].to_numpy(dtype=float)):
+                state.update(close, volume)
+            return state
+
+        closes = data['Close'].to_numpy(dtype=float)
+        volumes = data['Volume'].to_numpy(dtype=float)
+        tail = closes[-51:]
+        deltas = np.diff(tail)
+        if len(closes) <= 50:
+            # The first bar of the frame has no delta; pandas counts it as zero gain/loss
+            deltas = np.concatenate([[np.nan], deltas])
+
+        for close in closes[-50:]:
+            state._sma_50.push(close)
+        for close in closes[-20:]:
+            state._sma_20.push(close)
+        for volume in volumes[-20:]:
+            state._volume.push(volume)
+        for delta in deltas[-14:]:
+            state._gain.push(delta if delta > 0 else 0.0)
+            state._loss.push(-delta if delta < 0 else 0.0)
+
+        observed = len(data)
+        for ewm, column in ((state._ema_12, 'EMA_12'), (state._ema_26, 'EMA_26'),
+                            (state._signal, 'MACD_Signal')):
+            values = data[column].to_numpy(dtype=float)
+            ewm.seed(values[-1], observed, values[-2] if observed > 1 else np.nan)
+
+        state.bars = observed
+        state._prev_close = closes[-2] if len(closes) > 1 else np.nan
+        state._last_close = closes[-1]
+        state._last_volume = volumes[-1]
+        return state
+
+    def update(self, close: float, volume: float, new_bar: bool = True) -> Dict[str, float]:
+        """
+        Apply a bar (or a tick revising the forming bar) in O(1)
+
+        Args:
+            close: Latest close / last traded price
+            volume: Bar volume so far
+            new_bar: False to revise the last bar instead of appending one
+
+        Returns:
+            Indicator values for the latest bar, keyed by column name
+        """
+        close = float(close)
+        volume = float(volume)
+
+        if new_bar or self.bars == 0:
+            self._prev_close = self._last_close
+            delta = close - self._prev_close
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+
+            self._sma_20.push(close)
+            self._sma_50.push(close)
+            self._volume.push(volume)
+            self._gain.push(gain)
+            self._loss.push(loss)
+            self._ema_12.push(close)
+            self._ema_26.push(close)
+            self._signal.push(self._ema_12.value - self._ema_26.value)
+            self.bars += 1
+        else:
+            delta = close - self._prev_close
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+
+            self._sma_20.replace_last(close)
+            self._sma_50.replace_last(close)
+            self._volume.replace_last(volume)
+            self._gain.replace_last(gain)
+            self._loss.replace_last(loss)
+            self._ema_12.replace_last(close)
+            self._ema_26.replace_last(close)
+            self._signal.replace_last(self._ema_12.value - self._ema_26.value)
+
+        self._last_close = close
+        self._last_volume = volume
+        return self.values()
+
+    def values(self) -> Dict[str, float]:
+        """Current indicator values keyed by the _add_basic_indicators column names"""
+        sma_20 = self._sma_20.mean()
+        bb_std = self._sma_20.std()
+        macd = self._ema_12.value - self._ema_26.value
+        volume_sma = self._volume.mean()
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = np.float64(self._gain.mean()) / np.float64(self._loss.mean())
+            rsi = 100 - (100 / (1 + rs))
+            volume_ratio = np.float64(self._last_volume) / np.float64(volume_sma)
+
+        return {
+            'SMA_20': sma_20,
+            'SMA_50': self._sma_50.mean(),
+            'EMA_12': self._ema_12.value,
+            'EMA_26': self._ema_26.value,
+            'RSI': float(rsi),
+            'MACD': macd,
+            'MACD_Signal': self._signal.value,
+            'MACD_Histogram': macd - self._signal.value,
+            'BB_Middle': sma_20,
+            'BB_Upper': sma_20 + bb_std * 2,
+            'BB_Lower': sma_20 - bb_std * 2,
+            'Volume_SMA': volume_sma,
+            'Volume_Ratio': float(volume_ratio)
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get state summary"""
+        return {
+            'symbol': self.symbol,
+            'interval': self.interval,
+            'bars': self.bars,
+            'last_close': self._last_close
+        }
@@ -0,0 +1,169 @@
+"""
+Cache Payload Codecs
+====================
+
+Serialization and compression for SQLite cache blobs:
+- msgpack / orjson / json serializers, picked by availability
+- Optional zstd or zlib compression above a size threshold
+- A codec tag stored with every row so older rows stay readable
+"""
+
+import json
+import logging
+import math
+import zlib
+from typing import Any, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Tag for rows written before codecs existed (plain json.dumps text)
+LEGACY_TAG = "json"
+
+
+def _to_builtin(value: Any) -> Any:
+    """json fallback for numpy arrays and scalars"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _has_non_finite(data: Any) -> bool:
+    """Whether a payload holds NaN or +/-inf anywhere"""
+    if isinstance(data, float):
+        return not math.isfinite(data)
+    if isinstance(data, dict):
+        return any(_has_non_finite(value) for value in data.values())
+    if isinstance(data, (list, tuple)):
+        return any(_has_non_finite(value) for value in data)
+    if hasattr(data, 'tolist'):
+        return _has_non_finite(data.tolist())
+    return False
+
+
+class CacheCodec:
+    """
+    Encodes cache payloads to compact blobs and decodes them by tag
+
+    Tags look like "msgpack+zstd", "orjson+zlib" or "json". Decoding only
+    needs the tag, so rows written with any codec can be read by any other.
+    """
+
+    SERIALIZERS = ("msgpack", "orjson", "json")
+    COMPRESSIONS = ("zstd", "zlib", "none")
+
+    def __init__(self, serializer: Optional[str] = None, compression: Optional[str] = None,
+                 level: int = 3, min_compress_size: int = 256):
+        """
+        Args:
+            serializer: msgpack, orjson or json (None picks the fastest installed)
+            compression: zstd, zlib or none (None picks zstd if installed, else zlib)
+            level: Compression level
+            min_compress_size: Payloads smaller than this are stored uncompressed
+        """
+        self.serializer = serializer or self._best_serializer()
+        self.compression = compression or ("zstd" if ZSTD_AVAILABLE else "zlib")
+        self.level = level
+        self.min_compress_size = min_compress_size
+
+        if self.serializer not in self.SERIALIZERS:
+            raise ValueError(f"Unknown serializer '{self.serializer}', expected one of {self.SERIALIZERS}")
+        if self.compression not in self.COMPRESSIONS:
+            raise ValueError(f"Unknown compression '{self.compression}', expected one of {self.COMPRESSIONS}")
+        if self.serializer == "msgpack" and not MSGPACK_AVAILABLE:
+            raise ValueError("msgpack serializer requested but msgpack is not installed")
+        if self.serializer == "orjson" and not ORJSON_AVAILABLE:
+            raise ValueError("orjson serializer requested but orjson is not installed")
+        if self.compression == "zstd" and not ZSTD_AVAILABLE:
+            raise ValueError("zstd compression requested but zstandard is not installed")
+
+        self._zstd_compressor = zstandard.ZstdCompressor(level=level) if ZSTD_AVAILABLE else None
+        self._zstd_decompressor = zstandard.ZstdDecompressor() if ZSTD_AVAILABLE else None
+
+    @property
+    def name(self) -> str:
+        return self.serializer if self.compression == "none" else f"{self.serializer}+{self.compression}"
+
+    def encode(self, data: Any) -> Tuple[bytes, str, int]:
+        """
+        Encode a payload
+
+        Returns:
+            (blob, codec tag, serialized size before compression)
+        """
+        serializer = self.serializer
+        try:
+            raw = self._serialize(data, serializer)
+        except TypeError:
+            # Types the binary serializers reject (e.g. numpy scalars) fall back to json
+            serializer = "json"
+            raw = self._serialize(data, serializer)
+        if serializer == "orjson" and b"null" in raw and _has_non_finite(data):
+            # orjson writes NaN and +/-inf as null; json keeps them
+            serializer = "json"
+            raw = self._serialize(data, serializer)
+
+        if self.compression == "none" or len(raw) < self.min_compress_size:
+            return raw, serializer, len(raw)
+
+        return self._compress(raw, self.compression), f"{serializer}+{self.compression}", len(raw)
+
+    def decode(self, blob: Union[bytes, str], tag: Optional[str]) -> Any:
+        """Decode a blob written under any codec tag (None for legacy json text)"""
+        if not tag or tag == LEGACY_TAG:
+            return json.loads(blob)
+
+        serializer, _, compression = tag.partition("+")
+        if compression:
+            blob = self._decompress(blob, compression)
+        return self._deserialize(blob, serializer)
+
+    def _best_serializer(self) -> str:
+        if MSGPACK_AVAILABLE:
+            return "msgpack"
+        if ORJSON_AVAILABLE:
+            return "orjson"
+        return "json"
+
+    def _serialize(self, data: Any, serializer: str) -> bytes:
+        if serializer == "msgpack":
+            return msgpack.packb(data, use_bin_type=True)
+        if serializer == "orjson":
+            return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        return json.dumps(data, default=_to_builtin).encode('utf-8')
+
+    def _deserialize(self, raw: bytes, serializer: str) -> Any:
+        if serializer == "msgpack":
+            return msgpack.unpackb(raw, raw=False, strict_map_key=False)
+        if serializer == "orjson":
+            return orjson.loads(raw)
+        return json.loads(raw)
+
+    def _compress(self, raw: bytes, compression: str) -> bytes:
+        if compression == "zstd":
+            return self._zstd_compressor.compress(raw)
+        return zlib.compress(raw, min(self.level, 9))
+
+    def _decompress(self, blob: bytes, compression: str) -> bytes:
+        if compression == "zstd":
+            if self._zstd_decompressor is None:
+                raise ValueError("Row was written with zstd but zstandard is not installed")
+            return self._zstd_decompressor.decompress(blob)
+        return zlib.decompress(blob)
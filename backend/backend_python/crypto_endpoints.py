@@ -5,7 +5,6 @@ Enhanced crypto endpoints with 100+ provider orchestration.
 Uses intelligent multi-source data fetching with failover and health monitoring.
 """
 
-import requests
 import aiohttp
 import json
 from datetime import datetime, timedelta
@@ -18,6 +17,11 @@ import asyncio
 import random
 import urllib3
 
+from hedged_requests import HedgedRequester
+from http_client import AsyncHTTPClient, http_client
+from rate_limiter import get_rate_limiter, get_rate_limiter_stats
+from single_flight import RefreshFailed, SingleFlight
+
 # Disable SSL warnings for development
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -43,6 +47,14 @@ except ImportError:
         ProviderFactory = None
         HealthCache = None
 
+# Exchange adapters that quotes fail over to while CoinGecko is throttled
+try:
+    from providers.crypto.kraken_provider import KrakenProvider
+    from providers.crypto.coinbase_provider import CoinbaseProvider
+    FAILOVER_PROVIDERS_AVAILABLE = True
+except ImportError:
+    FAILOVER_PROVIDERS_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 # SSL context configuration for development
@@ -53,19 +65,83 @@ ssl_context.verify_mode = ssl.CERT_NONE
 class SimpleCryptoProvider:
     """Simplified crypto provider that handles API failures gracefully"""
     
-    def __init__(self):
+    def __init__(self, http: Optional[AsyncHTTPClient] = None):
         self.timeout = 10
+        self.http = http or http_client  # Shared pooled session (opened in the app lifespan)
         self.cache = {}
-        self.cache_ttl = 120  # 2 minutes
+        self.cache_ttl = 120  # 2 minutes (fresh)
+        self.cache_hard_ttl = 600  # Stale entries are served while revalidating up to 10 minutes
         self.last_cache_time = {}
         
+        # Concurrent cache misses for the same key share one upstream fetch
+        self.single_flight = SingleFlight("crypto")
+        
+        # Every CoinGecko request takes a token from its free-tier budget; a 429 / Retry-After
+        # puts it in cooldown and requests fail over instead of waiting
+        self.rate_limiter = get_rate_limiter('coingecko', {'per_minute': 30})
+        self.failover_providers = []
+        if FAILOVER_PROVIDERS_AVAILABLE:
+            self.failover_providers = [
+                KrakenProvider({'id': 'kraken', 'name': 'Kraken', 'rate_limits': {'per_minute': 60, 'per_second': 1}}),
+                CoinbaseProvider({'id': 'coinbase', 'name': 'Coinbase', 'base_url': 'https://api.exchange.coinbase.com',
+                                  'rate_limits': {'per_minute': 600, 'per_second': 10}})
+            ]
+        
+        # Single-coin quotes race CoinGecko against the exchanges once it overruns its p90
+        self.hedging_enabled = True
+        self.hedger = HedgedRequester("crypto_quotes", default_delay=1.5)
+        
+    def _cache_age(self, key: str) -> Optional[float]:
+        """Age of a cache entry in seconds (None if absent)"""
+        if key not in self.cache or key not in self.last_cache_time:
+            return None
+        return (datetime.now() - self.last_cache_time[key]).total_seconds()
+    
     def _is_cache_valid(self, key: str) -> bool:
         """Check if cached data is still valid"""
-        if key not in self.cache or key not in self.last_cache_time:
-            return False
+        age = self._cache_age(key)
+        return age is not None and age < self.cache_ttl
+    
+    async def _get_or_load(self, cache_key: str, loader, *args) -> Dict[str, Any]:
+        """
+        Serve a cache entry with stale-while-revalidate
+        
+        Fresh entries (< cache_ttl) are returned as is. Stale entries
+        (< cache_hard_ttl) are returned immediately while one background
+        refresh per key runs. Anything older waits on a coalesced fetch.
+        """
+        age = self._cache_age(cache_key)
+        if age is not None and age < self.cache_ttl:
+            return self._with_cache_meta(self.cache[cache_key], age, "fresh")
         
-        age = datetime.now() - self.last_cache_time[key]
-        return age.total_seconds() < self.cache_ttl
+        if age is not None and age < self.cache_hard_ttl:
+            if self.single_flight.refresh(cache_key, loader, *args, cache_key, refresh=True):
+                logger.info(f"Serving stale {cache_key} ({age:.0f}s old), refreshing in background")
+            return self._with_cache_meta(self.cache[cache_key], age, "stale")
+        
+        try:
+            result = await self.single_flight.do(cache_key, loader, *args, cache_key)
+        except RefreshFailed:
+            # Joined a background refresh that failed; load again with the mock fallback
+            result = await self.single_flight.do(cache_key, loader, *args, cache_key)
+        return self._with_cache_meta(result, 0.0, "miss")
+    
+    def _with_cache_meta(self, result: Dict[str, Any], age: float, status: str) -> Dict[str, Any]:
+        """Copy of a cached response annotated with its age"""
+        response = dict(result)
+        response["data_age_seconds"] = round(age, 1)
+        response["cache_status"] = status
+        return response
+    
+    async def refresh_top100(self) -> Dict[str, Any]:
+        """Refetch top 100 data into the cache (used by the background refresher)"""
+        cache_key = "top100_crypto"
+        return await self.single_flight.do(cache_key, self._load_top100_crypto, cache_key, refresh=True)
+    
+    async def refresh_crypto(self, symbol: str) -> Dict[str, Any]:
+        """Refetch one coin into the cache (used by the background refresher)"""
+        cache_key = f"crypto_{symbol}"
+        return await self.single_flight.do(cache_key, self._load_crypto_data, symbol, cache_key, refresh=True)
     
     def _cache_data(self, key: str, data: Any):
         """Cache data with timestamp"""
@@ -75,12 +151,10 @@ class SimpleCryptoProvider:
     async def get_crypto_data(self, symbol: str) -> Dict[str, Any]:
         """Get crypto data with fallback to mock data"""
         cache_key = f"crypto_{symbol}"
-        
-        # Check cache first
-        if self._is_cache_valid(cache_key):
-            logger.info(f"Returning cached data for {symbol}")
-            return self.cache[cache_key]
-        
+        return await self._get_or_load(cache_key, self._load_crypto_data, symbol)
+    
+    async def _load_crypto_data(self, symbol: str, cache_key: str, refresh: bool = False) -> Dict[str, Any]:
+        """Fetch crypto data (or mock fallback) and cache it"""
         try:
             # Try to get real data (simplified)
             data = await self._fetch_simple_crypto_data(symbol)
@@ -95,6 +169,10 @@ class SimpleCryptoProvider:
         except Exception as e:
             logger.warning(f"API fetch failed for {symbol}: {e}")
         
+        if refresh:
+            # A failed revalidation leaves the cached answer alone; the refresher backs off on the error
+            raise RefreshFailed(f"Refresh of {cache_key} failed")
+        
         # Fallback to mock data
         mock_data = self._generate_mock_crypto_data(symbol)
         result = {
@@ -109,12 +187,10 @@ class SimpleCryptoProvider:
     async def get_top100_crypto(self) -> Dict[str, Any]:
         """Get top 100 crypto data with fallback"""
         cache_key = "top100_crypto"
-        
-        # Check cache first
-        if self._is_cache_valid(cache_key):
-            logger.info("Returning cached top 100 data")
-            return self.cache[cache_key]
-        
+        return await self._get_or_load(cache_key, self._load_top100_crypto)
+    
+    async def _load_top100_crypto(self, cache_key: str, refresh: bool = False) -> Dict[str, Any]:
+        """Fetch top 100 data (or mock fallback) and cache it"""
         try:
             # Try to get real data
             data = await self._fetch_top100_data()
@@ -130,6 +206,9 @@ class SimpleCryptoProvider:
         except Exception as e:
             logger.warning(f"Top 100 API fetch failed: {e}")
         
+        if refresh:
+            raise RefreshFailed(f"Refresh of {cache_key} failed")
+        
         # Fallback to mock data
         mock_data = self._generate_mock_top100_data()
         result = {
@@ -145,12 +224,11 @@ class SimpleCryptoProvider:
     async def get_crypto_history(self, symbol: str, days: int = 7) -> Dict[str, Any]:
         """Get crypto history with fallback"""
         cache_key = f"history_{symbol}_{days}"
-        
-        # Check cache first
-        if self._is_cache_valid(cache_key):
-            logger.info(f"Returning cached history for {symbol}")
-            return self.cache[cache_key]
-        
+        return await self._get_or_load(cache_key, self._load_crypto_history, symbol, days)
+    
+    async def _load_crypto_history(self, symbol: str, days: int, cache_key: str,
+                                   refresh: bool = False) -> Dict[str, Any]:
+        """Fetch crypto history (or mock fallback) and cache it"""
         try:
             # Try to get real data
             history = await self._fetch_crypto_history(symbol, days)
@@ -170,6 +248,9 @@ class SimpleCryptoProvider:
         except Exception as e:
             logger.warning(f"History API fetch failed for {symbol}: {e}")
         
+        if refresh:
+            raise RefreshFailed(f"Refresh of {cache_key} failed")
+        
         # Fallback to mock data
         mock_history = self._generate_mock_history_data(symbol, days)
         result = {
@@ -213,12 +294,40 @@ class SimpleCryptoProvider:
         return {"status": "error", "data": [], "message": "No trending data available"}
     
     async def _fetch_simple_crypto_data(self, symbol: str) -> Optional[Dict[str, Any]]:
-        """Simple fetch without SSL verification"""
+        """Simple fetch without SSL verification, hedged across CoinGecko and the exchanges"""
+        if not self.hedging_enabled or not self.failover_providers:
+            data = await self._fetch_simple_crypto_batch([symbol])
+            return data.get(symbol) if data else None
+        
+        candidates = [('coingecko', lambda: self._fetch_coingecko_batch([symbol]))]
+        candidates += [(provider.provider_id, lambda provider=provider: self._fetch_adapter_quotes(provider, [symbol]))
+                       for provider in self.failover_providers]
+        limiters = {'coingecko': self.rate_limiter}
+        limiters.update((provider.provider_id, provider.rate_limiter) for provider in self.failover_providers)
+        
+        # Only call providers that can answer without waiting on their rate limit or a cooldown
+        source, data = await self.hedger.fetch(
+            candidates,
+            validate=lambda quotes: bool(quotes) and symbol in quotes,
+            budget=lambda name: limiters[name].expected_wait() <= 1e-9
+        )
+        return data.get(symbol) if data else None
+    
+    async def _fetch_simple_crypto_batch(self, symbols: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Fetch many coins with one simple/price request, failing over to the exchanges (None if all failed)"""
+        results = await self._fetch_coingecko_batch(symbols)
+        if results is None:
+            results = await self._fetch_failover_batch(symbols)
+        return results
+    
+    async def _fetch_coingecko_batch(self, symbols: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """One simple/price request (None if it failed or CoinGecko is cooling down)"""
+        if not self._acquire_coingecko():
+            return None
         try:
-            # Use requests instead of aiohttp to avoid SSL issues
             url = f"https://api.coingecko.com/api/v3/simple/price"
             params = {
-                'ids': symbol.lower(),
+                'ids': ','.join(symbol.lower() for symbol in symbols),
                 'vs_currencies': 'usd',
                 'include_24hr_change': 'true',
                 'include_market_cap': 'true',
@@ -226,29 +335,86 @@ class SimpleCryptoProvider:
             }
             
             # Disable SSL verification
-            response = requests.get(url, params=params, timeout=self.timeout, verify=False)
-            if response.status_code == 200:
-                data = response.json()
-                if symbol.lower() in data:
-                    crypto_data = data[symbol.lower()]
-                    return {
-                        "id": symbol.lower(),
-                        "symbol": symbol.upper(),
-                        "name": symbol.title(),
-                        "current_price": crypto_data.get('usd', 0),
-                        "price_change_percentage_24h": crypto_data.get('usd_24h_change', 0),
-                        "market_cap": crypto_data.get('usd_market_cap', 0),
-                        "total_volume": crypto_data.get('usd_24h_vol', 0),
-                        "last_updated": datetime.now().isoformat(),
-                        "source": "coingecko"
-                    }
+            status, data = await self.http.get_json(url, params=params, timeout=self.timeout,
+                                                    ssl_context=ssl_context, rate_limiter=self.rate_limiter)
+            if status == 200:
+                results = {}
+                for symbol in symbols:
+                    if symbol.lower() in data:
+                        crypto_data = data[symbol.lower()]
+                        results[symbol] = {
+                            "id": symbol.lower(),
+                            "symbol": symbol.upper(),
+                            "name": symbol.title(),
+                            "current_price": crypto_data.get('usd', 0),
+                            "price_change_percentage_24h": crypto_data.get('usd_24h_change', 0),
+                            "market_cap": crypto_data.get('usd_market_cap', 0),
+                            "total_volume": crypto_data.get('usd_24h_vol', 0),
+                            "last_updated": datetime.now().isoformat(),
+                            "source": "coingecko"
+                        }
+                return results
         except Exception as e:
-            logger.warning(f"Simple crypto fetch failed for {symbol}: {e}")
+            logger.warning(f"Simple crypto fetch failed for {', '.join(symbols)}: {e}")
         
         return None
     
+    def _acquire_coingecko(self) -> bool:
+        """
+        Take a CoinGecko token without waiting
+        
+        An empty budget or a server cooldown returns False so the caller fails
+        over to the exchanges or serves stale data instead of pinning the request.
+        """
+        if self.rate_limiter.try_acquire():
+            return True
+        if self.rate_limiter.is_cooling_down():
+            logger.debug(f"CoinGecko cooling down for {self.rate_limiter.cooldown_remaining():.0f}s, skipping")
+        else:
+            logger.debug(f"CoinGecko budget spent for {self.rate_limiter.expected_wait():.1f}s, skipping")
+        return False
+    
+    async def _fetch_failover_batch(self, symbols: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Quotes from the exchange adapters, skipping any that are cooling down"""
+        results = {}
+        remaining = list(symbols)
+        for provider in self.failover_providers:
+            if not remaining:
+                break
+            if provider.is_cooling_down():
+                logger.debug(f"{provider.provider_id} cooling down for {provider.cooldown_remaining():.0f}s, skipping")
+                continue
+            results.update(await self._fetch_adapter_quotes(provider, remaining))
+            remaining = [symbol for symbol in remaining if symbol not in results]
+        
+        return results or None
+    
+    async def _fetch_adapter_quotes(self, provider, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Quotes from one exchange adapter in this provider's format"""
+        try:
+            quotes = await provider.fetch_batch_quotes(symbols)
+        except Exception as e:
+            logger.warning(f"Failover to {provider.provider_id} failed: {e}")
+            return {}
+        return {
+            symbol: {
+                "id": symbol.lower(),
+                "symbol": symbol.upper(),
+                "name": symbol.title(),
+                "current_price": quote.get('price', 0),
+                "price_change_percentage_24h": quote.get('price_change_percentage_24h') or 0,
+                "market_cap": quote.get('market_cap') or 0,
+                "total_volume": quote.get('volume_24h') or 0,
+                "last_updated": quote.get('last_updated', datetime.now().isoformat()),
+                "source": provider.provider_id
+            }
+            for symbol, quote in quotes.items()
+        }
+    
     async def _fetch_top100_data(self) -> Optional[List[Dict[str, Any]]]:
         """Fetch top 100 without SSL verification"""
+        if not self._acquire_coingecko():
+            return None
         try:
             url = "https://api.coingecko.com/api/v3/coins/markets"
             params = {
@@ -261,9 +427,9 @@ class SimpleCryptoProvider:
             }
             
             # Disable SSL verification
-            response = requests.get(url, params=params, timeout=self.timeout, verify=False)
-            if response.status_code == 200:
-                data = response.json()
+            status, data = await self.http.get_json(url, params=params, timeout=self.timeout,
+                                                    ssl_context=ssl_context, rate_limiter=self.rate_limiter)
+            if status == 200:
                 formatted_data = []
                 
                 for crypto in data:
@@ -291,6 +457,8 @@ class SimpleCryptoProvider:
     
     async def _fetch_crypto_history(self, symbol: str, days: int) -> Optional[List[Dict[str, Any]]]:
         """Fetch history without SSL verification"""
+        if not self._acquire_coingecko():
+            return None
         try:
             url = f"https://api.coingecko.com/api/v3/coins/{symbol.lower()}/market_chart"
             params = {
@@ -299,9 +467,9 @@ class SimpleCryptoProvider:
             }
             
             # Disable SSL verification
-            response = requests.get(url, params=params, timeout=self.timeout, verify=False)
-            if response.status_code == 200:
-                data = response.json()
+            status, data = await self.http.get_json(url, params=params, timeout=self.timeout,
+                                                    ssl_context=ssl_context, rate_limiter=self.rate_limiter)
+            if status == 200:
                 prices = data.get('prices', [])
                 volumes = data.get('total_volumes', [])
                 
@@ -404,19 +572,77 @@ class SimpleCryptoProvider:
             "server": "simple-crypto-provider",
             "timestamp": datetime.now().isoformat(),
             "cache_size": len(self.cache),
-            "features": ["mock_fallback", "ssl_disabled", "simple_caching"]
+            "request_coalescing": self.single_flight.get_stats(),
+            "hedging": self.hedger.get_stats(),
+            "features": ["mock_fallback", "ssl_disabled", "simple_caching", "stale_while_revalidate",
+                         "provider_failover", "hedged_requests"]
+        }
+    
+    async def get_provider_status(self) -> Dict[str, Any]:
+        """Availability of CoinGecko and the failover exchanges, including cooldowns"""
+        cooldown = self.rate_limiter.cooldown_remaining()
+        providers = [{
+            "id": "coingecko",
+            "name": "CoinGecko",
+            "status": "cooling_down" if cooldown > 0 else "available",
+            "cooldown_remaining_seconds": round(cooldown, 1),
+            "cooldown_reason": self.rate_limiter.block_reason if cooldown > 0 else None,
+            "rate_limit": self.rate_limiter.get_stats()
+        }]
+        providers.extend(provider.get_status() for provider in self.failover_providers)
+        
+        cooling_count = sum(1 for provider in providers if provider["status"] == "cooling_down")
+        return {
+            "providers": providers,
+            "healthy_count": len(providers) - cooling_count,
+            "cooling_count": cooling_count,
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    async def get_provider_usage(self) -> Dict[str, Any]:
+        """Rate limit budgets and throttling counts per provider"""
+        rate_limits = get_rate_limiter_stats()
+        return {
+            "rate_limits": rate_limits,
+            "summary": {
+                "providers": len(rate_limits),
+                "requests": sum(stats["acquired"] for stats in rate_limits.values()),
+                "server_throttles": sum(stats["server_throttles"] for stats in rate_limits.values()),
+                "cooldown_rejections": sum(stats["cooldown_rejections"] for stats in rate_limits.values()),
+                "cooling_down": [name for name, stats in rate_limits.items() if stats["blocked_for_seconds"] > 0]
+            },
+            "timestamp": datetime.now().isoformat()
         }
     
     async def get_crypto_batch(self, symbols: List[str]) -> Dict[str, Any]:
-        """Get batch crypto data"""
+        """Get batch crypto data: cached coins are served as is, the rest in one request"""
         results = {}
-        for symbol in symbols:
-            try:
-                data = await self.get_crypto_data(symbol)
-                if data.get("status") == "success":
-                    results[symbol] = data["data"]
-            except Exception as e:
-                logger.warning(f"Failed to fetch {symbol}: {e}")
+        missing = []
+        for symbol in dict.fromkeys(symbols):
+            cache_key = f"crypto_{symbol}"
+            if self._is_cache_valid(cache_key):
+                results[symbol] = self.cache[cache_key]["data"]
+            else:
+                missing.append(symbol)
+        
+        if missing:
+            batch_key = "crypto_batch:" + ",".join(sorted(missing))
+            fetched = await self.single_flight.do(batch_key, self._fetch_simple_crypto_batch, missing)
+            
+            for symbol in missing:
+                cache_key = f"crypto_{symbol}"
+                if fetched and symbol in fetched:
+                    self._cache_data(cache_key, {
+                        "status": "success",
+                        "data": fetched[symbol],
+                        "timestamp": datetime.now().isoformat()
+                    })
+                    results[symbol] = fetched[symbol]
+                elif cache_key in self.cache:
+                    # A stale quote beats mock data
+                    results[symbol] = self.cache[cache_key]["data"]
+                else:
+                    results[symbol] = self._generate_mock_crypto_data(symbol)
         
         return {
             "status": "success",
@@ -94,6 +94,12 @@ class CryptoMultiSource:
                 self.logger.warning(f"Circuit breaker is OPEN for {provider_id}, skipping.")
                 continue
             
+            # A provider throttled by the server is skipped until its Retry-After passes, not waited on
+            provider_instance = self.provider_factory.get_provider(provider_id)
+            if provider_instance is not None and provider_instance.is_cooling_down():
+                self.logger.info(f"COOLDOWN for {provider_id} ({provider_instance.cooldown_remaining():.0f}s left), skipping.")
+                continue
+            
             try:
                 if not await self.rate_limiter.check_limit(provider_id):
                     self.logger.warning(f"RATE LIMIT for {provider_id}, skipping.")
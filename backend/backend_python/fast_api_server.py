@@ -61,10 +61,9 @@ def get_fast_stock_data(symbol):
     if cached_data:
         return cached_data
     
-    # Fallback to full provider
+    # Fallback to the provider's hedged single-quote path
     try:
-        data = provider.get_comprehensive_stock_data(symbol)
-        return data.get('primary_data')
+        return provider.get_stock_quote(symbol)
     except:
         return None
 
@@ -0,0 +1,305 @@
+"""
+Hedged Requests
+===============
+
+Races redundant providers for the same answer instead of trying them one
+after another:
+- The primary provider is called first
+- If it has not answered within its own p90 latency, the next provider is
+  fired as a hedge; a provider that fails is replaced immediately
+- The first valid answer wins and the other calls are cancelled
+- Every call is checked against the provider's budget and the share of
+  hedged requests stays under a cap, so free-tier quotas hold
+- Metrics on hedge rate, backup wins and tail latency
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(samples, q: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LatencyTracker:
+    """
+    Recent latencies per provider (safe across threads)
+    """
+
+    def __init__(self, window: int = 100, min_samples: int = 5):
+        """
+        Args:
+            window: Latencies kept per provider
+            min_samples: Samples needed before percentiles are trusted
+        """
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            if name not in self._samples:
+                self._samples[name] = deque(maxlen=self.window)
+            self._samples[name].append(seconds)
+
+    def snapshot(self, name: str) -> List[float]:
+        """Copy of a provider's samples, safe to sort while other threads record"""
+        with self._lock:
+            return list(self._samples.get(name, ()))
+
+    def percentile(self, name: str, q: float, default: Optional[float] = None) -> Optional[float]:
+        """q-th latency percentile of a provider (default until min_samples are in)"""
+        samples = self.snapshot(name)
+        if len(samples) < self.min_samples:
+            return default
+        return _percentile(samples, q)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshots = {name: list(samples) for name, samples in self._samples.items() if samples}
+        return {
+            name: {
+                'samples': len(samples),
+                'p50': round(_percentile(samples, 0.5), 4),
+                'p90': round(_percentile(samples, 0.9), 4)
+            }
+            for name, samples in snapshots.items()
+        }
+
+
+class HedgedRequester:
+    """
+    Fetches from an ordered list of interchangeable providers with hedging
+    """
+
+    def __init__(self, name: str = "default", default_delay: float = 1.0, min_delay: float = 0.05,
+                 max_delay: float = 5.0, max_hedge_ratio: float = 0.25, max_workers: int = 8):
+        """
+        Args:
+            name: Label for logs and stats
+            default_delay: Hedge delay for a provider without enough latency samples
+            min_delay / max_delay: Bounds on the p90-based hedge delay
+            max_hedge_ratio: Largest share of requests allowed to fire hedges
+            max_workers: Threads for blocking providers (fetch_sync)
+        """
+        self.name = name
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.max_hedge_ratio = max_hedge_ratio
+        self.max_workers = max_workers
+        self.latency = LatencyTracker()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._request_latencies: Deque[float] = deque(maxlen=500)
+        # fetch_sync callers on different threads share the stats and latency samples
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'hedged_requests': 0, 'hedges_fired': 0, 'failovers': 0,
+                      'backup_wins': 0, 'budget_denied': 0, 'ratio_denied': 0, 'cancelled': 0,
+                      'all_failed': 0, 'estimated_savings_seconds': 0.0}
+
+    def hedge_delay(self, name: str) -> float:
+        """How long a provider gets before a hedge is fired: its p90 latency"""
+        p90 = self.latency.percentile(name, 0.9, self.default_delay)
+        return min(self.max_delay, max(self.min_delay, p90))
+
+    async def fetch(self, candidates: Sequence[Tuple[str, Callable[[], Awaitable[Any]]]],
+                    validate: Callable[[Any], bool] = bool,
+                    budget: Optional[Callable[[str], bool]] = None) -> Tuple[Optional[str], Any]:
+        """
+        Get the first valid answer from the candidates
+
+        Args:
+            candidates: (provider name, coroutine function) in priority order
+            validate: Whether a provider's answer is usable
+            budget: Whether a provider may be called right now (consulted, and
+                may spend quota, before every call); providers without
+                budget are skipped
+
+        Returns:
+            (winning provider, answer), or (None, None) if every provider failed
+        """
+        self._count('requests')
+        started = time.monotonic()
+        queue = list(candidates)
+        pending: Dict[asyncio.Task, Tuple[str, float]] = {}
+        primary = None
+        hedged = False
+        winner, answer = None, None
+
+        def launch() -> Optional[str]:
+            """Call the next candidate that has budget (None if none has)"""
+            if self._next_within_budget(queue, budget) is None:
+                queue.clear()
+                return None
+            name, func = queue.pop(0)
+            task = asyncio.ensure_future(func())
+            pending[task] = (name, time.monotonic())
+            return name
+
+        def next_hedge_at() -> Optional[float]:
+            if not queue:
+                return None
+            # The newest call sets the clock: it gets its own p90 before the next hedge
+            name, launched = max(pending.values(), key=lambda item: item[1])
+            return launched + self.hedge_delay(name)
+
+        def collect(done) -> int:
+            """Record finished calls, keep the first valid answer, count the failures"""
+            nonlocal winner, answer
+            failed = 0
+            for task in done:
+                name, launched = pending.pop(task)
+                self.latency.record(name, time.monotonic() - launched)
+                try:
+                    value = task.result()
+                except Exception as e:
+                    logger.debug(f"Hedged {self.name} call to {name} failed: {e}")
+                    value = None
+                if winner is None and validate(value):
+                    winner, answer = name, value
+                else:
+                    failed += 1
+            return failed
+
+        try:
+            primary = launch()
+            hedge_blocked = False
+            while pending:
+                hedge_at = None if hedge_blocked else next_hedge_at()
+                timeout = max(0.0, hedge_at - time.monotonic()) if hedge_at is not None else None
+                done, _ = await asyncio.wait(list(pending), timeout=timeout,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                failed = collect(done)
+                if winner is not None:
+                    break
+
+                if not done:
+                    # The newest call overran its p90: fire a hedge if quota allows
+                    name = launch() if self._hedge_allowed(hedged) else None
+                    if name is None:
+                        hedge_blocked = True
+                        continue
+                    hedged = True
+                    self._count('hedges_fired')
+                    logger.debug(f"Hedged {self.name}: fired {name} after {time.monotonic() - started:.2f}s")
+                    continue
+
+                # Replace failed calls straight away; that is failover, not hedging
+                for _ in range(failed):
+                    if queue and launch() is not None:
+                        hedge_blocked = False
+                        self._count('failovers')
+        finally:
+            for task, (name, launched) in pending.items():
+                task.cancel()
+                self._count('cancelled')
+                # A cancelled call took at least this long; keeps slow providers' p90 honest
+                self.latency.record(name, time.monotonic() - launched)
+
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self._request_latencies.append(elapsed)
+        if hedged:
+            self._count('hedged_requests')
+        if winner is None:
+            self._count('all_failed')
+        elif winner != primary:
+            self._count('backup_wins')
+            if hedged:
+                primary_p95 = self.latency.percentile(primary, 0.95)
+                if primary_p95:
+                    self._count('estimated_savings_seconds', max(0.0, primary_p95 - elapsed))
+        return winner, answer
+
+    async def fetch_blocking(self, candidates: Sequence[Tuple[str, Callable[[], Any]]],
+                             validate: Callable[[Any], bool] = bool,
+                             budget: Optional[Callable[[str], bool]] = None) -> Tuple[Optional[str], Any]:
+        """
+        fetch() for blocking providers, awaited from async code
+
+        Each provider runs on a worker thread; a losing call cannot be
+        interrupted, so it finishes in the background and is discarded.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix=f"hedge-{self.name}")
+            executor = self._executor
+        loop = asyncio.get_running_loop()
+        return await self.fetch(
+            [(name, lambda func=func: loop.run_in_executor(executor, func)) for name, func in candidates],
+            validate, budget
+        )
+
+    def fetch_sync(self, candidates: Sequence[Tuple[str, Callable[[], Any]]],
+                   validate: Callable[[Any], bool] = bool,
+                   budget: Optional[Callable[[str], bool]] = None) -> Tuple[Optional[str], Any]:
+        """
+        fetch_blocking() from synchronous code
+
+        Raises:
+            RuntimeError: called from a thread with a running event loop;
+                await fetch_blocking() there instead
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.fetch_blocking(candidates, validate, budget))
+        raise RuntimeError("fetch_sync() called from a running event loop; await fetch_blocking() instead")
+
+    def _count(self, stat: str, amount: float = 1):
+        with self._lock:
+            self.stats[stat] += amount
+
+    def _hedge_allowed(self, already_hedged: bool) -> bool:
+        """Cap the share of requests that fire hedges (extra hedges on a hedged request are free)"""
+        if already_hedged:
+            return True
+        with self._lock:
+            if self.stats['hedged_requests'] >= self.max_hedge_ratio * self.stats['requests']:
+                self.stats['ratio_denied'] += 1
+                return False
+        return True
+
+    def _next_within_budget(self, queue: List[Tuple[str, Any]],
+                            budget: Optional[Callable[[str], bool]]) -> Optional[str]:
+        """Drop candidates that are out of budget from the front of the queue"""
+        while queue:
+            name = queue[0][0]
+            if budget is None or budget(name):
+                return name
+            queue.pop(0)
+            self._count('budget_denied')
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hedge rate, backup wins, end-to-end latency percentiles and per-provider latency"""
+        with self._lock:
+            stats = dict(self.stats)
+            latencies = list(self._request_latencies)
+        requests = stats['requests']
+        return {
+            'name': self.name,
+            **stats,
+            'estimated_savings_seconds': round(stats['estimated_savings_seconds'], 3),
+            'hedge_rate': round(stats['hedged_requests'] / requests * 100, 1) if requests else 0.0,
+            'backup_win_rate': round(stats['backup_wins'] / requests * 100, 1) if requests else 0.0,
+            'latency': {
+                'p50': round(_percentile(latencies, 0.5), 4) if latencies else None,
+                'p95': round(_percentile(latencies, 0.95), 4) if latencies else None,
+                'p99': round(_percentile(latencies, 0.99), 4) if latencies else None
+            },
+            'providers': {name: {**stats, 'hedge_delay': round(self.hedge_delay(name), 4)}
+                          for name, stats in self.latency.get_stats().items()}
+        }
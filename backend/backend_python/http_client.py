@@ -0,0 +1,256 @@
+"""
+Shared Async HTTP Client
+========================
+
+Process-wide aiohttp connection pool instead of a session per call:
+- One TCPConnector with total and per-host limits, keep-alive and DNS cache
+- Named sessions (default, crypto_providers, sentiment, ...) drawing from it
+- Pool utilisation metrics (in-flight, queued, new vs reused connections)
+- Created in the FastAPI lifespan and closed on shutdown
+"""
+
+import asyncio
+import logging
+import ssl
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import aiohttp
+import certifi
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+class SessionRegistry:
+    """
+    Named aiohttp sessions sharing one pooled connector
+    """
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 10,
+                 dns_cache_ttl: int = 300, keepalive_timeout: float = 30):
+        """
+        Args:
+            limit: Open connections across all hosts
+            limit_per_host: Open connections to any single host
+            dns_cache_ttl: Seconds a resolved address is reused
+            keepalive_timeout: Seconds an idle connection stays open for reuse
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+
+        self._connector: Optional[aiohttp.TCPConnector] = None
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        self._lock = asyncio.Lock()
+        self.metrics: Dict[str, Dict[str, Any]] = {}
+
+    async def get_session(self, name: str = "default", timeout: float = 30,
+                          headers: Optional[Dict[str, str]] = None) -> aiohttp.ClientSession:
+        """
+        Get a named session, creating it (and the shared connector) on first use
+
+        Args:
+            name: Session name; metrics are reported per name
+            timeout: Default total timeout for the session's requests
+            headers: Default headers for the session (only applied on creation)
+        """
+        session = self._sessions.get(name)
+        if session is not None and not session.closed:
+            return session
+
+        async with self._lock:
+            session = self._sessions.get(name)
+            if session is None or session.closed:
+                if self._connector is None or self._connector.closed:
+                    self._connector = aiohttp.TCPConnector(
+                        ssl=ssl.create_default_context(cafile=certifi.where()),
+                        limit=self.limit,
+                        limit_per_host=self.limit_per_host,
+                        ttl_dns_cache=self.dns_cache_ttl,
+                        use_dns_cache=True,
+                        keepalive_timeout=self.keepalive_timeout
+                    )
+                session = aiohttp.ClientSession(
+                    connector=self._connector,
+                    connector_owner=False,  # Closing one session must not drop the shared pool
+                    timeout=aiohttp.ClientTimeout(total=timeout),
+                    headers={'User-Agent': DEFAULT_USER_AGENT, **(headers or {})},
+                    trace_configs=[self._trace_config(name)]
+                )
+                self._sessions[name] = session
+                self._metrics(name)['sessions_created'] += 1
+        return session
+
+    @asynccontextmanager
+    async def session(self, name: str = "default", timeout: float = 30) -> AsyncIterator[aiohttp.ClientSession]:
+        """Drop-in for `async with aiohttp.ClientSession() as session` that leaves the pool open"""
+        yield await self.get_session(name, timeout)
+
+    async def close(self):
+        """Close every session and the shared connector"""
+        for session in self._sessions.values():
+            if not session.closed:
+                await session.close()
+        self._sessions.clear()
+        if self._connector is not None and not self._connector.closed:
+            await self._connector.close()
+        self._connector = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool utilisation across all sessions and per session name"""
+        in_flight = sum(m['in_flight'] for m in self.metrics.values())
+        created = sum(m['connections_created'] for m in self.metrics.values())
+        reused = sum(m['connections_reused'] for m in self.metrics.values())
+        return {
+            'open': self._connector is not None and not self._connector.closed,
+            'limit': self.limit,
+            'limit_per_host': self.limit_per_host,
+            'dns_cache_ttl': self.dns_cache_ttl,
+            'keepalive_timeout': self.keepalive_timeout,
+            'in_flight': in_flight,
+            'utilisation': round(in_flight / self.limit, 3) if self.limit else None,
+            'connections_created': created,
+            'connections_reused': reused,
+            'reuse_rate': round(reused / (created + reused) * 100, 1) if created + reused else 0.0,
+            'sessions': {name: dict(m) for name, m in self.metrics.items()}
+        }
+
+    def _metrics(self, name: str) -> Dict[str, Any]:
+        if name not in self.metrics:
+            self.metrics[name] = {
+                'sessions_created': 0, 'requests': 0, 'errors': 0, 'in_flight': 0,
+                'peak_in_flight': 0, 'connections_created': 0, 'connections_reused': 0,
+                'queued': 0, 'queue_wait_seconds': 0.0, 'dns_cache_hits': 0, 'dns_cache_misses': 0
+            }
+        return self.metrics[name]
+
+    def _trace_config(self, name: str) -> aiohttp.TraceConfig:
+        """Count requests and connection pool events for one named session"""
+        metrics = self._metrics(name)
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            metrics['requests'] += 1
+            metrics['in_flight'] += 1
+            metrics['peak_in_flight'] = max(metrics['peak_in_flight'], metrics['in_flight'])
+
+        async def on_request_end(session, ctx, params):
+            metrics['in_flight'] -= 1
+
+        async def on_request_exception(session, ctx, params):
+            metrics['in_flight'] -= 1
+            metrics['errors'] += 1
+
+        async def on_connection_create_end(session, ctx, params):
+            metrics['connections_created'] += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            metrics['connections_reused'] += 1
+
+        async def on_connection_queued_start(session, ctx, params):
+            # The pool (or the per-host limit) is full; the request waits for a slot
+            metrics['queued'] += 1
+            ctx.queued_at = time.perf_counter()
+
+        async def on_connection_queued_end(session, ctx, params):
+            metrics['queue_wait_seconds'] += time.perf_counter() - ctx.queued_at
+
+        async def on_dns_cache_hit(session, ctx, params):
+            metrics['dns_cache_hits'] += 1
+
+        async def on_dns_cache_miss(session, ctx, params):
+            metrics['dns_cache_misses'] += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_end)
+        trace.on_request_exception.append(on_request_exception)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace.on_connection_queued_start.append(on_connection_queued_start)
+        trace.on_connection_queued_end.append(on_connection_queued_end)
+        trace.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace
+
+
+class AsyncHTTPClient:
+    """
+    JSON GET helper over one named session of a SessionRegistry
+    """
+
+    def __init__(self, registry: Optional[SessionRegistry] = None, name: str = "default",
+                 timeout: float = 10):
+        """
+        Args:
+            registry: Pool to draw from (the process-wide registry by default)
+            name: Session name within the registry
+            timeout: Default total timeout per request in seconds
+        """
+        self.registry = registry or session_registry
+        self.name = name
+        self.timeout = timeout
+        self.stats = {'requests': 0, 'errors': 0}
+
+    async def start(self):
+        """Open the session (called from the app lifespan)"""
+        await self.get_session()
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Get the shared session, creating it on first use"""
+        return await self.registry.get_session(self.name, self.timeout)
+
+    async def close(self):
+        """Close the registry this client draws from"""
+        await self.registry.close()
+
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None,
+                       headers: Optional[Dict[str, str]] = None,
+                       timeout: Optional[float] = None,
+                       ssl_context: Optional[ssl.SSLContext] = None,
+                       rate_limiter=None) -> Tuple[int, Optional[Any]]:
+        """
+        GET a JSON resource
+
+        Args:
+            ssl_context: Overrides the session's certifi context for this request
+            rate_limiter: AsyncRateLimiter fed the response's rate-limit headers
+
+        Returns:
+            (HTTP status, parsed body or None if the status was not 200)
+
+        Raises:
+            aiohttp.ClientError / asyncio.TimeoutError on network failures
+        """
+        session = await self.get_session()
+        self.stats['requests'] += 1
+        options = {}
+        if timeout:
+            options['timeout'] = aiohttp.ClientTimeout(total=timeout)
+        if ssl_context is not None:
+            options['ssl'] = ssl_context
+        try:
+            async with session.get(url, params=params, headers=headers, **options) as response:
+                if rate_limiter is not None:
+                    rate_limiter.update_from_headers(response.headers, response.status)
+                if response.status != 200:
+                    return response.status, None
+                return response.status, await response.json(content_type=None)
+        except Exception:
+            self.stats['errors'] += 1
+            raise
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get request counts and the pool statistics of the underlying registry"""
+        return {
+            **self.stats,
+            'pool': self.registry.get_stats()
+        }
+
+
+# Process-wide pool and the default client over it, opened and closed by the app lifespan
+session_registry = SessionRegistry()
+http_client = AsyncHTTPClient(session_registry)
@@ -44,6 +44,9 @@ except ImportError:
     OPENROUTER_CONFIG = {"api_key": ""}
     SECURITY_CONFIG = {"allowed_origins": ["http://localhost:3000", "http://127.0.0.1:3000"]}
 
+# Shared async HTTP client over the process-wide aiohttp connection pool
+from http_client import http_client, session_registry
+
 # Import OpenRouter AI
 try:
     from openrouter_ai import FinancialAI, AIModel
@@ -84,6 +87,18 @@ except ImportError as e:
     print(f"Multi-provider data service not available: {e}")
     MULTI_PROVIDER_AVAILABLE = False
 
+# Import background market data refresher
+try:
+    from market_refresher import build_market_refresher
+    try:
+        from config import DEFAULT_STOCK_SYMBOLS
+    except ImportError:
+        DEFAULT_STOCK_SYMBOLS = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA"]
+    REFRESHER_AVAILABLE = os.getenv("MARKET_REFRESHER_ENABLED", "true").lower() != "false"
+except ImportError as e:
+    print(f"Market data refresher not available: {e}")
+    REFRESHER_AVAILABLE = False
+
 # Import helper for mock data when AI_AVAILABLE is enabled but real data unavailable
 try:
     # The `create_mock_crypto_data` utility lives in the legacy `main_crypto` module.
@@ -104,6 +119,24 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Background refresher keeping the hot watch-list warm (created in lifespan)
+market_refresher = None
+
+# NSE snapshots older than this are refetched on request
+NSE_SNAPSHOT_MAX_AGE = 300
+
+async def get_nse_data_cached() -> Dict[str, Any]:
+    """Return the refresher's NSE snapshot, scraping in a worker thread only if it is missing or old."""
+    if market_refresher is not None:
+        snapshot = market_refresher.get_snapshot('nse', NSE_SNAPSHOT_MAX_AGE)
+        if snapshot is not None:
+            return snapshot
+
+    result = await asyncio.to_thread(get_nse_stocks_data)
+    if market_refresher is not None and result.get('success'):
+        market_refresher.store_snapshot('nse', result)
+    return result
+
 # Global cache for Fear & Greed Index (valid for 50 minutes)
 fear_greed_cache: Dict[str, Any] = {
     "data": None,
@@ -122,10 +155,8 @@ async def get_fear_greed_from_cache_or_fetch() -> Dict[str, Any]:
 
     # Otherwise fetch fresh data
     try:
-        import requests
-        resp = requests.get("https://api.alternative.me/fng/", timeout=10)
-        if resp.status_code == 200:
-            payload = resp.json()
+        status, payload = await http_client.get_json("https://api.alternative.me/fng/", timeout=10)
+        if status == 200:
             if payload.get("data"):
                 fg_raw = payload["data"][0]
                 fear_greed_data = {
@@ -157,12 +188,28 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Crypto Analytics Hub - Engine Starting...")
     logger.info(f"   🔧 Crypto Provider: {'✅ Operational' if CRYPTO_AVAILABLE else '❌ Offline'}")
     logger.info(f"   🤖 AI Services: {'✅ Operational' if AI_AVAILABLE else '❌ Offline'}")
+    
+    await http_client.start()
+    
+    global market_refresher
+    if REFRESHER_AVAILABLE:
+        market_refresher = build_market_refresher(
+            crypto_provider=crypto_provider if CRYPTO_AVAILABLE else None,
+            multi_provider=multi_provider if MULTI_PROVIDER_AVAILABLE else None,
+            nse_fetch=get_nse_stocks_data if NSE_AVAILABLE else None,
+            stock_symbols=DEFAULT_STOCK_SYMBOLS
+        )
+        await market_refresher.start()
+    logger.info(f"   🔄 Background Refresher: {'✅ Operational' if market_refresher else '❌ Offline'}")
     logger.info("🌟 Engine Running Like a Well-Oiled Machine! 🌟")
     
     yield
     
     # Shutdown
     logger.info("🛑 Crypto Analytics Hub shutting down...")
+    if market_refresher is not None:
+        await market_refresher.stop()
+    await session_registry.close()
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -305,10 +352,6 @@ async def get_trending_crypto():
             raise HTTPException(status_code=503, detail="Crypto providers not available")
         
         # Direct approach - get top100 and return first 7 for trending
-        import requests
-        import json
-        from datetime import datetime
-        
         # Try to get fresh data from CoinGecko top100
         try:
             url = "https://api.coingecko.com/api/v3/coins/markets"
@@ -321,9 +364,8 @@ async def get_trending_crypto():
                 'price_change_percentage': '24h'
             }
             
-            resp = requests.get(url, params=params, timeout=10)
-            if resp.status_code == 200:
-                coingecko_data = resp.json()
+            status, coingecko_data = await http_client.get_json(url, params=params, timeout=10)
+            if status == 200:
                 
                 # Transform to expected format
                 trending_list = []
@@ -351,7 +393,7 @@ async def get_trending_crypto():
                     "provider_sources": ["coingecko_direct"]
                 }
             else:
-                logger.warning(f"CoinGecko trending failed: {resp.status_code}")
+                logger.warning(f"CoinGecko trending failed: {status}")
         except Exception as e:
             logger.warning(f"Direct CoinGecko call failed: {e}")
         
@@ -394,6 +436,9 @@ async def get_crypto_data(symbol: str):
         if not provider_response:
             raise HTTPException(status_code=404, detail=f"No data available for symbol: {symbol}")
         
+        if market_refresher is not None:
+            market_refresher.note_request('crypto', symbol)
+        
         # The upstream provider returns a wrapper with its own `status` and `data` keys.
         # We expose the inner `data` object directly under `data` so that the
         # frontend hooks (useCryptoData) receive the exact shape they expect
@@ -404,6 +449,8 @@ async def get_crypto_data(symbol: str):
             "data": crypto_payload,
             "timestamp": provider_response.get("timestamp", datetime.now().isoformat()),
             "source": crypto_payload.get("source"),
+            "data_age_seconds": provider_response.get("data_age_seconds"),
+            "cache_status": provider_response.get("cache_status"),
         }
     
     except Exception as e:
@@ -447,6 +494,8 @@ async def get_crypto_history(symbol: str, days: int = 30):
                 "days": days,
                 "data_points": len(history_list),
                 "timestamp": history_data.get("timestamp", datetime.now().isoformat()),
+                "data_age_seconds": history_data.get("data_age_seconds"),
+                "cache_status": history_data.get("cache_status"),
                 "status": "success"
             }
         else:
@@ -574,10 +623,9 @@ async def get_market_overview():
     try:
         logger.info("Fetching global market stats from CoinGecko")
 
-        import requests
-        resp = requests.get("https://api.coingecko.com/api/v3/global", timeout=10)
-        if resp.status_code == 200:
-            g = resp.json().get("data", {})
+        status, payload = await http_client.get_json("https://api.coingecko.com/api/v3/global", timeout=10)
+        if status == 200:
+            g = payload.get("data", {})
             total_mc_usd = g.get("total_market_cap", {}).get("usd", 0)
             total_vol_usd = g.get("total_volume", {}).get("usd", 0)
             btc_dom = g.get("market_cap_percentage", {}).get("btc", 0)
@@ -806,7 +854,7 @@ async def get_nse_stocks():
         if not NSE_AVAILABLE:
             raise HTTPException(status_code=503, detail="NSE scraper not available")
         
-        result = get_nse_stocks_data()
+        result = await get_nse_data_cached()
         return result
         
     except Exception as e:
@@ -834,7 +882,7 @@ async def get_nifty50_stocks():
         if not NSE_AVAILABLE:
             raise HTTPException(status_code=503, detail="NSE scraper not available")
         
-        result = get_nse_stocks_data()
+        result = await get_nse_data_cached()
         if result['success'] and 'data' in result and 'nifty50' in result['data']:
             return {
                 "success": True,
@@ -856,7 +904,7 @@ async def get_nse_top_gainers():
         if not NSE_AVAILABLE:
             raise HTTPException(status_code=503, detail="NSE scraper not available")
         
-        result = get_nse_stocks_data()
+        result = await get_nse_data_cached()
         if result['success'] and 'data' in result and 'top_gainers' in result['data']:
             return {
                 "success": True,
@@ -878,7 +926,7 @@ async def get_nse_top_losers():
         if not NSE_AVAILABLE:
             raise HTTPException(status_code=503, detail="NSE scraper not available")
         
-        result = get_nse_stocks_data()
+        result = await get_nse_data_cached()
         if result['success'] and 'data' in result and 'top_losers' in result['data']:
             return {
                 "success": True,
@@ -900,7 +948,7 @@ async def get_nse_indices():
         if not NSE_AVAILABLE:
             raise HTTPException(status_code=503, detail="NSE scraper not available")
         
-        result = get_nse_stocks_data()
+        result = await get_nse_data_cached()
         if result['success'] and 'data' in result and 'indices' in result['data']:
             return {
                 "success": True,
@@ -927,6 +975,8 @@ async def get_comprehensive_stock_data(symbol: str):
             raise HTTPException(status_code=503, detail="Multi-provider service not available")
         
         result = await multi_provider.get_stock_data(symbol)
+        if market_refresher is not None:
+            market_refresher.note_request('stock', symbol.upper())
         return result
         
     except Exception as e:
@@ -969,12 +1019,35 @@ async def get_comprehensive_crypto_data(symbol: str):
             raise HTTPException(status_code=503, detail="Multi-provider service not available")
         
         result = await multi_provider.get_crypto_data(symbol)
+        if market_refresher is not None:
+            market_refresher.note_request('multi_crypto', symbol.lower())
         return result
         
     except Exception as e:
         logger.error(f"Error fetching comprehensive crypto data for {symbol}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/data/cache/stats")
+async def get_data_cache_stats():
+    """Get multi-provider cache and request coalescing statistics"""
+    if not MULTI_PROVIDER_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Multi-provider service not available")
+    
+    return multi_provider.get_cache_stats()
+
+@app.get("/api/http/pool/stats")
+async def get_http_pool_stats():
+    """Get shared HTTP connection pool utilisation per session"""
+    return session_registry.get_stats()
+
+@app.get("/api/refresher/stats")
+async def get_refresher_stats():
+    """Get background refresh lag, data age and provider budget usage"""
+    if market_refresher is None:
+        raise HTTPException(status_code=503, detail="Market data refresher not running")
+    
+    return market_refresher.get_stats()
+
 @app.get("/api/data/search")
 async def search_all_symbols(
     q: str = Query(..., description="Search query"),
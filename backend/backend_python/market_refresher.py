@@ -0,0 +1,319 @@
+"""
+Market Data Refresher
+=====================
+
+Keeps the hot watch-list warm from one asyncio task so request handlers
+read caches instead of calling upstream APIs:
+- Tiers (top 100 crypto, NIFTY 50, default stocks, recently requested
+  symbols) refreshed at their own intervals, highest priority first
+- Per-provider request budgets so background work stays within free-tier quotas
+- Refresh lag and data age exposed as metrics
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RefreshJob:
+    key: str
+    tier: str
+    provider: str
+    refresh: Callable[[], Awaitable[Any]]
+    interval: float
+    cost: int = 1  # Upstream requests one refresh spends
+    next_due: float = 0.0
+    last_refreshed: Optional[float] = None
+    last_lag: float = 0.0
+    refreshes: int = 0
+    failures: int = 0
+    running: bool = False
+
+
+class MarketDataRefresher:
+    """
+    Priority scheduler for background cache refreshes
+    """
+
+    # Lower priority value runs first when jobs compete for budget
+    TIERS = {
+        'top100_crypto': {'priority': 0, 'interval': 90},
+        'nifty50': {'priority': 1, 'interval': 120},
+        'default_stocks': {'priority': 2, 'interval': 240},
+        'recent': {'priority': 3, 'interval': 90},
+    }
+
+    # Background requests per minute each provider may spend
+    DEFAULT_BUDGETS = {
+        'coingecko': 20,
+        'nse': 6,
+        'multi_provider': 60,
+        'yahoo': 30,
+    }
+
+    def __init__(self, budgets: Optional[Dict[str, int]] = None, max_concurrency: int = 4,
+                 tick: float = 1.0, recent_limit: int = 50, recent_window: float = 1800):
+        """
+        Args:
+            budgets: Requests per minute per provider (merged over DEFAULT_BUDGETS)
+            max_concurrency: Refreshes running at once
+            tick: Seconds between scheduling passes
+            recent_limit: Most recently requested symbols kept warm
+            recent_window: Seconds without a request before a recent symbol is dropped
+        """
+        self.budgets = {**self.DEFAULT_BUDGETS, **(budgets or {})}
+        self.max_concurrency = max_concurrency
+        self.tick = tick
+        self.recent_limit = recent_limit
+        self.recent_window = recent_window
+
+        self.jobs: Dict[str, RefreshJob] = {}
+        self.snapshots: Dict[str, Tuple[float, Any]] = {}  # For sources without their own cache
+        self._recent: OrderedDict = OrderedDict()  # job key -> last request time
+        self._recent_sources: Dict[str, Tuple[str, Callable[[str], Awaitable[Any]]]] = {}
+        self._usage: Dict[str, deque] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks: set = set()
+        self._runner: Optional[asyncio.Task] = None
+        self.started_at: Optional[float] = None
+        self.stats = {'passes': 0, 'refreshes': 0, 'failures': 0, 'deferred_for_budget': 0}
+
+    # Watch-list management
+    def add_job(self, key: str, tier: str, provider: str, refresh: Callable[[], Awaitable[Any]],
+                interval: Optional[float] = None, cost: int = 1) -> RefreshJob:
+        """Register (or replace) a refresh job; it is due immediately"""
+        job = RefreshJob(key=key, tier=tier, provider=provider, refresh=refresh,
+                         interval=interval or self.TIERS[tier]['interval'], cost=cost)
+        existing = self.jobs.get(key)
+        if existing is not None:
+            job.next_due, job.last_refreshed = existing.next_due, existing.last_refreshed
+        self.jobs[key] = job
+        return job
+
+    def remove_job(self, key: str):
+        self.jobs.pop(key, None)
+        self._recent.pop(key, None)
+
+    def register_recent_source(self, kind: str, provider: str,
+                               refresh: Callable[[str], Awaitable[Any]]):
+        """How to refresh a recently requested symbol of a given kind (e.g. 'crypto')"""
+        self._recent_sources[kind] = (provider, refresh)
+
+    def note_request(self, kind: str, symbol: str):
+        """Record a user request so the symbol is kept warm while it stays popular"""
+        if kind not in self._recent_sources:
+            return
+
+        key = f"{kind}:{symbol}"
+        self._recent[key] = time.time()
+        self._recent.move_to_end(key)
+
+        if key not in self.jobs:
+            provider, refresh = self._recent_sources[kind]
+            job = self.add_job(key, 'recent', provider, lambda: refresh(symbol))
+            # The request that brought it here just filled the cache
+            job.next_due = time.time() + job.interval
+
+        while len(self._recent) > self.recent_limit:
+            oldest, _ = self._recent.popitem(last=False)
+            self._drop_recent(oldest)
+
+    # Snapshots
+    def store_snapshot(self, name: str, data: Any):
+        self.snapshots[name] = (time.time(), data)
+
+    def get_snapshot(self, name: str, max_age: float) -> Optional[Any]:
+        """Latest snapshot for a source if it is younger than max_age seconds"""
+        entry = self.snapshots.get(name)
+        if entry is None or time.time() - entry[0] > max_age:
+            return None
+        return entry[1]
+
+    # Lifecycle
+    async def start(self):
+        """Start the scheduling loop on the running event loop"""
+        if self._runner is None:
+            self.started_at = time.time()
+            self._runner = asyncio.create_task(self._run())
+            logger.info(f"Market data refresher started with {len(self.jobs)} jobs")
+
+    async def stop(self):
+        """Stop scheduling and cancel refreshes still running"""
+        if self._runner is not None:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+            self._runner = None
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        logger.info("Market data refresher stopped")
+
+    async def _run(self):
+        while True:
+            try:
+                self.run_due()
+            except Exception as e:
+                logger.error(f"Refresher scheduling error: {e}")
+            await asyncio.sleep(self.tick)
+
+    def run_due(self) -> List[RefreshJob]:
+        """
+        Launch every due job the provider budgets allow, highest priority first
+
+        Returns:
+            The jobs launched in this pass
+        """
+        self.stats['passes'] += 1
+        now = time.time()
+        self._expire_recent(now)
+
+        due = [job for job in self.jobs.values() if not job.running and job.next_due <= now]
+        due.sort(key=lambda job: (self.TIERS[job.tier]['priority'], job.next_due))
+
+        launched = []
+        for job in due:
+            if not self._take_budget(job.provider, job.cost, now):
+                # Stays due; lower tiers on other providers can still run
+                self.stats['deferred_for_budget'] += 1
+                continue
+            job.running = True
+            job.last_lag = max(0.0, now - job.next_due) if job.last_refreshed is not None else 0.0
+            task = asyncio.create_task(self._execute(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            launched.append(job)
+        return launched
+
+    async def _execute(self, job: RefreshJob):
+        async with self._semaphore:
+            try:
+                await job.refresh()
+                job.last_refreshed = time.time()
+                job.refreshes += 1
+                job.failures = 0
+                self.stats['refreshes'] += 1
+                delay = job.interval
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.failures += 1
+                self.stats['failures'] += 1
+                # Back off a failing upstream instead of spending budget on it
+                delay = min(job.interval * 2 ** job.failures, job.interval * 10)
+                logger.warning(f"Background refresh of {job.key} failed ({job.failures}x): {e}")
+            finally:
+                job.running = False
+
+        job.next_due = time.time() + delay
+
+    def _take_budget(self, provider: str, cost: int, now: float) -> bool:
+        """Spend `cost` requests from the provider's sliding one-minute budget"""
+        limit = self.budgets.get(provider)
+        if limit is None:
+            return True
+
+        window = self._usage.setdefault(provider, deque())
+        while window and now - window[0] >= 60:
+            window.popleft()
+        if len(window) + cost > limit:
+            return False
+        window.extend([now] * cost)
+        return True
+
+    def _expire_recent(self, now: float):
+        while self._recent:
+            key, last_seen = next(iter(self._recent.items()))
+            if now - last_seen < self.recent_window:
+                break
+            self._recent.popitem(last=False)
+            self._drop_recent(key)
+
+    def _drop_recent(self, key: str):
+        job = self.jobs.get(key)
+        if job is not None and job.tier == 'recent':
+            del self.jobs[key]
+
+    # Metrics
+    def get_stats(self) -> Dict[str, Any]:
+        """Refresh lag, data age and budget use per tier and provider"""
+        now = time.time()
+        tiers = {}
+        for name, config in self.TIERS.items():
+            jobs = [job for job in self.jobs.values() if job.tier == name]
+            ages = [now - job.last_refreshed for job in jobs if job.last_refreshed is not None]
+            lags = [job.last_lag for job in jobs if job.last_refreshed is not None]
+            tiers[name] = {
+                'jobs': len(jobs),
+                'interval_seconds': config['interval'],
+                'warm': len(ages),
+                'refreshes': sum(job.refreshes for job in jobs),
+                'failing': sum(1 for job in jobs if job.failures),
+                'max_data_age_seconds': round(max(ages), 1) if ages else None,
+                'avg_refresh_lag_seconds': round(sum(lags) / len(lags), 2) if lags else None,
+                'max_refresh_lag_seconds': round(max(lags), 2) if lags else None,
+            }
+
+        budgets = {}
+        for provider, limit in self.budgets.items():
+            window = self._usage.get(provider, ())
+            used = sum(1 for t in window if now - t < 60)
+            budgets[provider] = {'per_minute': limit, 'used_last_minute': used}
+
+        return {
+            'running': self._runner is not None and not self._runner.done(),
+            'uptime_seconds': round(now - self.started_at, 1) if self.started_at else 0,
+            'jobs': len(self.jobs),
+            'in_progress': sum(1 for job in self.jobs.values() if job.running),
+            'recent_symbols': len(self._recent),
+            'tiers': tiers,
+            'budgets': budgets,
+            **self.stats,
+            'timestamp': datetime.now().isoformat()
+        }
+
+
+def build_market_refresher(crypto_provider=None, multi_provider=None,
+                           nse_fetch: Optional[Callable[[], Dict[str, Any]]] = None,
+                           stock_symbols: Optional[List[str]] = None,
+                           budgets: Optional[Dict[str, int]] = None) -> MarketDataRefresher:
+    """
+    Create a refresher with the standard watch-list
+
+    Args:
+        crypto_provider: SimpleCryptoProvider (top 100 and recently requested coins)
+        multi_provider: MultiDataProvider (default stocks and recently requested quotes)
+        nse_fetch: Blocking NSE snapshot function, run in a worker thread
+        stock_symbols: Stocks to keep warm (DEFAULT_STOCK_SYMBOLS)
+    """
+    refresher = MarketDataRefresher(budgets=budgets)
+
+    if crypto_provider is not None:
+        refresher.add_job('crypto:top100', 'top100_crypto', 'coingecko',
+                          crypto_provider.refresh_top100)
+        refresher.register_recent_source('crypto', 'coingecko', crypto_provider.refresh_crypto)
+
+    if nse_fetch is not None:
+        async def refresh_nse():
+            result = await asyncio.to_thread(nse_fetch)
+            if not result.get('success'):
+                raise RuntimeError(result.get('error', 'NSE fetch failed'))
+            refresher.store_snapshot('nse', result)
+
+        # index_data is called for NIFTY 50 and SENSEX
+        refresher.add_job('nse:nifty50', 'nifty50', 'nse', refresh_nse, cost=2)
+
+    if multi_provider is not None:
+        for symbol in stock_symbols or []:
+            refresher.add_job(f"stock:{symbol}", 'default_stocks', 'multi_provider',
+                              lambda symbol=symbol: multi_provider.refresh_stock(symbol))
+        refresher.register_recent_source('stock', 'multi_provider', multi_provider.refresh_stock)
+        refresher.register_recent_source('multi_crypto', 'multi_provider', multi_provider.refresh_crypto)
+
+    return refresher
@@ -15,15 +15,15 @@ Data Sources:
 """
 
 import asyncio
-import aiohttp
 import requests
 import logging
 from typing import Dict, List, Optional, Any, Union
 from datetime import datetime, timedelta
 import time
 import random
-import ssl
-import certifi
+
+from http_client import session_registry
+from single_flight import RefreshFailed, SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +33,11 @@ class MultiDataProvider:
     def __init__(self):
         self.session = None
         self.cache = {}
-        self.cache_ttl = 300  # 5 minutes
+        self.cache_ttl = 300  # 5 minutes (fresh)
+        self.cache_hard_ttl = 1500  # Stale quotes are served while revalidating up to 25 minutes
+        
+        # Concurrent cache misses for the same key share one upstream fetch
+        self.single_flight = SingleFlight("multi_provider")
         self.providers = {
             'alpaca': {
                 'base_url': 'https://data.alpaca.markets/v2',
@@ -115,26 +119,14 @@ class MultiDataProvider:
         }
         
     async def get_session(self):
-        """Get or create aiohttp session with SSL context"""
-        if self.session is None:
-            # Create SSL context with proper certificate verification
-            ssl_context = ssl.create_default_context(cafile=certifi.where())
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            timeout = aiohttp.ClientTimeout(total=10)
-            self.session = aiohttp.ClientSession(
-                timeout=timeout,
-                connector=connector,
-                headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
-            )
+        """Get the shared pooled aiohttp session"""
+        if self.session is None or self.session.closed:
+            self.session = await session_registry.get_session('multi_provider', timeout=10)
         return self.session
     
     async def close_session(self):
-        """Close aiohttp session"""
-        if self.session:
-            await self.session.close()
-            self.session = None
+        """Release the shared session (the pool itself is closed by session_registry)"""
+        self.session = None
     
     def get_cache_key(self, provider: str, symbol: str, data_type: str) -> str:
         """Generate cache key"""
@@ -157,6 +149,61 @@ class MultiDataProvider:
             return self.cache[cache_key][1]
         return None
     
+    async def get_or_load(self, cache_key: str, loader, *args) -> Dict[str, Any]:
+        """
+        Serve a cache entry with stale-while-revalidate
+        
+        Fresh entries (< cache_ttl) are returned as is. Stale entries
+        (< cache_hard_ttl) are returned immediately while one background
+        refresh per key runs. Anything older waits on a coalesced fetch.
+        """
+        if cache_key in self.cache:
+            cache_time, data = self.cache[cache_key]
+            age = time.time() - cache_time
+            if age < self.cache_ttl:
+                return self._with_cache_meta(data, age, 'fresh')
+            if age < self.cache_hard_ttl:
+                if self.single_flight.refresh(cache_key, loader, *args, cache_key, refresh=True):
+                    logger.info(f"Serving stale {cache_key} ({age:.0f}s old), refreshing in background")
+                return self._with_cache_meta(data, age, 'stale')
+        
+        try:
+            result = await self.single_flight.do(cache_key, loader, *args, cache_key)
+        except RefreshFailed:
+            # Joined a background refresh that failed; load again with the mock fallback
+            result = await self.single_flight.do(cache_key, loader, *args, cache_key)
+        return self._with_cache_meta(result, 0.0, 'miss')
+    
+    def _with_cache_meta(self, result: Dict[str, Any], age: float, status: str) -> Dict[str, Any]:
+        """Copy of a cached response annotated with its age"""
+        response = dict(result)
+        response['data_age_seconds'] = round(age, 1)
+        response['cache_status'] = status
+        return response
+    
+    async def refresh_stock(self, symbol: str) -> Dict[str, Any]:
+        """Refetch a stock quote into the cache (used by the background refresher)"""
+        symbol = symbol.upper()
+        cache_key = self.get_cache_key('stock', symbol, 'quote')
+        return await self.single_flight.do(cache_key, self._load_stock_data, symbol, cache_key, refresh=True)
+    
+    async def refresh_crypto(self, symbol: str) -> Dict[str, Any]:
+        """Refetch a crypto quote into the cache (used by the background refresher)"""
+        symbol = symbol.lower()
+        cache_key = self.get_cache_key('crypto', symbol, 'quote')
+        return await self.single_flight.do(cache_key, self._load_crypto_data, symbol, cache_key, refresh=True)
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get cache and request coalescing statistics"""
+        return {
+            'entries': len(self.cache),
+            'valid_entries': sum(1 for key in self.cache if self.is_cache_valid(key)),
+            'ttl_seconds': self.cache_ttl,
+            'hard_ttl_seconds': self.cache_hard_ttl,
+            'request_coalescing': self.single_flight.get_stats(),
+            'timestamp': datetime.now().isoformat()
+        }
+    
     async def fetch_with_retry(self, url: str, headers: Dict = None, params: Dict = None, max_retries: int = 3) -> Optional[Dict]:
         """Fetch data with retry logic and SSL handling"""
         session = await self.get_session()
@@ -265,10 +312,10 @@ class MultiDataProvider:
         """Get stock data from multiple providers with real data fallback"""
         symbol = symbol.upper()
         cache_key = self.get_cache_key('stock', symbol, 'quote')
-        cached = self.get_cache(cache_key)
-        if cached:
-            return cached
-        
+        return await self.get_or_load(cache_key, self._load_stock_data, symbol)
+    
+    async def _load_stock_data(self, symbol: str, cache_key: str, refresh: bool = False) -> Dict[str, Any]:
+        """Fetch a stock quote through the provider chain and cache it"""
         # First try to get real data from our curated database
         real_data = self.get_real_stock_data(symbol)
         if real_data:
@@ -302,6 +349,10 @@ class MultiDataProvider:
                 logger.error(f"Error with {provider} for {symbol}: {e}")
                 continue
         
+        if refresh:
+            # A failed revalidation leaves the cached quote alone; the refresher backs off on the error
+            raise RefreshFailed(f"Refresh of {cache_key} failed")
+        
         # Final fallback to realistic mock data
         fallback_data = {
             'success': True,
@@ -324,10 +375,10 @@ class MultiDataProvider:
         """Get crypto data from multiple providers with real data fallback"""
         symbol = symbol.lower()
         cache_key = self.get_cache_key('crypto', symbol, 'quote')
-        cached = self.get_cache(cache_key)
-        if cached:
-            return cached
-        
+        return await self.get_or_load(cache_key, self._load_crypto_data, symbol)
+    
+    async def _load_crypto_data(self, symbol: str, cache_key: str, refresh: bool = False) -> Dict[str, Any]:
+        """Fetch a crypto quote through the provider chain and cache it"""
         # First try to get real data from our curated database
         real_data = self.get_real_crypto_data(symbol)
         if real_data:
@@ -359,6 +410,10 @@ class MultiDataProvider:
                 logger.error(f"Error with {provider} for {symbol}: {e}")
                 continue
         
+        if refresh:
+            # A failed revalidation leaves the cached quote alone; the refresher backs off on the error
+            raise RefreshFailed(f"Refresh of {cache_key} failed")
+        
         # Final fallback to realistic mock data
         fallback_data = {
             'success': True,
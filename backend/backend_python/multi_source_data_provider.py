@@ -13,7 +13,6 @@ import numpy as np
 from datetime import datetime, timedelta
 import logging
 import sqlite3
-import json
 from typing import Dict, List, Optional, Any, Union
 import asyncio
 import aiohttp
@@ -25,6 +24,8 @@ from bs4 import BeautifulSoup
 import joblib
 import time
 
+from cache_codecs import CacheCodec
+
 logger = logging.getLogger(__name__)
 
 class CachedLimitedSession(CacheMixin, LimiterMixin, requests.Session):
@@ -39,6 +40,7 @@ class MultiSourceDataProvider:
     
     def __init__(self):
         self.cache_file = "market_data_cache.db"
+        self.codec = CacheCodec()
         self.session = CachedLimitedSession(
             limiter=Limiter(RequestRate(10, Duration.SECOND)),
             cache_name="market_cache",
@@ -81,6 +83,11 @@ class MultiSourceDataProvider:
                     timestamp REAL
                 )
             """)
+            
+            # Codec tag per row; NULL marks rows stored as json text
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(stock_cache)")}
+            if "codec" not in columns:
+                conn.execute("ALTER TABLE stock_cache ADD COLUMN codec TEXT")
             conn.commit()
             conn.close()
         except Exception as e:
@@ -91,17 +98,17 @@ class MultiSourceDataProvider:
         try:
             conn = sqlite3.connect(self.cache_file)
             cursor = conn.execute(
-                "SELECT data, timestamp, source FROM stock_cache WHERE symbol = ?",
+                "SELECT data, timestamp, source, codec FROM stock_cache WHERE symbol = ?",
                 (symbol,)
             )
             row = cursor.fetchone()
             conn.close()
             
             if row:
-                data, timestamp, source = row
+                data, timestamp, source, codec = row
                 if time.time() - timestamp < max_age:
                     return {
-                        "data": json.loads(data),
+                        "data": self.codec.decode(data, codec),
                         "source": source,
                         "cached": True
                     }
@@ -112,10 +119,11 @@ class MultiSourceDataProvider:
     def _cache_data(self, symbol: str, data: Dict, source: str):
         """Cache data to SQLite database"""
         try:
+            blob, codec, _ = self.codec.encode(data)
             conn = sqlite3.connect(self.cache_file)
             conn.execute(
-                "INSERT OR REPLACE INTO stock_cache (symbol, data, timestamp, source) VALUES (?, ?, ?, ?)",
-                (symbol, json.dumps(data), time.time(), source)
+                "INSERT OR REPLACE INTO stock_cache (symbol, data, timestamp, source, codec) VALUES (?, ?, ?, ?, ?)",
+                (symbol, blob, time.time(), source, codec)
             )
             conn.commit()
             conn.close()
@@ -1,5 +1,4 @@
 import asyncio
-import aiohttp
 import yfinance as yf
 import logging
 from typing import Dict, List, Optional, Any
@@ -7,6 +6,8 @@ from datetime import datetime, timedelta
 import time
 from fastapi import HTTPException
 
+from http_client import session_registry
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -142,7 +143,7 @@ class OptimalFreeAPIs:
             
             url = f"https://finnhub.io/api/v1/quote?symbol={symbol}&token={self.finnhub_key}"
             
-            async with aiohttp.ClientSession() as session:
+            async with session_registry.session('optimal_free_apis') as session:
                 async with session.get(url, timeout=5) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -188,7 +189,7 @@ class OptimalFreeAPIs:
             
             url = f"https://api.twelvedata.com/quote?symbol={clean_symbol}&apikey={self.twelve_data_key}"
             
-            async with aiohttp.ClientSession() as session:
+            async with session_registry.session('optimal_free_apis') as session:
                 async with session.get(url, timeout=5) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -231,7 +232,7 @@ class OptimalFreeAPIs:
             
             url = f"https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={clean_symbol}&apikey={self.alpha_vantage_key}"
             
-            async with aiohttp.ClientSession() as session:
+            async with session_registry.session('optimal_free_apis') as session:
                 async with session.get(url, timeout=5) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -272,7 +273,7 @@ class OptimalFreeAPIs:
             
             url = f"https://api.coingecko.com/api/v3/simple/price?ids={crypto_id}&vs_currencies={vs_currency}&include_24hr_change=true&include_market_cap=true&include_last_updated_at=true"
             
-            async with aiohttp.ClientSession() as session:
+            async with session_registry.session('optimal_free_apis') as session:
                 async with session.get(url, timeout=5) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -12,9 +12,11 @@ import time
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Any
 from datetime import datetime
-import aiohttp
 import os
 
+from http_client import session_registry
+from rate_limiter import ProviderCoolingDown, get_rate_limiter
+
 
 class BaseCryptoProvider(ABC):
     """
@@ -37,12 +39,16 @@ class BaseCryptoProvider(ABC):
         self.api_key = self._get_api_key()
         self.headers = self._build_headers()
         
-        # Rate limiting tracking
+        # Rate limiting: token buckets shared by every adapter instance for this provider
+        self.rate_limiter = get_rate_limiter(self.provider_id or self.name or type(self).__name__,
+                                             self.rate_limits)
         self.last_request_time = 0
         self.request_count = 0
-        self.request_window_start = time.time()
         
-        # Session management
+        # Quotes in flight at once when a batch falls back to individual requests
+        self.batch_concurrency = provider_config.get('batch_concurrency', 5)
+        
+        # Session management (drawn from the process-wide pool on first request)
         self.session = None
 
     @abstractmethod
@@ -84,7 +90,10 @@ class BaseCryptoProvider(ABC):
 
     async def fetch_batch_quotes(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
         """
-        Fetch quotes for multiple symbols (default implementation uses individual requests).
+        Fetch quotes for multiple symbols (default implementation fans out individual requests).
+        
+        At most `batch_concurrency` quotes are in flight at once; each request
+        still passes through _make_request's rate limiting.
         
         Args:
             symbols: List of crypto symbols
@@ -92,22 +101,18 @@ class BaseCryptoProvider(ABC):
         Returns:
             Dictionary mapping symbols to price data
         """
-        results = {}
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
         
-        for symbol in symbols:
-            try:
-                # Respect rate limits between requests
-                await self._enforce_rate_limit()
-                
-                quote_data = await self.fetch_quote(symbol)
-                if quote_data:
-                    results[symbol] = quote_data
-                    
-            except Exception as e:
-                self.logger.warning(f"Failed to fetch {symbol}: {str(e)}")
-                continue
-                
-        return results
+        async def fetch(symbol: str):
+            async with semaphore:
+                try:
+                    return symbol, await self.fetch_quote(symbol)
+                except Exception as e:
+                    self.logger.warning(f"Failed to fetch {symbol}: {str(e)}")
+                    return symbol, None
+        
+        quotes = await asyncio.gather(*(fetch(symbol) for symbol in symbols))
+        return {symbol: quote_data for symbol, quote_data in quotes if quote_data}
 
     def _get_api_key(self) -> Optional[str]:
         """Get API key from environment variables."""
@@ -159,36 +164,40 @@ class BaseCryptoProvider(ABC):
             data: Request body data
             
         Returns:
-            Response JSON or None if failed
+            Response JSON or None if failed (immediately, without sleeping,
+            while the provider is cooling down after a 429)
         """
-        await self._enforce_rate_limit()
+        try:
+            await self._enforce_rate_limit()
+        except ProviderCoolingDown as e:
+            self.logger.debug(f"Skipping request to {self.provider_id}: {e}")
+            return None
         
         url = f"{self.base_url}{endpoint}"
         
         try:
-            if not self.session:
-                self.session = aiohttp.ClientSession(
-                    headers=self.headers,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                )
+            # Every adapter shares one connector; auth headers go per request
+            self.session = await session_registry.get_session('crypto_providers', timeout=30)
             
             async with self.session.request(
                 method=method,
                 url=url,
                 params=params,
-                json=data
+                json=data,
+                headers=self.headers
             ) as response:
                 
-                # Update rate limiting counters
+                # Update rate limiting counters and apply the server's own view of the budget
                 self._update_rate_limit_counters()
+                self.rate_limiter.update_from_headers(response.headers, response.status)
                 
                 if response.status == 200:
                     return await response.json()
                 elif response.status == 429:
-                    # Rate limit exceeded
-                    self.logger.warning(f"Rate limit exceeded for {self.provider_id}")
-                    retry_after = response.headers.get('Retry-After', '60')
-                    await asyncio.sleep(int(retry_after))
+                    # Rate limit exceeded; the provider cools down until Retry-After passes
+                    # and callers fail over instead of waiting
+                    self.logger.warning(f"Rate limit exceeded for {self.provider_id}, "
+                                        f"cooling down for {self.cooldown_remaining():.0f}s")
                     return None
                 else:
                     self.logger.error(f"HTTP {response.status} from {self.provider_id}: {await response.text()}")
@@ -202,29 +211,36 @@ class BaseCryptoProvider(ABC):
             return None
 
     async def _enforce_rate_limit(self):
-        """Enforce rate limits based on provider configuration."""
-        current_time = time.time()
-        
-        # Reset window if needed
-        if current_time - self.request_window_start >= 60:
-            self.request_count = 0
-            self.request_window_start = current_time
-        
-        # Check per-minute rate limit
-        per_minute_limit = self.rate_limits.get('per_minute', 60)
-        if self.request_count >= per_minute_limit:
-            sleep_time = 60 - (current_time - self.request_window_start)
-            if sleep_time > 0:
-                self.logger.debug(f"Rate limit reached for {self.provider_id}, sleeping {sleep_time:.2f}s")
-                await asyncio.sleep(sleep_time)
-                self.request_count = 0
-                self.request_window_start = time.time()
+        """
+        Wait for a token from this provider's per-second and per-minute buckets.
         
-        # Enforce minimum delay between requests
-        min_delay = 60 / per_minute_limit if per_minute_limit > 0 else 1
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < min_delay:
-            await asyncio.sleep(min_delay - time_since_last)
+        Raises:
+            ProviderCoolingDown: the server throttled this provider and its
+                Retry-After has not passed yet
+        """
+        await self.rate_limiter.acquire(wait_for_cooldown=False)
+
+    def is_cooling_down(self) -> bool:
+        """Whether a 429 / Retry-After is still keeping this provider out of rotation."""
+        return self.rate_limiter.is_cooling_down()
+
+    def cooldown_remaining(self) -> float:
+        """Seconds until this provider accepts requests again."""
+        return self.rate_limiter.cooldown_remaining()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Availability and rate limit state of this provider."""
+        cooldown = self.cooldown_remaining()
+        return {
+            'id': self.provider_id,
+            'name': self.name,
+            'status': 'cooling_down' if cooldown > 0 else 'available',
+            'cooldown_remaining_seconds': round(cooldown, 1),
+            'cooldown_reason': self.rate_limiter.block_reason if cooldown > 0 else None,
+            'request_count': self.request_count,
+            'last_request_time': self.last_request_time or None,
+            'rate_limit': self.rate_limiter.get_stats()
+        }
 
     def _update_rate_limit_counters(self):
         """Update rate limiting counters after making a request."""
@@ -276,18 +292,5 @@ class BaseCryptoProvider(ABC):
         return True
 
     async def close(self):
-        """Close the HTTP session."""
-        if self.session:
-            await self.session.close()
-            self.session = None
-
-    def __del__(self):
-        """Cleanup when provider is destroyed."""
-        if self.session and not self.session.closed:
-            # Note: This is not ideal for async cleanup, but serves as a fallback
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    loop.create_task(self.close())
-            except:
-                pass 
\ No newline at end of file
+        """Release the shared session (the pool itself is closed by session_registry)."""
+        self.session = None 
\ No newline at end of file
@@ -5,6 +5,7 @@ Adapter for Coinbase Pro API that implements the standard crypto provider interf
 Provides real-time and historical crypto data with proper authentication and rate limiting.
 """
 
+import asyncio
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 from .base_crypto_provider import BaseCryptoProvider
@@ -35,30 +36,16 @@ class CoinbaseProvider(BaseCryptoProvider):
             if not coinbase_symbol:
                 return None
             
-            # Fetch current price
-            price_data = await self._make_request(f"/products/{coinbase_symbol}/ticker")
+            # Fetch current price and 24h stats together
+            price_data, stats_data = await asyncio.gather(
+                self._make_request(f"/products/{coinbase_symbol}/ticker"),
+                self._make_request(f"/products/{coinbase_symbol}/stats")
+            )
             if not price_data:
                 return None
             
-            # Fetch 24h stats
-            stats_data = await self._make_request(f"/products/{coinbase_symbol}/stats")
-            
             # Combine data and standardize
-            combined_data = {
-                'price': price_data.get('price'),
-                'volume_24h': stats_data.get('volume') if stats_data else None,
-                'high_24h': stats_data.get('high') if stats_data else None,
-                'low_24h': stats_data.get('low') if stats_data else None,
-                'last_updated': price_data.get('time')
-            }
-            
-            # Calculate price changes if we have high/low data
-            if stats_data and stats_data.get('open'):
-                open_price = float(stats_data['open'])
-                current_price = float(price_data['price'])
-                combined_data['price_change_24h'] = current_price - open_price
-                combined_data['price_change_percentage_24h'] = ((current_price - open_price) / open_price) * 100
-            
+            combined_data = self._combine_stats(stats_data, price_data.get('price'), price_data.get('time'))
             standardized = self._standardize_response(combined_data, symbol)
             
             if self._validate_response(standardized):
@@ -135,6 +122,67 @@ class CoinbaseProvider(BaseCryptoProvider):
             self.logger.error(f"Health check failed: {str(e)}")
             return False
 
+    async def fetch_batch_quotes(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch quotes for multiple symbols.
+        
+        Uses the all-products stats endpoint (one request for every product);
+        products missing from it are fetched concurrently, bounded by
+        batch_concurrency, once per distinct product.
+        """
+        products = {}
+        for symbol in symbols:
+            coinbase_symbol = self._normalize_symbol(symbol)
+            if coinbase_symbol:
+                products.setdefault(coinbase_symbol, []).append(symbol)
+        if not products:
+            return {}
+        
+        quotes = {}
+        all_stats = await self._make_request("/products/stats")
+        if isinstance(all_stats, dict):
+            for coinbase_symbol, aliases in products.items():
+                stats_24h = (all_stats.get(coinbase_symbol) or {}).get('stats_24hour')
+                if not stats_24h:
+                    continue
+                combined = self._combine_stats(stats_24h, stats_24h.get('last'),
+                                               datetime.now().isoformat())
+                standardized = self._standardize_response(combined, aliases[0])
+                if self._validate_response(standardized):
+                    quotes[aliases[0]] = standardized
+        
+        missing = [aliases[0] for aliases in products.values() if aliases[0] not in quotes]
+        if missing:
+            quotes.update(await super().fetch_batch_quotes(missing))
+        
+        results = {}
+        for aliases in products.values():
+            quote = quotes.get(aliases[0])
+            if quote:
+                for symbol in aliases:
+                    results[symbol] = {**quote, 'symbol': symbol}
+        return results
+
+    def _combine_stats(self, stats_data: Optional[Dict[str, Any]], price: Any,
+                       last_updated: Optional[str] = None) -> Dict[str, Any]:
+        """Merge a last price with 24h stats into the fields _standardize_response reads."""
+        combined_data = {
+            'price': price,
+            'volume_24h': stats_data.get('volume') if stats_data else None,
+            'high_24h': stats_data.get('high') if stats_data else None,
+            'low_24h': stats_data.get('low') if stats_data else None,
+            'last_updated': last_updated
+        }
+        
+        # Calculate price changes if we have the opening price
+        if stats_data and stats_data.get('open') and price:
+            open_price = float(stats_data['open'])
+            current_price = float(price)
+            combined_data['price_change_24h'] = current_price - open_price
+            combined_data['price_change_percentage_24h'] = ((current_price - open_price) / open_price) * 100
+        
+        return combined_data
+
     def _normalize_symbol(self, symbol: str) -> Optional[str]:
         """Convert symbol to Coinbase Pro format."""
         # Try direct mapping first
@@ -4,13 +4,10 @@ Priority Score: 92 (Third-highest in failover chain)
 """
 
 import asyncio
-import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
-import os
 
-from .base_crypto_provider import BaseCryptoProvider, CryptoDataPoint
-from services.common.http_client import HTTPClient
+from .base_crypto_provider import BaseCryptoProvider
 
 
 class KrakenProvider(BaseCryptoProvider):
@@ -18,14 +15,14 @@ class KrakenProvider(BaseCryptoProvider):
     Kraken exchange provider for crypto data
     Supports spot trading, professional-grade API
     """
-    
+
+    # Pairs per Ticker request (keeps the query string well under URL limits)
+    BATCH_SIZE = 20
+
     def __init__(self, config: Dict[str, Any]):
+        config = {'base_url': "https://api.kraken.com", **config}
         super().__init__(config)
-        self.base_url = "https://api.kraken.com"
-        self.api_key = os.getenv("KRAKEN_API_KEY")
-        self.client = HTTPClient()
-        self.logger = logging.getLogger(__name__)
-        
+
         # Kraken symbol mappings
         self.symbol_mappings = {
             'BTC': 'XBTUSD',
@@ -37,136 +34,171 @@ class KrakenProvider(BaseCryptoProvider):
             'DOT': 'DOTUSD',
             'LINK': 'LINKUSD',
             'XLM': 'XLMUSD',
-            'ATOM': 'ATOMUSD'
+            'ATOM': 'ATOMUSD',
+            'DOGE': 'XDGUSD',
+            'SOL': 'SOLUSD'
         }
-    
+        self.coin_ids = {
+            'bitcoin': 'BTC',
+            'ethereum': 'ETH',
+            'litecoin': 'LTC',
+            'ripple': 'XRP',
+            'bitcoin-cash': 'BCH',
+            'cardano': 'ADA',
+            'polkadot': 'DOT',
+            'chainlink': 'LINK',
+            'stellar': 'XLM',
+            'cosmos': 'ATOM',
+            'dogecoin': 'DOGE',
+            'solana': 'SOL'
+        }
+
     def _get_kraken_symbol(self, symbol: str) -> str:
-        """Convert standard symbol to Kraken format."""
-        symbol_upper = symbol.upper()
+        """Convert standard symbol (or CoinGecko-style id) to Kraken format."""
+        symbol_upper = self.coin_ids.get(symbol.lower(), symbol.upper())
         return self.symbol_mappings.get(symbol_upper, f"{symbol_upper}USD")
-    
-    async def fetch_quote(self, symbol: str) -> Optional[CryptoDataPoint]:
+
+    @staticmethod
+    def _pair_aliases(result_key: str) -> List[str]:
+        """
+        Names a Ticker result key may have been requested under.
+
+        Kraken answers legacy pairs under their canonical name, e.g. XBTUSD
+        comes back as XXBTZUSD.
+        """
+        aliases = [result_key]
+        if len(result_key) == 8 and result_key[0] in 'XZ' and result_key[4] in 'XZ':
+            aliases.append(result_key[1:4] + result_key[5:])
+        return aliases
+
+    async def fetch_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
         """Fetch current quote from Kraken ticker endpoint."""
+        quotes = await self._fetch_tickers([symbol])
+        return quotes.get(symbol)
+
+    async def fetch_batch_quotes(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch quotes for multiple symbols with Kraken's multi-pair Ticker endpoint."""
+        groups = list(self._group_by_pair(symbols).values())
+        results = {}
+        for i in range(0, len(groups), self.BATCH_SIZE):
+            results.update(await self._fetch_tickers([symbol for aliases in groups[i:i + self.BATCH_SIZE]
+                                                      for symbol in aliases]))
+        return results
+
+    def _group_by_pair(self, symbols: List[str]) -> Dict[str, List[str]]:
+        """Kraken pair -> every requested symbol that maps to it (e.g. BTC and bitcoin)."""
+        pairs = {}
+        for symbol in symbols:
+            pairs.setdefault(self._get_kraken_symbol(symbol), []).append(symbol)
+        return pairs
+
+    async def _fetch_tickers(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """One Ticker request for up to BATCH_SIZE pairs."""
         try:
-            kraken_symbol = self._get_kraken_symbol(symbol)
-            endpoint = f"/0/public/Ticker?pair={kraken_symbol}"
-            
-            response = await self.client.get(f"{self.base_url}{endpoint}")
-            
-            if not response or 'error' in response and response['error']:
-                self.logger.error(f"Kraken API error: {response.get('error', 'Unknown error')}")
-                return None
-            
-            if 'result' not in response or kraken_symbol not in response['result']:
-                self.logger.warning(f"No data for symbol {kraken_symbol} in Kraken response")
-                return None
-            
-            ticker_data = response['result'][kraken_symbol]
-            
-            # Extract data from Kraken format
-            current_price = float(ticker_data.get('c', [0, 0])[0])  # Last trade price
-            volume_24h = float(ticker_data.get('v', [0, 0])[1])  # 24h volume
-            high_24h = float(ticker_data.get('h', [0, 0])[1])  # 24h high
-            low_24h = float(ticker_data.get('l', [0, 0])[1])  # 24h low
-            
-            # Calculate 24h change percentage
-            opening_price = float(ticker_data.get('o', current_price))
-            price_change_24h = ((current_price - opening_price) / opening_price * 100) if opening_price > 0 else 0
-            
-            return CryptoDataPoint(
-                symbol=symbol,
-                price=current_price,
-                volume_24h=volume_24h,
-                price_change_24h=price_change_24h,
-                market_cap=None,  # Kraken doesn't provide market cap
-                high_24h=high_24h,
-                low_24h=low_24h,
-                timestamp=datetime.utcnow(),
-                provider_source="kraken"
-            )
-            
+            pair_to_symbols = self._group_by_pair(symbols)
+            if not pair_to_symbols:
+                return {}
+
+            response = await self._make_request("/0/public/Ticker", params={'pair': ','.join(pair_to_symbols)})
+            if not response:
+                return {}
+
+            if response.get('error'):
+                if len(pair_to_symbols) > 1:
+                    # One unknown pair fails the whole request; retry the pairs individually
+                    self.logger.warning(f"Kraken batch rejected ({response['error']}), fetching pairs individually")
+                    quotes = await asyncio.gather(*(self._fetch_tickers(aliases)
+                                                    for aliases in pair_to_symbols.values()))
+                    return {symbol: quote for batch in quotes for symbol, quote in batch.items()}
+                self.logger.error(f"Kraken API error: {response['error']}")
+                return {}
+
+            results = {}
+            for result_key, ticker_data in response.get('result', {}).items():
+                aliases = next((pair_to_symbols[name] for name in self._pair_aliases(result_key)
+                                if name in pair_to_symbols), None)
+                if aliases is None and len(pair_to_symbols) == 1:
+                    aliases = next(iter(pair_to_symbols.values()))
+                if aliases is None:
+                    self.logger.warning(f"Unmatched Kraken ticker {result_key}")
+                    continue
+
+                standardized = self._standardize_response(ticker_data, aliases[0])
+                if self._validate_response(standardized):
+                    for symbol in aliases:
+                        results[symbol] = {**standardized, 'symbol': symbol}
+
+            return results
+
         except Exception as e:
-            self.logger.error(f"Error fetching Kraken quote for {symbol}: {str(e)}")
-            return None
-    
-    async def fetch_history(self, symbol: str, days: int = 30) -> List[CryptoDataPoint]:
+            self.logger.error(f"Error fetching Kraken quotes for {symbols}: {str(e)}")
+            return {}
+
+    async def fetch_history(self, symbol: str, days: int = 30) -> Optional[List[Dict[str, Any]]]:
         """Fetch historical data from Kraken OHLC endpoint."""
         try:
             kraken_symbol = self._get_kraken_symbol(symbol)
-            
+
             # Kraken intervals: 1, 5, 15, 30, 60, 240, 1440, 10080, 21600 (in minutes)
             interval = 1440 if days > 7 else 240 if days > 1 else 60  # Daily, 4h, or hourly
-            
+
             # Calculate since timestamp (Kraken uses seconds)
             since_timestamp = int((datetime.utcnow() - timedelta(days=days)).timestamp())
-            
-            endpoint = f"/0/public/OHLC?pair={kraken_symbol}&interval={interval}&since={since_timestamp}"
-            
-            response = await self.client.get(f"{self.base_url}{endpoint}")
-            
-            if not response or 'error' in response and response['error']:
-                self.logger.error(f"Kraken OHLC API error: {response.get('error', 'Unknown error')}")
-                return []
-            
-            if 'result' not in response or kraken_symbol not in response['result']:
+
+            params = {'pair': kraken_symbol, 'interval': interval, 'since': since_timestamp}
+            response = await self._make_request("/0/public/OHLC", params=params)
+
+            if not response or response.get('error'):
+                self.logger.error(f"Kraken OHLC API error: {response.get('error', 'Unknown error') if response else 'no response'}")
+                return None
+
+            # The result holds the candles under the pair's canonical name plus a 'last' cursor
+            ohlc_data = next((value for key, value in response.get('result', {}).items() if key != 'last'), None)
+            if not ohlc_data:
                 self.logger.warning(f"No OHLC data for symbol {kraken_symbol}")
-                return []
-            
-            ohlc_data = response['result'][kraken_symbol]
+                return None
+
             history_points = []
-            
             for candle in ohlc_data:
-                timestamp = datetime.fromtimestamp(candle[0])
-                open_price = float(candle[1])
-                high_price = float(candle[2])
-                low_price = float(candle[3])
-                close_price = float(candle[4])
-                volume = float(candle[6])
-                
-                history_points.append(CryptoDataPoint(
-                    symbol=symbol,
-                    price=close_price,
-                    volume_24h=volume,
-                    price_change_24h=0,  # Would need previous day's data to calculate
-                    market_cap=None,
-                    high_24h=high_price,
-                    low_24h=low_price,
-                    timestamp=timestamp,
-                    provider_source="kraken"
-                ))
-            
+                history_points.append({
+                    'timestamp': candle[0],
+                    'price': float(candle[4]),  # close price
+                    'volume': float(candle[6]),
+                    'high': float(candle[2]),
+                    'low': float(candle[3]),
+                    'open': float(candle[1])
+                })
+
             return history_points
-            
+
         except Exception as e:
             self.logger.error(f"Error fetching Kraken history for {symbol}: {str(e)}")
-            return []
-    
+            return None
+
     async def health_check(self) -> bool:
         """Check Kraken API health using system status endpoint."""
         try:
-            endpoint = "/0/public/SystemStatus"
-            response = await self.client.get(f"{self.base_url}{endpoint}")
-            
+            response = await self._make_request("/0/public/SystemStatus")
+
             if response and 'result' in response:
                 status = response['result'].get('status', 'unknown')
                 return status.lower() in ['online', 'operational']
-            
+
             return False
-            
+
         except Exception as e:
             self.logger.error(f"Kraken health check failed: {str(e)}")
             return False
-    
+
     async def get_supported_symbols(self) -> List[str]:
         """Get list of supported trading pairs from Kraken."""
         try:
-            endpoint = "/0/public/AssetPairs"
-            response = await self.client.get(f"{self.base_url}{endpoint}")
-            
+            response = await self._make_request("/0/public/AssetPairs")
+
             if response and 'result' in response:
                 pairs = response['result']
                 supported = []
-                
+
                 for pair_name, pair_info in pairs.items():
                     # Extract base symbol from pair info
                     base = pair_info.get('base', '')
@@ -178,11 +210,33 @@ class KrakenProvider(BaseCryptoProvider):
                             supported.append(base[1:])
                         else:
                             supported.append(base)
-                
+
                 return supported
-            
+
             return list(self.symbol_mappings.keys())
-            
+
         except Exception as e:
             self.logger.error(f"Error getting Kraken supported symbols: {str(e)}")
-            return list(self.symbol_mappings.keys()) 
\ No newline at end of file
+            return list(self.symbol_mappings.keys())
+
+    def _standardize_response(self, raw_data: Dict[str, Any], symbol: str) -> Dict[str, Any]:
+        """Convert a Kraken ticker entry to standard format."""
+        try:
+            current_price = float(raw_data.get('c', [0, 0])[0])  # Last trade price
+            opening_price = float(raw_data.get('o', current_price))  # Today's opening price
+            price_change = current_price - opening_price
+            return {
+                'symbol': symbol,
+                'price': current_price,
+                'volume_24h': float(raw_data.get('v', [0, 0])[1]),  # 24h volume
+                'market_cap': None,  # Kraken doesn't provide market cap
+                'price_change_24h': price_change,
+                'price_change_percentage_24h': (price_change / opening_price * 100) if opening_price > 0 else 0,
+                'high_24h': float(raw_data.get('h', [0, 0])[1]),
+                'low_24h': float(raw_data.get('l', [0, 0])[1]),
+                'last_updated': datetime.now().isoformat(),
+                'provider_source': self.provider_id or 'kraken'
+            }
+        except (ValueError, TypeError, IndexError) as e:
+            self.logger.error(f"Error standardizing Kraken response: {str(e)}")
+            return {}
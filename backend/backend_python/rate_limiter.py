@@ -6,8 +6,12 @@ Addresses P0 Priority: API rate limiting issues
 import asyncio
 import time
 import logging
-from typing import Dict, Optional, Callable, Any
+from typing import Deque, Dict, List, Optional, Callable, Any, Mapping
+from collections import deque
 from functools import wraps
+from email.utils import parsedate_to_datetime
+import math
+import threading
 import random
 
 logger = logging.getLogger(__name__)
@@ -55,6 +59,7 @@ def with_rate_limit_and_retry(api_name: str, max_retries: int = 3):
             rate_limiter = APIRateLimiter()
             
             for attempt in range(max_retries):
+                started = time.monotonic()
                 try:
                     # Check circuit breaker
                     if rate_limiter.should_circuit_break(api_name):
@@ -63,6 +68,7 @@ def with_rate_limit_and_retry(api_name: str, max_retries: int = 3):
                     
                     # Make the API call
                     result = await func(*args, **kwargs)
+                    smart_api_manager.record_call(api_name, time.monotonic() - started, result is not None)
                     
                     if result is not None:
                         # Success - reset failure count
@@ -73,6 +79,7 @@ def with_rate_limit_and_retry(api_name: str, max_retries: int = 3):
                         rate_limiter.record_failure(api_name)
                         
                 except Exception as e:
+                    smart_api_manager.record_call(api_name, time.monotonic() - started, False)
                     error_msg = str(e).lower()
                     
                     # Check for rate limiting errors
@@ -113,10 +120,296 @@ def with_rate_limit_and_retry(api_name: str, max_retries: int = 3):
         return wrapper
     return decorator
 
+class TokenBucket:
+    """
+    Token bucket for bursts plus a sliding-window log so that no window of
+    `period` seconds admits more than `limit`
+
+    The bucket holds up to `burst` tokens and refills at limit / period, so
+    sustained throughput is the full limit. Because a burst followed by a
+    full period of refill would exceed the limit, each admission is also
+    logged and a request waits while `limit` admissions already fall inside
+    the trailing window.
+    """
+    
+    def __init__(self, limit: float, period: float, burst: Optional[float] = None, now: float = 0.0):
+        self.limit = limit
+        self.period = period
+        self.capacity = max(1.0, min(burst if burst is not None else limit / 4, limit))
+        self.rate = limit / period
+        self.tokens = self.capacity
+        self.updated = now
+        self._window_limit = max(1, int(limit))
+        self._admitted: Deque[float] = deque()
+    
+    def refill(self, now: float):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+        # Same float-dust tolerance as wait_time, so a caller woken at the boundary gets in
+        while self._admitted and self._admitted[0] <= now - self.period + 1e-9:
+            self._admitted.popleft()
+    
+    def wait_time(self, tokens: float, now: float) -> float:
+        """Seconds until `tokens` are available (0 if they are now)"""
+        self.refill(now)
+        deficit = tokens - self.tokens
+        # Ignore float dust left over from refills
+        wait = deficit / self.rate if deficit > 1e-9 else 0.0
+        
+        over = len(self._admitted) + math.ceil(tokens) - self._window_limit
+        if over > 0:
+            # Wait for enough of the window's admissions to age out
+            wait = max(wait, self._admitted[min(over, len(self._admitted)) - 1] + self.period - now)
+        return wait
+    
+    def take(self, tokens: float):
+        self.tokens -= tokens
+        self._admitted.extend([self.updated] * math.ceil(tokens))
+    
+    def cap(self, tokens: float, now: float):
+        """Lower the available tokens to what the server says is left"""
+        self.refill(now)
+        self.tokens = min(self.tokens, max(0.0, tokens))
+
+
+class ProviderCoolingDown(Exception):
+    """Raised instead of waiting when a throttled provider is still cooling down"""
+    
+    def __init__(self, name: str, retry_in: float, reason: Optional[str] = None):
+        super().__init__(f"{name} cooling down for {retry_in:.1f}s ({reason or 'rate limited'})")
+        self.name = name
+        self.retry_in = retry_in
+        self.reason = reason
+
+
+class AsyncRateLimiter:
+    """
+    Per-second and per-minute token buckets behind one asyncio lock
+    
+    Callers queue on the lock in arrival order; the caller at the head sleeps
+    until every bucket can pay, so concurrent coroutines never overspend.
+    Retry-After and X-RateLimit-* response headers tighten the buckets.
+    """
+    
+    def __init__(self, name: str, per_minute: Optional[float] = 60, per_second: Optional[float] = None,
+                 burst: Optional[float] = None, second_burst: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], Any] = asyncio.sleep):
+        """
+        Args:
+            name: Provider the budget belongs to
+            per_minute: Requests allowed in any 60 s window (None for no minute budget)
+            per_second: Requests allowed in any 1 s window (None for no second budget)
+            burst: Requests that may go out back to back from an idle minute bucket
+            second_burst: Same for the per-second bucket
+            clock / sleep: Time source, replaceable in tests
+        """
+        self.name = name
+        self._clock = clock
+        self._sleep = sleep
+        now = clock()
+        self.buckets: Dict[str, TokenBucket] = {}
+        if per_minute:
+            self.buckets['minute'] = TokenBucket(per_minute, 60, burst, now)
+        if per_second:
+            self.buckets['second'] = TokenBucket(per_second, 1, second_burst, now)
+        self.blocked_until = 0.0
+        self.block_reason: Optional[str] = None
+        self._lock = asyncio.Lock()
+        self._thread_lock = threading.Lock()  # Serialises try_acquire callers on worker threads
+        self.stats = {'acquired': 0, 'waited': 0, 'wait_seconds': 0.0, 'server_throttles': 0,
+                      'cooldown_rejections': 0}
+    
+    async def acquire(self, tokens: float = 1, wait_for_cooldown: bool = True) -> float:
+        """
+        Wait until every bucket can pay `tokens`, then spend them
+        
+        Args:
+            wait_for_cooldown: When False, a server-imposed block raises
+                ProviderCoolingDown instead of sleeping it out, so the caller
+                can fail over to another provider
+        
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        if not wait_for_cooldown:
+            self._check_cooldown()
+        async with self._lock:
+            while True:
+                now = self._clock()
+                if not wait_for_cooldown:
+                    # A 429 may have arrived while this caller queued on the lock
+                    self._check_cooldown()
+                delay = max([self.blocked_until - now] +
+                            [bucket.wait_time(tokens, now) for bucket in self.buckets.values()])
+                if delay <= 1e-9:
+                    break
+                waited += delay
+                await self._sleep(delay)
+            
+            for bucket in self.buckets.values():
+                bucket.take(tokens)
+        
+        self.stats['acquired'] += 1
+        if waited:
+            self.stats['waited'] += 1
+            self.stats['wait_seconds'] += waited
+            logger.debug(f"Rate limit for {self.name}: waited {waited:.2f}s")
+        return waited
+    
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Spend `tokens` if every bucket can pay them now, without waiting (safe across threads)"""
+        with self._thread_lock:
+            if self.expected_wait(tokens) > 1e-9:
+                return False
+            for bucket in self.buckets.values():
+                bucket.take(tokens)
+            self.stats['acquired'] += 1
+            return True
+    
+    def block_for(self, seconds: float, reason: str = "rate limited"):
+        """Admit nothing for `seconds` (e.g. after a 429 with Retry-After)"""
+        if self._clock() + seconds > self.blocked_until:
+            self.blocked_until = self._clock() + seconds
+            self.block_reason = reason
+        for bucket in self.buckets.values():
+            bucket.cap(0, self._clock())
+    
+    def cooldown_remaining(self) -> float:
+        """Seconds until the limiter admits requests again after a server throttle"""
+        return max(0.0, self.blocked_until - self._clock())
+    
+    def expected_wait(self, tokens: float = 1) -> float:
+        """Seconds a caller arriving now would wait for `tokens`, without spending them"""
+        now = self._clock()
+        return max([self.blocked_until - now] +
+                   [bucket.wait_time(tokens, now) for bucket in self.buckets.values()])
+    
+    def is_cooling_down(self) -> bool:
+        """Whether a server throttle is still blocking this limiter"""
+        return self.cooldown_remaining() > 1e-9
+    
+    def _check_cooldown(self):
+        if self.is_cooling_down():
+            self.stats['cooldown_rejections'] += 1
+            raise ProviderCoolingDown(self.name, self.cooldown_remaining(), self.block_reason)
+    
+    def update_from_headers(self, headers: Mapping[str, str], status: Optional[int] = None):
+        """
+        Apply server rate-limit feedback
+        
+        Retry-After (seconds or HTTP date) blocks the limiter. X-RateLimit-Remaining
+        caps the minute bucket, and when it reaches zero X-RateLimit-Reset
+        (seconds or epoch) blocks until the window resets.
+        """
+        try:
+            retry_after = headers.get('Retry-After')
+            if retry_after is not None:
+                self.stats['server_throttles'] += 1
+                self.block_for(_parse_retry_after(retry_after), f"HTTP {status or 429} Retry-After")
+                return
+            if status == 429:
+                self.stats['server_throttles'] += 1
+                self.block_for(60, "HTTP 429")
+                return
+            
+            remaining = headers.get('X-RateLimit-Remaining')
+            if remaining is None:
+                return
+            remaining = float(remaining)
+            bucket = self.buckets.get('minute') or self.buckets.get('second')
+            if bucket is not None:
+                bucket.cap(remaining, self._clock())
+            
+            reset = headers.get('X-RateLimit-Reset')
+            if remaining <= 0 and reset is not None:
+                reset = float(reset)
+                # Large values are epoch timestamps, small ones are seconds from now
+                self.block_for(reset - time.time() if reset > 1e9 else reset, "X-RateLimit-Remaining: 0")
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Ignoring malformed rate limit headers for {self.name}: {e}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get budget and wait statistics"""
+        now = self._clock()
+        buckets = {}
+        for name, bucket in self.buckets.items():
+            bucket.refill(now)
+            buckets[name] = {
+                'limit': bucket.limit,
+                'burst': bucket.capacity,
+                'available': round(bucket.tokens, 2)
+            }
+        return {
+            'name': self.name,
+            'buckets': buckets,
+            'blocked_for_seconds': round(max(0.0, self.blocked_until - now), 2),
+            'block_reason': self.block_reason if self.blocked_until > now else None,
+            **self.stats,
+            'wait_seconds': round(self.stats['wait_seconds'], 3)
+        }
+
+
+def _parse_retry_after(value: str) -> float:
+    """Retry-After as seconds, from either delta-seconds or an HTTP date"""
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+
+
+# One limiter per provider id, shared by every adapter instance for that provider
+_rate_limiters: Dict[str, AsyncRateLimiter] = {}
+
+def get_rate_limiter(name: str, rate_limits: Optional[Dict[str, Any]] = None) -> AsyncRateLimiter:
+    """
+    Get the shared limiter for a provider, creating it from its rate_limits config
+    
+    Recognised keys: per_minute, per_second, burst, second_burst.
+    """
+    if name not in _rate_limiters:
+        rate_limits = rate_limits or {}
+        _rate_limiters[name] = AsyncRateLimiter(
+            name,
+            per_minute=rate_limits.get('per_minute', 60),
+            per_second=rate_limits.get('per_second'),
+            burst=rate_limits.get('burst'),
+            second_burst=rate_limits.get('second_burst')
+        )
+    return _rate_limiters[name]
+
+def get_rate_limiter_stats() -> Dict[str, Any]:
+    """Stats for every provider limiter"""
+    return {name: limiter.get_stats() for name, limiter in _rate_limiters.items()}
+
 class SmartAPIManager:
-    """Smart API manager with load balancing and fallback logic"""
+    """
+    Smart API manager with load balancing and fallback logic
     
-    def __init__(self):
+    Every call through with_rate_limit_and_retry / safe_api_call, and every
+    SimplifiedDataProvider quote fetch, updates a per-API EWMA of latency and
+    error rate. get_best_api routes to the API
+    with the lowest expected completion time:
+    
+        (latency + rate limit wait + error rate * failover cost) / success rate
+    
+    where the failover cost of a failed call is the API's timeout.
+    
+    Estimates that have not been refreshed recently decay back towards the
+    prior, so an API that was abandoned after a slow spell is tried again.
+    """
+    
+    def __init__(self, alpha: float = 0.3, prior_latency: float = 1.0, stale_after: float = 300,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            alpha: EWMA weight of the newest measurement
+            prior_latency: Latency assumed for an API without measurements
+            stale_after: Seconds over which an old estimate decays to the prior
+            clock: Time source, replaceable in tests
+        """
         self.api_priorities = {
             'stock_data': ['yahoo_finance', 'alpha_vantage', 'twelve_data', 'mock'],
             'crypto_data': ['coingecko', 'twelve_data', 'mock'],
@@ -124,20 +417,70 @@ class SmartAPIManager:
         }
         self.api_health = {}
         self.last_health_check = {}
+        self.alpha = alpha
+        self.prior_latency = prior_latency
+        self.stale_after = stale_after
+        self._clock = clock
+        self.api_stats: Dict[str, Dict[str, Any]] = {}
+        self._stats_lock = threading.Lock()
+    
+    def record_call(self, api_name: str, latency: float, success: bool):
+        """Fold one call's latency and outcome into the API's running estimates (safe across threads)"""
+        with self._stats_lock:
+            stats = self.api_stats.get(api_name)
+            if stats is None:
+                stats = self.api_stats[api_name] = {
+                    'ewma_latency': latency, 'ewma_error_rate': 0.0 if success else 1.0,
+                    'calls': 0, 'errors': 0, 'last_call': 0.0, 'last_success': None
+                }
+            else:
+                stats['ewma_latency'] += self.alpha * (latency - stats['ewma_latency'])
+                stats['ewma_error_rate'] += self.alpha * ((0.0 if success else 1.0) - stats['ewma_error_rate'])
+            stats['calls'] += 1
+            stats['last_call'] = self._clock()
+            if success:
+                stats['last_success'] = stats['last_call']
+            else:
+                stats['errors'] += 1
+    
+    def score_api(self, api_name: str) -> Dict[str, Any]:
+        """Expected completion time of a call to `api_name` and the inputs behind it"""
+        stats = self.api_stats.get(api_name)
+        if stats is None:
+            latency, error_rate, freshness = self.prior_latency, 0.0, 0.0
+        else:
+            # Trust in the estimate decays with the age of the last measurement
+            age = self._clock() - stats['last_call']
+            freshness = math.exp(-age / self.stale_after) if self.stale_after else 1.0
+            latency = freshness * stats['ewma_latency'] + (1 - freshness) * self.prior_latency
+            error_rate = freshness * stats['ewma_error_rate']
         
+        limiter = _rate_limiters.get(api_name)
+        budget_wait = limiter.expected_wait() if limiter else 0.0
+        success_rate = max(1.0 - error_rate, 0.05)
+        failover_cost = error_rate * get_timeout_for_api(api_name)
+        return {
+            'expected_seconds': round((latency + budget_wait + failover_cost) / success_rate, 4),
+            'latency': round(latency, 4),
+            'error_rate': round(error_rate, 4),
+            'budget_wait': round(budget_wait, 4),
+            'freshness': round(freshness, 3),
+            'calls': stats['calls'] if stats else 0
+        }
+    
+    def rank(self, apis: List[str]) -> List[str]:
+        """Order APIs by expected completion time; ties (e.g. no measurements yet) keep the given order"""
+        return sorted(apis, key=lambda api: (self.score_api(api)['expected_seconds'], apis.index(api)))
+    
+    def rank_apis(self, data_type: str) -> list:
+        """APIs for a data type, fastest expected completion first ('mock' always last)"""
+        priorities = self.api_priorities.get(data_type, [])
+        return self.rank([api for api in priorities if api != 'mock']) + [api for api in priorities if api == 'mock']
+    
     def get_best_api(self, data_type: str) -> str:
         """Get the best available API for a data type"""
-        priorities = self.api_priorities.get(data_type, [])
-        
-        for api in priorities:
-            health = self.api_health.get(api, {'status': 'unknown', 'last_success': 0})
-            
-            # If API is healthy or we haven't checked recently, use it
-            if health['status'] in ['healthy', 'unknown']:
-                return api
-        
-        # Fallback to first available or mock
-        return priorities[0] if priorities else 'mock'
+        ranked = self.rank_apis(data_type)
+        return ranked[0] if ranked else 'mock'
     
     def mark_api_healthy(self, api_name: str):
         """Mark an API as healthy"""
@@ -157,11 +500,15 @@ class SmartAPIManager:
         }
     
     def get_api_health_summary(self) -> dict:
-        """Get overall API health summary"""
+        """Get overall API health summary with routing scores"""
         return {
             'apis': self.api_health,
             'total_apis': len(self.api_health),
             'healthy_apis': len([a for a in self.api_health.values() if a.get('status') == 'healthy']),
+            'scores': {api: self.score_api(api) for api in
+                       dict.fromkeys(list(self.api_stats) + [api for apis in self.api_priorities.values()
+                                                             for api in apis if api != 'mock'])},
+            'routing': {data_type: self.rank_apis(data_type) for data_type in self.api_priorities},
             'timestamp': time.time()
         }
 
@@ -171,12 +518,15 @@ smart_api_manager = SmartAPIManager()
 # Utility functions for quick implementation
 async def safe_api_call(api_func: Callable, api_name: str, *args, **kwargs) -> Optional[Any]:
     """Safely call an API function with error handling"""
+    started = time.monotonic()
     try:
         result = await api_func(*args, **kwargs)
+        smart_api_manager.record_call(api_name, time.monotonic() - started, bool(result))
         if result:
             smart_api_manager.mark_api_healthy(api_name)
         return result
     except Exception as e:
+        smart_api_manager.record_call(api_name, time.monotonic() - started, False)
         smart_api_manager.mark_api_unhealthy(api_name)
         logger.error(f"Safe API call failed for {api_name}: {str(e)}")
         return None
@@ -5,14 +5,18 @@ Supports news, social media, and technical sentiment analysis
 
 import asyncio
 import logging
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
+from collections import OrderedDict
 from fastapi import APIRouter, HTTPException, Query
 import os
-import aiohttp
 from dataclasses import dataclass
 import json
 
+from http_client import session_registry
+from single_flight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
 # Sentiment API Router
@@ -35,45 +39,61 @@ class SentimentAggregator:
             'cryptopanic': {
                 'api_key': os.getenv('CRYPTOPANIC_API_KEY'),
                 'base_url': 'https://cryptopanic.com/api/v1',
-                'weight': 0.3
+                'component': 'news'
             },
             'newsapi': {
                 'api_key': os.getenv('NEWSAPI_KEY'),
                 'base_url': 'https://newsapi.org/v2',
-                'weight': 0.25
+                'component': 'news'
             },
             'lunarcrush': {
                 'api_key': os.getenv('LUNARCRUSH_API_KEY'),
                 'base_url': 'https://api.lunarcrush.com/v2',
-                'weight': 0.25
+                'component': 'social_media'
             },
             'fear_greed': {
                 'api_key': None,  # Free API
                 'base_url': 'https://api.alternative.me/fng',
-                'weight': 0.2
+                'component': 'fear_greed_index'
             }
         }
+        
+        # Components of the aggregate (each source above feeds one): weight, own cache TTL
+        # and how long a request waits for it
+        self.components = {
+            'news': {'weight': 0.3, 'ttl': 600, 'timeout': 4.0},
+            'social_media': {'weight': 0.25, 'ttl': 300, 'timeout': 4.0},
+            'technical': {'weight': 0.25, 'ttl': 60, 'timeout': 2.0},
+            'fear_greed_index': {'weight': 0.2, 'ttl': 3600, 'timeout': 3.0}
+        }
+        self.stale_weight = 0.5  # Weight factor for an expired value standing in for a late source
+        self.stale_max_age = 6 * 3600  # Older values are dropped rather than stood in
+        self.cache_max_entries = 256  # Keys include the requested symbols, so bound them (LRU)
+        self.cache: OrderedDict = OrderedDict()  # key -> {'score', 'fetched_at'}
+        
+        # A source that misses its timeout keeps running and fills the cache for the next request
+        self.single_flight = SingleFlight("sentiment")
     
-    async def get_news_sentiment(self, symbols: List[str] = None, timeframe: str = '24h') -> float:
-        """Get sentiment from crypto news sources"""
+    async def get_news_sentiment(self, symbols: List[str] = None, timeframe: str = '24h') -> Optional[float]:
+        """Get sentiment from crypto news sources (None if no source answered)"""
         try:
-            # CryptoPanic News Sentiment
-            cryptopanic_sentiment = await self._get_cryptopanic_sentiment(symbols, timeframe)
-            
-            # NewsAPI Sentiment
-            newsapi_sentiment = await self._get_newsapi_sentiment(symbols, timeframe)
+            # CryptoPanic and NewsAPI News Sentiment
+            cryptopanic_sentiment, newsapi_sentiment = await asyncio.gather(
+                self._get_cryptopanic_sentiment(symbols, timeframe),
+                self._get_newsapi_sentiment(symbols, timeframe)
+            )
             
             # Weighted average
             sentiments = [s for s in [cryptopanic_sentiment, newsapi_sentiment] if s is not None]
             
             if not sentiments:
-                return 0.0
+                return None
             
             return sum(sentiments) / len(sentiments)
             
         except Exception as e:
             self.logger.error(f"Error getting news sentiment: {e}")
-            return 0.0
+            return None
     
     async def _get_cryptopanic_sentiment(self, symbols: List[str], timeframe: str) -> Optional[float]:
         """Get sentiment from CryptoPanic API"""
@@ -97,7 +117,7 @@ class SentimentAggregator:
             if symbols:
                 params['currencies'] = ','.join([s.upper() for s in symbols])
             
-            async with aiohttp.ClientSession() as session:
+            async with session_registry.session('sentiment') as session:
                 async with session.get(url, params=params) as response:
                     if response.status != 200:
                         return None
@@ -149,7 +169,7 @@ class SentimentAggregator:
                 'pageSize': 50
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with session_registry.session('sentiment') as session:
                 async with session.get(url, params=params) as response:
                     if response.status != 200:
                         return None
@@ -180,8 +200,8 @@ class SentimentAggregator:
             self.logger.error(f"NewsAPI sentiment error: {e}")
             return None
     
-    async def get_social_sentiment(self, symbols: List[str] = None) -> float:
-        """Get sentiment from social media sources"""
+    async def get_social_sentiment(self, symbols: List[str] = None) -> Optional[float]:
+        """Get sentiment from social media sources (None if no source answered)"""
         try:
             # LunarCrush Social Sentiment
             lunarcrush_sentiment = await self._get_lunarcrush_sentiment(symbols)
@@ -190,13 +210,13 @@ class SentimentAggregator:
             sentiments = [s for s in [lunarcrush_sentiment] if s is not None]
             
             if not sentiments:
-                return 0.0
+                return None
             
             return sum(sentiments) / len(sentiments)
             
         except Exception as e:
             self.logger.error(f"Error getting social sentiment: {e}")
-            return 0.0
+            return None
     
     async def _get_lunarcrush_sentiment(self, symbols: List[str]) -> Optional[float]:
         """Get sentiment from LunarCrush API"""
@@ -212,7 +232,7 @@ class SentimentAggregator:
                 'data_points': 1
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with session_registry.session('sentiment') as session:
                 async with session.get(url, params=params) as response:
                     if response.status != 200:
                         return None
@@ -238,15 +258,15 @@ class SentimentAggregator:
             self.logger.error(f"LunarCrush sentiment error: {e}")
             return None
     
-    async def get_fear_greed_index(self) -> float:
-        """Get Fear & Greed Index"""
+    async def get_fear_greed_index(self) -> Optional[float]:
+        """Get Fear & Greed Index (None if the request failed)"""
         try:
             url = f"{self.sources['fear_greed']['base_url']}"
             
-            async with aiohttp.ClientSession() as session:
+            async with session_registry.session('sentiment') as session:
                 async with session.get(url) as response:
                     if response.status != 200:
-                        return 0.0
+                        return None
                         
                     data = await response.json()
                     
@@ -261,14 +281,14 @@ class SentimentAggregator:
                         else:
                             return (index_value - 50) / 50         # -0.5 to 0.5
                     
-            return 0.0
+            return None
             
         except Exception as e:
             self.logger.error(f"Fear & Greed Index error: {e}")
-            return 0.0
+            return None
     
-    async def get_technical_sentiment(self, symbols: List[str] = None) -> float:
-        """Get technical analysis sentiment based on price action"""
+    async def get_technical_sentiment(self, symbols: List[str] = None) -> Optional[float]:
+        """Get technical analysis sentiment based on price action (None on failure)"""
         try:
             # This would integrate with technical analysis indicators
             # For now, return neutral sentiment
@@ -283,61 +303,130 @@ class SentimentAggregator:
             
         except Exception as e:
             self.logger.error(f"Error getting technical sentiment: {e}")
-            return 0.0
+            return None
+    
+    async def _fetch_component(self, cache_key: str, fetch) -> Optional[float]:
+        """
+        Fetch one component and cache it (runs to completion even if the request stopped waiting)
+        
+        A failed fetch (None) is not cached, so the last good value survives for the stale path.
+        """
+        score = await fetch()
+        if score is not None:
+            self.cache[cache_key] = {'score': score, 'fetched_at': time.time()}
+            self.cache.move_to_end(cache_key)
+            while len(self.cache) > self.cache_max_entries:
+                self.cache.popitem(last=False)
+        return score
+    
+    async def _get_component(self, component: str, cache_key: str, fetch) -> Dict[str, Any]:
+        """
+        One component's score, age and status
+        
+        Status is 'cached' (within its TTL), 'live' (fetched within its timeout),
+        'stale' (late or failed, an expired value stands in) or 'missing'.
+        """
+        config = self.components[component]
+        cached = self.cache.get(cache_key)
+        age = time.time() - cached['fetched_at'] if cached else None
+        if cached and age >= self.stale_max_age:
+            # Too old to stand in for anything
+            self.cache.pop(cache_key, None)
+            cached = age = None
+        elif cached:
+            self.cache.move_to_end(cache_key)
+        if cached and age < config['ttl']:
+            return {'score': cached['score'], 'age_seconds': age, 'status': 'cached'}
+        
+        try:
+            score = await asyncio.wait_for(
+                self.single_flight.do(cache_key, self._fetch_component, cache_key, fetch),
+                timeout=config['timeout']
+            )
+            if score is not None:
+                return {'score': score, 'age_seconds': 0.0, 'status': 'live'}
+            self.logger.warning(f"Sentiment source {component} returned no data")
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Sentiment source {component} missed its {config['timeout']}s timeout")
+        except Exception as e:
+            self.logger.error(f"Error getting {component} sentiment: {e}")
+        
+        if cached:
+            return {'score': cached['score'], 'age_seconds': age, 'status': 'stale'}
+        return {'score': None, 'age_seconds': None, 'status': 'missing'}
     
     async def aggregate_sentiment(self, symbols: List[str] = None, timeframe: str = '24h') -> Dict[str, Any]:
-        """Aggregate sentiment from all sources"""
+        """Aggregate sentiment from all sources, gathered concurrently with per-source timeouts"""
         try:
-            # Get sentiment from all sources
-            news_sentiment = await self.get_news_sentiment(symbols, timeframe)
-            social_sentiment = await self.get_social_sentiment(symbols)
-            technical_sentiment = await self.get_technical_sentiment(symbols)
-            fear_greed = await self.get_fear_greed_index()
-            
-            # Calculate weighted overall sentiment
-            sentiment_components = {
-                'news': news_sentiment,
-                'social_media': social_sentiment,
-                'technical': technical_sentiment,
-                'fear_greed_index': fear_greed
-            }
-            
-            # Weight the components
-            weights = {
-                'news': 0.3,
-                'social_media': 0.25,
-                'technical': 0.25,
-                'fear_greed_index': 0.2
+            symbol_key = ','.join(sorted(s.upper() for s in symbols)) if symbols else 'market'
+            fetchers = {
+                'news': (f"news:{symbol_key}:{timeframe}", lambda: self.get_news_sentiment(symbols, timeframe)),
+                'social_media': (f"social_media:{symbol_key}", lambda: self.get_social_sentiment(symbols)),
+                'technical': (f"technical:{symbol_key}", lambda: self.get_technical_sentiment(symbols)),
+                'fear_greed_index': ("fear_greed_index", self.get_fear_greed_index)
             }
             
+            # Get sentiment from all sources at once
+            results = await asyncio.gather(*(
+                self._get_component(component, cache_key, fetch)
+                for component, (cache_key, fetch) in fetchers.items()
+            ))
+            components = dict(zip(fetchers, results))
+            
+            sentiment_components = {component: result['score'] for component, result in components.items()}
+            
+            # Weight the components; late sources drop out and stale stand-ins count for less
+            weights = {}
+            for component, result in components.items():
+                if result['status'] == 'missing':
+                    weights[component] = 0.0
+                elif result['status'] == 'stale':
+                    weights[component] = self.components[component]['weight'] * self.stale_weight
+                else:
+                    weights[component] = self.components[component]['weight']
+            
+            total_weight = sum(weights.values())
             overall_sentiment = sum(
                 sentiment_components[component] * weights[component]
-                for component in sentiment_components
-            )
+                for component in sentiment_components if weights[component]
+            ) / total_weight if total_weight else 0.0
             
             # Calculate confidence based on data availability
-            available_sources = sum(1 for score in sentiment_components.values() if score != 0)
+            available_sources = sum(1 for score in sentiment_components.values() if score)
             confidence = min(available_sources / len(sentiment_components), 1.0)
             
             # Determine trend
             # This would compare with historical data in a real implementation
             trend = 'stable'  # Simplified for now
             
+            included = [component for component, result in components.items() if result['status'] != 'missing']
+            fresh = all(result['status'] in ('live', 'cached') for result in components.values())
+            
             return {
                 'overall_sentiment': overall_sentiment,
                 'confidence': confidence,
                 'sentiment_sources': sentiment_components,
                 'trend': trend,
                 'last_updated': datetime.utcnow().isoformat(),
-                'data_freshness': 'fresh' if confidence > 0.7 else 'stale',
+                'data_freshness': 'fresh' if confidence > 0.7 and fresh else 'stale',
+                'sources_included': included,
+                'sources_missing': [component for component in components if component not in included],
+                'source_ages': {
+                    component: round(result['age_seconds'], 1) if result['age_seconds'] is not None else None
+                    for component, result in components.items()
+                },
                 'source_breakdown': [
                     {
-                        'source_name': source,
-                        'sentiment_score': score,
-                        'confidence': 1.0 if score != 0 else 0.0,
-                        'weight': weights[source]
+                        'source_name': component,
+                        'sentiment_score': result['score'],
+                        'confidence': 1.0 if result['score'] else 0.0,
+                        'weight': self.components[component]['weight'],
+                        'effective_weight': round(weights[component] / total_weight, 4) if total_weight else 0.0,
+                        'status': result['status'],
+                        'age_seconds': round(result['age_seconds'], 1) if result['age_seconds'] is not None else None,
+                        'ttl_seconds': self.components[component]['ttl']
                     }
-                    for source, score in sentiment_components.items()
+                    for component, result in components.items()
                 ]
             }
             
@@ -428,7 +517,8 @@ async def get_sentiment_sources():
             sources_status.append({
                 'name': source_name,
                 'available': bool(api_key),
-                'weight': config.get('weight', 0),
+                'component': config['component'],
+                'weight': sentiment_aggregator.components[config['component']]['weight'],
                 'description': f"{source_name.title()} sentiment analysis"
             })
         
@@ -13,31 +13,221 @@ import numpy as np
 from datetime import datetime, timedelta
 import logging
 import sqlite3
-import json
 from typing import Dict, List, Optional, Any, Tuple
 import time
+import asyncio
+import copy
 import os
+import tempfile
 import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from cache_codecs import CacheCodec
+from hedged_requests import HedgedRequester
+from rate_limiter import get_rate_limiter, smart_api_manager
 
 logger = logging.getLogger(__name__)
 
+class MemoryCacheTier:
+    """
+    In-process LRU cache of decoded payloads, bounded by total byte size
+    
+    Sits in front of the SQLite store so hot keys are served without a
+    query or a JSON decode.
+    """
+    
+    def __init__(self, max_size_mb: float = 16):
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.size_bytes = 0
+        self._entries: OrderedDict = OrderedDict()  # key -> [data, size, timestamp, expires_at, category, access_count]
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def get(self, key: str, max_age: int = 300) -> Optional[Dict]:
+        """Get a deep copy of the cached payload, or None on miss/expiry"""
+        current_time = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            
+            data, size, timestamp, expires_at, category, access_count = entry
+            if (expires_at and current_time > expires_at) or current_time - timestamp > max_age:
+                self._remove(key)
+                self.stats['expirations'] += 1
+                self.stats['misses'] += 1
+                return None
+            
+            entry[5] = access_count + 1
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+        
+        result = copy.deepcopy(data)
+        result["_cache_hit"] = True
+        result["_access_count"] = access_count + 1
+        return result
+
+    def set(self, key: str, data: Dict, size: int, timestamp: float,
+            expires_at: Optional[float] = None, category: str = "general", access_count: int = 1):
+        """Store a private copy of a decoded payload, evicting least recently used entries to fit"""
+        if size > self.max_size_bytes:
+            return
+        
+        data = copy.deepcopy(data)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            
+            self._entries[key] = [data, size, timestamp, expires_at, category, access_count]
+            self.size_bytes += size
+            
+            while self.size_bytes > self.max_size_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats['evictions'] += 1
+
+    def invalidate(self, key_pattern: str = None, category: str = None) -> int:
+        """Drop entries by pattern or category (all entries if neither is given)"""
+        with self._lock:
+            if key_pattern:
+                keys = [k for k in self._entries if key_pattern in k]
+            elif category:
+                keys = [k for k, entry in self._entries.items() if entry[4] == category]
+            else:
+                keys = list(self._entries)
+            
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def invalidate_keys(self, keys) -> int:
+        """Drop specific keys"""
+        with self._lock:
+            removed = 0
+            for key in keys:
+                if key in self._entries:
+                    self._remove(key)
+                    removed += 1
+            return removed
+
+    def cleanup_expired(self) -> int:
+        """Drop entries past their TTL"""
+        current_time = time.time()
+        with self._lock:
+            keys = [k for k, entry in self._entries.items() if entry[3] and entry[3] < current_time]
+            for key in keys:
+                self._remove(key)
+            self.stats['expirations'] += len(keys)
+            return len(keys)
+
+    def get_stats(self) -> Dict:
+        """Get L1 statistics"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self.size_bytes,
+                "size_mb": round(self.size_bytes / (1024 * 1024), 2),
+                "max_size_mb": round(self.max_size_bytes / (1024 * 1024), 2),
+                "hits": self.stats['hits'],
+                "misses": self.stats['misses'],
+                "evictions": self.stats['evictions'],
+                "expirations": self.stats['expirations'],
+                "hit_rate": round(self.stats['hits'] / lookups * 100, 1) if lookups else 0.0
+            }
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self.size_bytes -= entry[1]
+
 class EnhancedCacheSystem:
     """
     Enhanced cache system with better performance and features
+    
+    Uses one long-lived writer connection and one reader connection per thread,
+    all in WAL mode, so reads never queue behind writes. Access counts from
+    cache hits are buffered and written in batches. A MemoryCacheTier (L1)
+    in front of SQLite (L2) serves hot keys without a query or JSON decode;
+    writes go through to both tiers. Payloads are stored as compact blobs
+    by a CacheCodec, tagged per row so rows from older codecs still read.
     """
     
-    def __init__(self, cache_file: str = "enhanced_market_cache.db", max_size_mb: int = 100):
+    # Eviction order per policy, victims first
+    EVICTION_ORDER = {
+        "lru": "last_accessed ASC",
+        "lfu": "access_count ASC, last_accessed ASC",
+        "gdsf": "priority ASC, last_accessed ASC"    # Greedy-Dual-Size-Frequency
+    }
+    
+    # Pragmas applied to every connection
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",      # WAL keeps this crash-safe; only the last commits can be lost
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-8000",        # ~8 MB page cache per connection
+        "PRAGMA mmap_size=67108864",      # 64 MB memory-mapped reads
+        "PRAGMA busy_timeout=5000"
+    )
+    
+    def __init__(self, cache_file: str = "enhanced_market_cache.db", max_size_mb: int = 100,
+                 access_flush_size: int = 100, access_flush_interval: float = 5.0,
+                 l1_max_size_mb: float = 16, eviction_policy: str = "lru",
+                 codec: Optional[CacheCodec] = None):
+        if eviction_policy not in self.EVICTION_ORDER:
+            raise ValueError(f"Unknown eviction policy '{eviction_policy}', "
+                             f"expected one of {list(self.EVICTION_ORDER)}")
+        
         self.cache_file = cache_file
         self.max_size_mb = max_size_mb
         self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.eviction_policy = eviction_policy
+        self.eviction_stats = {'runs': 0, 'entries_evicted': 0}
+        self.codec = codec or CacheCodec()
+        
+        # Buffered access-count updates, flushed by size or age
+        self.access_flush_size = access_flush_size
+        self.access_flush_interval = access_flush_interval
+        self._pending_access: Dict[str, List] = {}  # key -> [hits, last_accessed]
+        self._last_access_flush = time.time()
+        self._access_lock = threading.Lock()
+        
+        # Writes go through a single connection; readers get one per thread
         self._lock = threading.Lock()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        
+        # In-process L1 of decoded payloads
+        self.l1 = MemoryCacheTier(l1_max_size_mb)
+        
         self._init_cache_db()
 
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with the cache pragmas applied"""
+        conn = sqlite3.connect(self.cache_file, check_same_thread=False, timeout=5.0)
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """Get this thread's read connection"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
     def _init_cache_db(self):
         """Initialize enhanced SQLite cache with better schema"""
         try:
             with self._lock:
-                conn = sqlite3.connect(self.cache_file)
+                self._writer = self._connect()
+                conn = self._writer
                 conn.execute("""
                     CREATE TABLE IF NOT EXISTS enhanced_cache (
                         key TEXT PRIMARY KEY,
@@ -57,11 +247,53 @@ class EnhancedCacheSystem:
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_category ON enhanced_cache(category)")
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_last_accessed ON enhanced_cache(last_accessed)")
                 
+                # Columns added since the original schema, created on older cache files in place:
+                # GDSF priority (clock + frequency / size), codec tag (NULL = json text)
+                # and serialized size before compression
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(enhanced_cache)")}
+                for column, definition in (("priority", "REAL DEFAULT 0"),
+                                           ("codec", "TEXT"),
+                                           ("raw_size", "INTEGER")):
+                    if column not in columns:
+                        conn.execute(f"ALTER TABLE enhanced_cache ADD COLUMN {column} {definition}")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_priority ON enhanced_cache(priority)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_access_count ON enhanced_cache(access_count, last_accessed)")
+                
+                # Running total size kept by triggers, so no SUM() scan per write
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS enhanced_cache_meta (
+                        id INTEGER PRIMARY KEY CHECK (id = 1),
+                        total_size INTEGER NOT NULL,
+                        gdsf_clock REAL NOT NULL DEFAULT 0
+                    )
+                """)
+                conn.execute("""
+                    INSERT OR IGNORE INTO enhanced_cache_meta (id, total_size)
+                    SELECT 1, COALESCE(SUM(data_size), 0) FROM enhanced_cache
+                """)
+                conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS trg_cache_size_insert AFTER INSERT ON enhanced_cache
+                    BEGIN
+                        UPDATE enhanced_cache_meta SET total_size = total_size + NEW.data_size WHERE id = 1;
+                    END
+                """)
+                conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS trg_cache_size_delete AFTER DELETE ON enhanced_cache
+                    BEGIN
+                        UPDATE enhanced_cache_meta SET total_size = total_size - OLD.data_size WHERE id = 1;
+                    END
+                """)
+                conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS trg_cache_size_update AFTER UPDATE OF data_size ON enhanced_cache
+                    BEGIN
+                        UPDATE enhanced_cache_meta SET total_size = total_size - OLD.data_size + NEW.data_size WHERE id = 1;
+                    END
+                """)
+                
                 conn.commit()
-                conn.close()
                 
-                # Clean up expired entries on startup
-                self._cleanup_expired()
+            # Clean up expired entries on startup
+            self._cleanup_expired()
                 
         except Exception as e:
             logger.error(f"Enhanced cache init error: {e}")
@@ -69,50 +301,51 @@ class EnhancedCacheSystem:
     def get(self, key: str, max_age: int = 300) -> Optional[Dict]:
         """Get cached data with enhanced tracking"""
         try:
-            with self._lock:
-                conn = sqlite3.connect(self.cache_file)
-                cursor = conn.execute("""
-                    SELECT data, timestamp, expires_at, access_count 
-                    FROM enhanced_cache 
-                    WHERE key = ?
-                """, (key,))
-                row = cursor.fetchone()
-                
-                if row:
-                    data, timestamp, expires_at, access_count = row
-                    current_time = time.time()
-                    
-                    # Check if data is still valid
-                    is_valid = True
-                    if expires_at and current_time > expires_at:
-                        is_valid = False
-                    elif current_time - timestamp > max_age:
-                        is_valid = False
-                    
-                    if is_valid:
-                        # Update access statistics
-                        conn.execute("""
-                            UPDATE enhanced_cache 
-                            SET access_count = access_count + 1, last_accessed = ? 
-                            WHERE key = ?
-                        """, (current_time, key))
-                        conn.commit()
-                        conn.close()
-                        
-                        try:
-                            parsed_data = json.loads(data)
-                            parsed_data["_cache_hit"] = True
-                            parsed_data["_access_count"] = access_count + 1
-                            return parsed_data
-                        except json.JSONDecodeError:
-                            logger.error(f"JSON decode error for key: {key}")
-                            return None
-                    else:
-                        # Remove expired data
-                        conn.execute("DELETE FROM enhanced_cache WHERE key = ?", (key,))
-                        conn.commit()
+            cached = self.l1.get(key, max_age)
+            if cached is not None:
+                self._record_access(key, time.time())
+                return cached
+            
+            row = self._reader().execute("""
+                SELECT data, timestamp, expires_at, access_count, data_size, category, codec, raw_size 
+                FROM enhanced_cache 
+                WHERE key = ?
+            """, (key,)).fetchone()
+            
+            if not row:
+                return None
+            
+            data, timestamp, expires_at, access_count, data_size, category, codec, raw_size = row
+            current_time = time.time()
+            
+            # Check if data is still valid
+            is_valid = True
+            if expires_at and current_time > expires_at:
+                is_valid = False
+            elif current_time - timestamp > max_age:
+                is_valid = False
+            
+            if not is_valid:
+                # Remove expired data
+                with self._lock:
+                    self._writer.execute("DELETE FROM enhanced_cache WHERE key = ?", (key,))
+                    self._writer.commit()
+                return None
+            
+            # Update access statistics (written in batches)
+            pending_hits = self._record_access(key, current_time)
+            
+            try:
+                parsed_data = self.codec.decode(data, codec)
+                self.l1.set(key, parsed_data, raw_size or data_size, timestamp, expires_at, category,
+                            access_count + pending_hits)
                 
-                conn.close()
+                parsed_data = dict(parsed_data)
+                parsed_data["_cache_hit"] = True
+                parsed_data["_access_count"] = access_count + pending_hits
+                return parsed_data
+            except Exception as e:
+                logger.error(f"Cache decode error for key {key} ({codec or 'json'}): {e}")
                 return None
                 
         except Exception as e:
@@ -122,76 +355,156 @@ class EnhancedCacheSystem:
     def set(self, key: str, data: Dict, category: str = "general", ttl: Optional[int] = None):
         """Set cached data with enhanced features"""
         try:
-            json_data = json.dumps(data)
-            data_size = len(json_data.encode('utf-8'))
+            blob, codec, raw_size = self.codec.encode(data)
+            data_size = len(blob)
             current_time = time.time()
             expires_at = current_time + ttl if ttl else None
             
+            # A rewrite resets the entry's access count
+            with self._access_lock:
+                self._pending_access.pop(key, None)
+            
             with self._lock:
-                conn = sqlite3.connect(self.cache_file)
+                conn = self._writer
                 
                 # Check if we need to make space
-                self._ensure_cache_size(conn, data_size)
+                gdsf_clock = self._ensure_cache_size(conn, data_size)
                 
+                # Upsert rather than REPLACE so the size triggers see the old row
                 conn.execute("""
-                    INSERT OR REPLACE INTO enhanced_cache 
-                    (key, data, timestamp, last_accessed, data_size, category, expires_at, access_count)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, 1)
-                """, (key, json_data, current_time, current_time, data_size, category, expires_at))
+                    INSERT INTO enhanced_cache 
+                    (key, data, timestamp, last_accessed, data_size, category, expires_at, access_count,
+                     priority, codec, raw_size)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET
+                        data = excluded.data, timestamp = excluded.timestamp,
+                        last_accessed = excluded.last_accessed, data_size = excluded.data_size,
+                        category = excluded.category, expires_at = excluded.expires_at,
+                        access_count = 1, priority = excluded.priority,
+                        codec = excluded.codec, raw_size = excluded.raw_size
+                """, (key, blob, current_time, current_time, data_size, category, expires_at,
+                      gdsf_clock + 1 / max(data_size, 1), codec, raw_size))
                 
                 conn.commit()
-                conn.close()
+            
+            # Write-through: keep the decoded payload hot in L1
+            self.l1.set(key, data, raw_size, current_time, expires_at, category)
                 
         except Exception as e:
             logger.error(f"Cache set error for {key}: {e}")
 
-    def _ensure_cache_size(self, conn: sqlite3.Connection, new_data_size: int):
-        """Ensure cache doesn't exceed size limits"""
+    def _record_access(self, key: str, accessed_at: float) -> int:
+        """Buffer a cache hit; returns the hits for this key not yet written"""
+        with self._access_lock:
+            entry = self._pending_access.setdefault(key, [0, accessed_at])
+            entry[0] += 1
+            entry[1] = accessed_at
+            pending_hits = entry[0]
+            
+            due = (len(self._pending_access) >= self.access_flush_size or
+                   accessed_at - self._last_access_flush >= self.access_flush_interval)
+        
+        if due:
+            self.flush_access_stats()
+        return pending_hits
+
+    def flush_access_stats(self):
+        """Write buffered access counts in one transaction"""
         try:
-            # Get current cache size
-            cursor = conn.execute("SELECT SUM(data_size) FROM enhanced_cache")
-            current_size = cursor.fetchone()[0] or 0
+            with self._lock:
+                self._write_access_stats(self._writer)
+                self._writer.commit()
+        except Exception as e:
+            logger.error(f"Cache access flush error: {e}")
+
+    def _write_access_stats(self, conn: sqlite3.Connection):
+        """Apply buffered access counts (caller holds the write lock)"""
+        with self._access_lock:
+            pending = self._pending_access
+            self._pending_access = {}
+            self._last_access_flush = time.time()
+        
+        if not pending:
+            return
+        
+        gdsf_clock = conn.execute(
+            "SELECT gdsf_clock FROM enhanced_cache_meta WHERE id = 1"
+        ).fetchone()[0]
+        conn.executemany("""
+            UPDATE enhanced_cache 
+            SET access_count = access_count + ?, last_accessed = MAX(last_accessed, ?),
+                priority = ? + (access_count + ?) * 1.0 / MAX(data_size, 1)
+            WHERE key = ?
+        """, [(hits, accessed_at, gdsf_clock, hits, key)
+              for key, (hits, accessed_at) in pending.items()])
+
+    def _ensure_cache_size(self, conn: sqlite3.Connection, new_data_size: int) -> float:
+        """
+        Ensure cache doesn't exceed size limits
+        
+        Evicts down to 80% capacity in one DELETE, taking victims in the order
+        of the configured policy. Returns the GDSF clock for the new entry.
+        """
+        try:
+            current_size, gdsf_clock = conn.execute(
+                "SELECT total_size, gdsf_clock FROM enhanced_cache_meta WHERE id = 1"
+            ).fetchone()
             
-            # If adding new data would exceed limit, remove oldest least-accessed items
-            if current_size + new_data_size > self.max_size_bytes:
-                target_size = self.max_size_bytes * 0.8  # Remove to 80% capacity
-                
-                # Get items sorted by last_accessed (oldest first)
-                cursor = conn.execute("""
-                    SELECT key, data_size FROM enhanced_cache 
-                    ORDER BY last_accessed ASC
-                """)
+            if current_size + new_data_size <= self.max_size_bytes:
+                return gdsf_clock
+            
+            # Victims are chosen on up-to-date access statistics
+            self._write_access_stats(conn)
+            
+            # Running total in eviction order; keep deleting until enough is freed
+            bytes_to_free = current_size + new_data_size - self.max_size_bytes * 0.8
+            order = self.EVICTION_ORDER[self.eviction_policy]
+            evicted = conn.execute(f"""
+                DELETE FROM enhanced_cache WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, data_size,
+                               SUM(data_size) OVER (ORDER BY {order} ROWS UNBOUNDED PRECEDING) AS freed
+                        FROM enhanced_cache
+                    )
+                    WHERE freed - data_size < ?
+                )
+                RETURNING key, priority
+            """, (bytes_to_free,)).fetchall()
+            
+            if evicted:
+                # GDSF ages the survivors by raising the clock to the highest evicted priority
+                gdsf_clock = max(gdsf_clock, max(priority or 0 for _, priority in evicted))
+                conn.execute("UPDATE enhanced_cache_meta SET gdsf_clock = ? WHERE id = 1", (gdsf_clock,))
+                self.l1.invalidate_keys(key for key, _ in evicted)
                 
-                removed_size = 0
-                for key, size in cursor.fetchall():
-                    if current_size - removed_size <= target_size:
-                        break
-                    
-                    conn.execute("DELETE FROM enhanced_cache WHERE key = ?", (key,))
-                    removed_size += size
-                    logger.info(f"Removed cache entry {key} to free space")
+                self.eviction_stats['runs'] += 1
+                self.eviction_stats['entries_evicted'] += len(evicted)
+                logger.info(f"Evicted {len(evicted)} cache entries ({self.eviction_policy}) to free space")
+            
+            return gdsf_clock
                 
         except Exception as e:
             logger.error(f"Cache size management error: {e}")
+            return 0.0
 
     def _cleanup_expired(self):
         """Remove expired cache entries"""
         try:
             with self._lock:
-                conn = sqlite3.connect(self.cache_file)
                 current_time = time.time()
                 
-                cursor = conn.execute("""
+                cursor = self._writer.execute("""
                     DELETE FROM enhanced_cache 
                     WHERE expires_at IS NOT NULL AND expires_at < ?
                 """, (current_time,))
                 
                 deleted_count = cursor.rowcount
-                conn.commit()
-                conn.close()
+                self._writer.commit()
+            
+            self.l1.cleanup_expired()
                 
-                if deleted_count > 0:
-                    logger.info(f"Cleaned up {deleted_count} expired cache entries")
+            if deleted_count > 0:
+                logger.info(f"Cleaned up {deleted_count} expired cache entries")
                     
         except Exception as e:
             logger.error(f"Cache cleanup error: {e}")
@@ -199,8 +512,11 @@ class EnhancedCacheSystem:
     def invalidate(self, key_pattern: str = None, category: str = None):
         """Invalidate cache entries by pattern or category"""
         try:
+            self.flush_access_stats()
+            self.l1.invalidate(key_pattern, category)
+            
             with self._lock:
-                conn = sqlite3.connect(self.cache_file)
+                conn = self._writer
                 
                 if key_pattern:
                     cursor = conn.execute("""
@@ -217,10 +533,9 @@ class EnhancedCacheSystem:
                 
                 deleted_count = cursor.rowcount
                 conn.commit()
-                conn.close()
                 
-                logger.info(f"Invalidated {deleted_count} cache entries")
-                return deleted_count
+            logger.info(f"Invalidated {deleted_count} cache entries")
+            return deleted_count
                 
         except Exception as e:
             logger.error(f"Cache invalidation error: {e}")
@@ -229,45 +544,61 @@ class EnhancedCacheSystem:
     def get_stats(self) -> Dict:
         """Get cache statistics"""
         try:
-            with self._lock:
-                conn = sqlite3.connect(self.cache_file)
-                
-                # Basic stats
-                cursor = conn.execute("""
-                    SELECT 
-                        COUNT(*) as total_entries,
-                        SUM(data_size) as total_size,
-                        AVG(access_count) as avg_access_count,
-                        MAX(access_count) as max_access_count,
-                        COUNT(DISTINCT category) as categories_count
-                    FROM enhanced_cache
-                """)
-                
-                stats = cursor.fetchone()
-                
-                # Category breakdown
-                cursor = conn.execute("""
-                    SELECT category, COUNT(*), SUM(data_size)
-                    FROM enhanced_cache
-                    GROUP BY category
-                """)
-                
-                categories = {row[0]: {"count": row[1], "size": row[2]} for row in cursor.fetchall()}
-                
-                conn.close()
-                
-                return {
-                    "total_entries": stats[0] or 0,
-                    "total_size_bytes": stats[1] or 0,
-                    "total_size_mb": round((stats[1] or 0) / (1024 * 1024), 2),
-                    "avg_access_count": round(stats[2] or 0, 2),
-                    "max_access_count": stats[3] or 0,
-                    "categories_count": stats[4] or 0,
-                    "categories": categories,
-                    "cache_file": self.cache_file,
-                    "max_size_mb": self.max_size_mb,
-                    "timestamp": datetime.now().isoformat()
-                }
+            self.flush_access_stats()
+            conn = self._reader()
+            
+            # Basic stats
+            cursor = conn.execute("""
+                SELECT 
+                    COUNT(*) as total_entries,
+                    SUM(data_size) as total_size,
+                    AVG(access_count) as avg_access_count,
+                    MAX(access_count) as max_access_count,
+                    COUNT(DISTINCT category) as categories_count,
+                    SUM(COALESCE(raw_size, data_size)) as raw_size
+                FROM enhanced_cache
+            """)
+            
+            stats = cursor.fetchone()
+            
+            # Rows per codec tag (NULL for rows written as json text)
+            cursor = conn.execute("""
+                SELECT COALESCE(codec, 'json'), COUNT(*)
+                FROM enhanced_cache
+                GROUP BY COALESCE(codec, 'json')
+            """)
+            codecs = dict(cursor.fetchall())
+            
+            # Category breakdown
+            cursor = conn.execute("""
+                SELECT category, COUNT(*), SUM(data_size)
+                FROM enhanced_cache
+                GROUP BY category
+            """)
+            
+            categories = {row[0]: {"count": row[1], "size": row[2]} for row in cursor.fetchall()}
+            
+            return {
+                "total_entries": stats[0] or 0,
+                "total_size_bytes": stats[1] or 0,
+                "total_size_mb": round((stats[1] or 0) / (1024 * 1024), 2),
+                "avg_access_count": round(stats[2] or 0, 2),
+                "max_access_count": stats[3] or 0,
+                "categories_count": stats[4] or 0,
+                "categories": categories,
+                "cache_file": self.cache_file,
+                "max_size_mb": self.max_size_mb,
+                "codec": self.codec.name,
+                "codecs": codecs,
+                "uncompressed_size_bytes": stats[5] or 0,
+                "compression_ratio": round((stats[5] or 0) / stats[1], 2) if stats[1] else 1.0,
+                "journal_mode": "wal",
+                "reader_connections": len(self._readers),
+                "eviction_policy": self.eviction_policy,
+                "evictions": dict(self.eviction_stats),
+                "l1": self.l1.get_stats(),
+                "timestamp": datetime.now().isoformat()
+            }
                 
         except Exception as e:
             logger.error(f"Cache stats error: {e}")
@@ -277,6 +608,19 @@ class EnhancedCacheSystem:
         """Clear all cache entries"""
         return self.invalidate()
 
+    def close(self):
+        """Flush buffered access counts and close every connection"""
+        self.flush_access_stats()
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+        self._local = threading.local()
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
     def get_file_size(self) -> Tuple[int, str]:
         """Get cache file size"""
         try:
@@ -295,8 +639,8 @@ class SimplifiedDataProvider:
     using only core dependencies that are already available.
     """
     
-    def __init__(self):
-        self.cache = EnhancedCacheSystem()
+    def __init__(self, cache: Optional[EnhancedCacheSystem] = None):
+        self.cache = cache or EnhancedCacheSystem()
         
         # API endpoints and keys
         self.finnhub_base = "https://finnhub.io/api/v1"
@@ -333,6 +677,13 @@ class SimplifiedDataProvider:
         # Simple rate limiting using time tracking
         self.last_request_time = {}
         self.min_interval = 1.0  # 1 second between requests
+        self._rate_limit_lock = threading.Lock()
+        
+        # Concurrent fan-out: every source queried at once, results taken at the deadline
+        self.fanout_deadline = 8.0  # Seconds per symbol
+        self.fanout_workers = 16
+        self.max_parallel_symbols = 4
+        self._executor: Optional[ThreadPoolExecutor] = None
         
         # API priority order (best to worst)
         self.api_priority = [
@@ -347,15 +698,38 @@ class SimplifiedDataProvider:
             "finnhub"
         ]
         
+        # Interchangeable single-quote sources, raced with hedging by get_stock_quote
+        self.quote_sources = ["yahoo", "alpha_vantage", "finnhub", "twelve_data", "polygon", "tiingo"]
+        self.quote_budgets = {  # Free-tier requests per minute
+            "yahoo": 60,
+            "alpha_vantage": 5,
+            "finnhub": 60,
+            "twelve_data": 8,
+            "polygon": 5,
+            "tiingo": 1
+        }
+        self.hedging_enabled = True
+        self.hedger = HedgedRequester("stock_quotes", default_delay=2.0, max_delay=10.0)
+        # Try quote sources fastest-expected first (SmartAPIManager EWMA) instead of in list order
+        self.adaptive_routing = True
+        
         logger.info("Multi-source data provider initialized with 9 APIs (including Google Finance alternatives) and enhanced cache")
 
     def _rate_limit(self, source: str):
-        """Simple rate limiting"""
-        if source in self.last_request_time:
-            elapsed = time.time() - self.last_request_time[source]
-            if elapsed < self.min_interval:
-                time.sleep(self.min_interval - elapsed)
-        self.last_request_time[source] = time.time()
+        """Simple rate limiting (threads reserve their slot under a lock, then sleep outside it)"""
+        with self._rate_limit_lock:
+            now = time.time()
+            slot = max(now, self.last_request_time.get(source, 0) + self.min_interval)
+            self.last_request_time[source] = slot
+        if slot > now:
+            time.sleep(slot - now)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Worker threads for concurrent source fetches, created on first use"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.fanout_workers,
+                                                thread_name_prefix="source-fanout")
+        return self._executor
 
     def fetch_yahoo_data(self, symbol: str) -> Optional[Dict]:
         """Fetch data from Yahoo Finance (primary source)"""
@@ -799,9 +1173,116 @@ class SimplifiedDataProvider:
             logger.error(f"Marketstack error for {symbol}: {e}")
             return None
 
-    def get_comprehensive_stock_data(self, symbol: str) -> Dict:
+    def _api_methods(self) -> Dict[str, Any]:
+        """Fetch method of every source by name"""
+        return {
+            "yahoo": self.fetch_yahoo_data,
+            "alpha_vantage": self.fetch_alpha_vantage_data,
+            "polygon": self.fetch_polygon_data,
+            "iex": self.fetch_iex_data,
+            "tiingo": self.fetch_tiingo_data,
+            "twelve_data": self.fetch_twelve_data,
+            "fmp": self.fetch_fmp_data,
+            "marketstack": self.fetch_marketstack_data,
+            "finnhub": self.fetch_finnhub_data
+        }
+
+    def _has_quote_budget(self, source: str) -> bool:
+        """Spend one request of a source's free-tier budget if any is left"""
+        limiter = get_rate_limiter(source, {"per_minute": self.quote_budgets.get(source, 60)})
+        return limiter.try_acquire()
+
+    def _quote_candidates(self, symbol: str) -> List[Tuple[str, Any]]:
+        """(source, blocking fetch) for every quote source, fastest expected source first"""
+        api_methods = self._api_methods()
+        sources = smart_api_manager.rank(self.quote_sources) if self.adaptive_routing else self.quote_sources
+        return [(source, lambda source=source: self._timed_quote(source, api_methods[source], symbol))
+                for source in sources]
+
+    def _timed_quote(self, source: str, method: Any, symbol: str) -> Optional[Dict]:
+        """Run one source's fetch and feed its latency and outcome to the router"""
+        started = time.monotonic()
+        data = None
+        try:
+            data = method(symbol)
+            return data
+        finally:
+            smart_api_manager.record_call(source, time.monotonic() - started, self._is_valid_quote(data))
+
+    def _cached_quote(self, symbol: str) -> Optional[Dict]:
+        for source in self.quote_sources:
+            cached = self.cache.get(f"{source}_{symbol}", max_age=300)
+            if cached:
+                return cached
+        return None
+
+    @staticmethod
+    def _is_valid_quote(data: Optional[Dict]) -> bool:
+        return bool(data) and bool(data.get("current_price"))
+
+    def get_stock_quote(self, symbol: str, hedged: Optional[bool] = None) -> Optional[Dict]:
+        """
+        Get one symbol's quote from the first source that answers
+        
+        In hedging mode the next source is fired when the current one has not
+        answered within its p90 latency; the first valid quote wins. Otherwise
+        sources are tried one after another. From async code use
+        get_stock_quote_async; called on a thread with a running event loop
+        this falls back to the sequential path.
+        """
+        cached = self._cached_quote(symbol)
+        if cached:
+            return cached
+        
+        candidates = self._quote_candidates(symbol)
+        if self.hedging_enabled if hedged is None else hedged:
+            try:
+                asyncio.get_running_loop()
+                logger.warning(f"get_stock_quote({symbol}) called inside an event loop; not hedging")
+            except RuntimeError:
+                source, data = self.hedger.fetch_sync(candidates, validate=self._is_valid_quote,
+                                                      budget=self._has_quote_budget)
+                if source:
+                    logger.info(f"Hedged quote for {symbol} from {source}")
+                return data
+        
+        for source, fetch in candidates:
+            if not self._has_quote_budget(source):
+                continue
+            try:
+                data = fetch()
+                if self._is_valid_quote(data):
+                    return data
+            except Exception as e:
+                logger.error(f"Error with {source} for {symbol}: {e}")
+        return None
+
+    async def get_stock_quote_async(self, symbol: str) -> Optional[Dict]:
+        """get_stock_quote for async callers: the hedged sources run on worker threads"""
+        cached = await asyncio.to_thread(self._cached_quote, symbol)
+        if cached:
+            return cached
+        
+        source, data = await self.hedger.fetch_blocking(self._quote_candidates(symbol),
+                                                        validate=self._is_valid_quote,
+                                                        budget=self._has_quote_budget)
+        if source:
+            logger.info(f"Hedged quote for {symbol} from {source}")
+        return data
+
+    def get_hedging_stats(self) -> Dict:
+        """Hedge rate, backup wins and tail latency of get_stock_quote"""
+        return self.hedger.get_stats()
+
+    def get_comprehensive_stock_data(self, symbol: str, concurrent: bool = True,
+                                     deadline: Optional[float] = None) -> Dict:
         """
         Get stock data with intelligent fallback between all sources
+        
+        Args:
+            concurrent: Query every source at once and cross-validate whatever
+                has arrived by the deadline (False queries them one after another)
+            deadline: Seconds to wait for sources in concurrent mode
         """
         result = {
             "symbol": symbol,
@@ -809,63 +1290,68 @@ class SimplifiedDataProvider:
             "fallback_data": [],
             "sources_used": [],
             "sources_failed": [],
+            "sources_timed_out": [],
+            "sources_not_started": [],
             "reliability_score": 0,
+            "mode": "concurrent" if concurrent else "sequential",
             "timestamp": datetime.now().isoformat()
         }
+        started = time.time()
         
         # API fetch methods mapping
-        api_methods = {
-            "yahoo": self.fetch_yahoo_data,
-            "alpha_vantage": self.fetch_alpha_vantage_data,
-            "polygon": self.fetch_polygon_data,
-            "iex": self.fetch_iex_data,
-            "tiingo": self.fetch_tiingo_data,
-            "twelve_data": self.fetch_twelve_data,
-            "fmp": self.fetch_fmp_data,
-            "marketstack": self.fetch_marketstack_data,
-            "finnhub": self.fetch_finnhub_data
-        }
+        api_methods = self._api_methods()
+        sources = [api_name for api_name in self.api_priority if api_name in api_methods]
         
-        # Try each API in priority order
-        for api_name in self.api_priority:
-            try:
-                if api_name in api_methods:
-                    data = api_methods[api_name](symbol)
-                    if data:
-                        if result["primary_data"] is None:
-                            # First successful API becomes primary
-                            result["primary_data"] = data
-                            result["sources_used"].append(api_name)
-                            
-                            # Score based on API quality and cache status
-                            if api_name == "yahoo":
-                                result["reliability_score"] += 50
-                            elif api_name == "alpha_vantage":
-                                result["reliability_score"] += 45
-                            elif api_name == "iex":
-                                result["reliability_score"] += 40
-                            elif api_name == "twelve_data":
-                                result["reliability_score"] += 35
-                            elif api_name == "fmp":
-                                result["reliability_score"] += 30
-                            elif api_name == "polygon":
-                                result["reliability_score"] += 25
-                            else:
-                                result["reliability_score"] += 20
-                            
-                            # Bonus for fresh data
-                            if not data.get("_cache_hit"):
-                                result["reliability_score"] += 15
-                        else:
-                            # Additional sources for validation
-                            result["fallback_data"].append(data)
-                            result["sources_used"].append(api_name)
-                            result["reliability_score"] += 5
+        not_started = set()
+        if concurrent:
+            responses, not_started = self._fetch_sources_concurrently(symbol, sources, api_methods,
+                                                                      deadline or self.fanout_deadline)
+        else:
+            responses = {}
+            for api_name in sources:
+                try:
+                    responses[api_name] = api_methods[api_name](symbol)
+                except Exception as e:
+                    logger.error(f"Error with {api_name} for {symbol}: {e}")
+                    responses[api_name] = None
+        
+        # Primary is the best-priority source that answered, whatever order they arrived in
+        for api_name in sources:
+            if api_name not in responses:
+                result["sources_not_started" if api_name in not_started else "sources_timed_out"].append(api_name)
+                continue
+            data = responses[api_name]
+            if data:
+                if result["primary_data"] is None:
+                    # First successful API becomes primary
+                    result["primary_data"] = data
+                    result["sources_used"].append(api_name)
+                    
+                    # Score based on API quality and cache status
+                    if api_name == "yahoo":
+                        result["reliability_score"] += 50
+                    elif api_name == "alpha_vantage":
+                        result["reliability_score"] += 45
+                    elif api_name == "iex":
+                        result["reliability_score"] += 40
+                    elif api_name == "twelve_data":
+                        result["reliability_score"] += 35
+                    elif api_name == "fmp":
+                        result["reliability_score"] += 30
+                    elif api_name == "polygon":
+                        result["reliability_score"] += 25
                     else:
-                        result["sources_failed"].append(api_name)
-                        
-            except Exception as e:
-                logger.error(f"Error with {api_name} for {symbol}: {e}")
+                        result["reliability_score"] += 20
+                    
+                    # Bonus for fresh data
+                    if not data.get("_cache_hit"):
+                        result["reliability_score"] += 15
+                else:
+                    # Additional sources for validation
+                    result["fallback_data"].append(data)
+                    result["sources_used"].append(api_name)
+                    result["reliability_score"] += 5
+            else:
                 result["sources_failed"].append(api_name)
         
         # Add cross-validation if multiple sources available
@@ -889,13 +1375,47 @@ class SimplifiedDataProvider:
             "total_sources_tried": len(self.api_priority),
             "successful_sources": len(result["sources_used"]),
             "failed_sources": len(result["sources_failed"]),
+            "timed_out_sources": len(result["sources_timed_out"]),
+            "not_started_sources": len(result["sources_not_started"]),
             "has_primary_data": result["primary_data"] is not None,
-            "has_fallback_data": len(result["fallback_data"]) > 0
+            "has_fallback_data": len(result["fallback_data"]) > 0,
+            "elapsed_seconds": round(time.time() - started, 3)
         }
         
         logger.info(f"Multi-API data for {symbol}: {len(result['sources_used'])}/{len(self.api_priority)} sources successful, score: {result['reliability_score']}")
         return result
 
+    def _fetch_sources_concurrently(self, symbol: str, sources: List[str], api_methods: Dict[str, Any],
+                                    deadline: float) -> Tuple[Dict[str, Optional[Dict]], set]:
+        """
+        Query sources on the worker pool and return what answered by the deadline
+        
+        Sources still running at the deadline are left out of the result; they
+        finish in the background (and still fill the cache). Sources still queued
+        behind other symbols' fetches are cancelled and reported separately, since
+        they never got to run.
+        
+        Returns:
+            (responses by source, sources that never started)
+        """
+        futures = {self._get_executor().submit(api_methods[api_name], symbol): api_name for api_name in sources}
+        done, not_done = wait(futures, timeout=deadline)
+        
+        responses = {}
+        for future in done:
+            api_name = futures[future]
+            try:
+                responses[api_name] = future.result()
+            except Exception as e:
+                logger.error(f"Error with {api_name} for {symbol}: {e}")
+                responses[api_name] = None
+        not_started = {futures[future] for future in not_done if future.cancel()}
+        if not_done:
+            logger.warning(f"Deadline of {deadline}s hit for {symbol}; "
+                           f"cross-validating without {', '.join(sorted(futures[f] for f in not_done))}"
+                           f"{f' ({len(not_started)} never started)' if not_started else ''}")
+        return responses, not_started
+
     def _cross_validate_data(self, primary: Dict, fallback_list: List[Dict]) -> Dict:
         """Cross-validate data from multiple sources"""
         if not fallback_list:
@@ -937,13 +1457,34 @@ class SimplifiedDataProvider:
             "sources_compared": len(price_differences)
         }
 
-    def get_multiple_stocks_data(self, symbols: List[str]) -> Dict[str, Dict]:
-        """Get data for multiple stocks with batching"""
+    def get_multiple_stocks_data(self, symbols: List[str], concurrent: bool = True,
+                                 max_parallel: Optional[int] = None) -> Dict[str, Dict]:
+        """
+        Get data for multiple stocks with batching
+        
+        In concurrent mode up to max_parallel symbols are processed at once,
+        each fanning out to its sources; per-source pacing still comes from _rate_limit.
+        """
         results = {}
         
+        if concurrent:
+            def fetch(symbol: str) -> Dict:
+                try:
+                    return self.get_comprehensive_stock_data(symbol)
+                except Exception as e:
+                    logger.error(f"Batch error for {symbol}: {e}")
+                    return {"error": str(e)}
+            
+            # Symbols get their own pool: their workers wait on source fetches in the shared one
+            with ThreadPoolExecutor(max_workers=max_parallel or self.max_parallel_symbols,
+                                    thread_name_prefix="symbol-batch") as executor:
+                for symbol, result in zip(symbols, executor.map(fetch, symbols)):
+                    results[symbol] = result
+            return results
+        
         for i, symbol in enumerate(symbols):
             try:
-                result = self.get_comprehensive_stock_data(symbol)
+                result = self.get_comprehensive_stock_data(symbol, concurrent=False)
                 results[symbol] = result
                 
                 # Small delay between requests to be respectful
@@ -1302,8 +1843,34 @@ def benchmark_apis(symbols: List[str] = ["AAPL", "GOOGL", "MSFT", "TSLA"]) -> Di
         )[0] if results["api_performance"] else None
     }
     
+    # Full multi-source lookups: sources one after another vs concurrent fan-out
+    results["wall_time"] = benchmark_fanout(symbols)
+    
     return results
 
+def benchmark_fanout(symbols: List[str]) -> Dict:
+    """Wall time of get_multiple_stocks_data sequentially and concurrently, each on an empty cache"""
+    runs = {}
+    for mode, concurrent in (("sequential", False), ("concurrent", True)):
+        with tempfile.TemporaryDirectory() as tmp:
+            provider = SimplifiedDataProvider(EnhancedCacheSystem(os.path.join(tmp, "benchmark_cache.db")))
+            start_time = time.time()
+            data = provider.get_multiple_stocks_data(symbols, concurrent=concurrent)
+            elapsed = time.time() - start_time
+            provider.cache.close()
+        
+        runs[mode] = {
+            "wall_time_seconds": round(elapsed, 2),
+            "symbols_with_data": sum(1 for result in data.values() if result.get("primary_data")),
+            "sources_used": sum(len(result.get("sources_used", [])) for result in data.values()),
+            "sources_timed_out": sum(len(result.get("sources_timed_out", [])) for result in data.values()),
+            "sources_not_started": sum(len(result.get("sources_not_started", [])) for result in data.values())
+        }
+    
+    concurrent_time = runs["concurrent"]["wall_time_seconds"]
+    runs["speedup"] = round(runs["sequential"]["wall_time_seconds"] / concurrent_time, 1) if concurrent_time else None
+    return runs
+
 # Cache management CLI functions
 def cache_management_cli():
     """Simple CLI for cache management"""
@@ -1406,6 +1973,10 @@ def cache_management_cli():
                 for api, perf in results['api_performance'].items():
                     print(f"  {api}: {perf['success_rate']}% success, {perf['avg_time_ms']}ms avg")
                 
+                wall_time = results['wall_time']
+                print(f"\nMulti-source wall time: {wall_time['sequential']['wall_time_seconds']}s sequential, "
+                      f"{wall_time['concurrent']['wall_time_seconds']}s concurrent ({wall_time['speedup']}x)")
+                
             elif choice == "10":
                 symbol = input("Enter symbol (default: AAPL): ").strip() or "AAPL"
                 print(f"Fetching comprehensive data for {symbol}...")
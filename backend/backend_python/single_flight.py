@@ -0,0 +1,104 @@
+"""
+Single-Flight Request Coalescing
+================================
+
+Concurrent callers asking for the same key share one in-flight fetch:
+- The first caller for a key starts the fetch as a task
+- Callers arriving while it runs await the same task
+- A caller that is cancelled does not cancel the fetch for the others
+- Background refreshes join the same per-key deduplication
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshFailed(Exception):
+    """Raised by a revalidating loader that could not refresh its key; the cached value stays"""
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent async fetches by key
+    """
+
+    def __init__(self, name: str = "default"):
+        self.name = name
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.stats = {'calls': 0, 'fetches': 0, 'coalesced': 0, 'errors': 0,
+                      'background_refreshes': 0}
+
+    async def do(self, key: str, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Run func(*args, **kwargs) once per key across concurrent callers
+
+        Args:
+            key: Identity of the fetch (usually the cache key)
+            func: Coroutine function performing the fetch
+
+        Returns:
+            The fetch result, shared by every caller that joined the flight
+        """
+        self.stats['calls'] += 1
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._start(key, func, *args, **kwargs)
+        else:
+            self.stats['coalesced'] += 1
+            logger.debug(f"Coalesced request for {key} ({self.name})")
+
+        # Shield so one caller's cancellation leaves the shared fetch running
+        return await asyncio.shield(task)
+
+    def refresh(self, key: str, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> bool:
+        """
+        Start a background fetch for a key without waiting for it
+
+        Returns:
+            False if a fetch for the key is already running
+        """
+        if key in self._inflight:
+            return False
+
+        self.stats['background_refreshes'] += 1
+        self._start(key, func, *args, **kwargs)
+        return True
+
+    def in_flight(self) -> int:
+        """Number of fetches currently running"""
+        return len(self._inflight)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing statistics"""
+        calls = self.stats['calls']
+        return {
+            'name': self.name,
+            'calls': calls,
+            'upstream_fetches': self.stats['fetches'],
+            'coalesced_requests': self.stats['coalesced'],
+            'errors': self.stats['errors'],
+            'background_refreshes': self.stats['background_refreshes'],
+            'in_flight': len(self._inflight),
+            'coalesce_rate': round(self.stats['coalesced'] / calls * 100, 1) if calls else 0.0
+        }
+
+    def _start(self, key: str, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> asyncio.Task:
+        self.stats['fetches'] += 1
+        task = asyncio.ensure_future(func(*args, **kwargs))
+        self._inflight[key] = task
+        task.add_done_callback(lambda done, key=key: self._finish(key, done))
+        return task
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            self.stats['errors'] += 1
+            logger.warning(f"Fetch for {key} failed ({self.name}): {error}")
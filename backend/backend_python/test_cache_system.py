@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Enhanced cache test script
+Checks EnhancedCacheSystem get/set behaviour (SQLite and in-process L1 tiers)
+and benchmarks it against the previous connect-per-call access pattern
+"""
+
+import json
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from cache_codecs import CacheCodec, MSGPACK_AVAILABLE, ORJSON_AVAILABLE, ZSTD_AVAILABLE
+from simplified_multi_source import EnhancedCacheSystem
+
+KEYS = 500
+OPS = 5000
+READER_THREADS = 8
+
+
+class ConnectPerCallCache:
+    """The previous access pattern: a fresh connection and commit per call under one lock"""
+
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        conn = sqlite3.connect(cache_file)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS enhanced_cache (
+                key TEXT PRIMARY KEY, data TEXT NOT NULL, timestamp REAL NOT NULL,
+                access_count INTEGER DEFAULT 1, last_accessed REAL NOT NULL,
+                data_size INTEGER NOT NULL, category TEXT DEFAULT 'general', expires_at REAL
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+    def get(self, key, max_age=300):
+        with self._lock:
+            conn = sqlite3.connect(self.cache_file)
+            row = conn.execute("SELECT data, access_count FROM enhanced_cache WHERE key = ?", (key,)).fetchone()
+            if row:
+                conn.execute("UPDATE enhanced_cache SET access_count = access_count + 1, last_accessed = ? WHERE key = ?",
+                             (time.time(), key))
+                conn.commit()
+            conn.close()
+            return json.loads(row[0]) if row else None
+
+    def set(self, key, data, category="general", ttl=None):
+        json_data = json.dumps(data)
+        now = time.time()
+        with self._lock:
+            conn = sqlite3.connect(self.cache_file)
+            conn.execute("SELECT SUM(data_size) FROM enhanced_cache").fetchone()
+            conn.execute("""
+                INSERT OR REPLACE INTO enhanced_cache
+                (key, data, timestamp, last_accessed, data_size, category, expires_at, access_count)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 1)
+            """, (key, json_data, now, now, len(json_data), category, None))
+            conn.commit()
+            conn.close()
+
+    def close(self):
+        pass
+
+
+def quote(i):
+    return {"symbol": f"SYM{i}", "current_price": 100.0 + i, "change": 1.25,
+            "change_percent": 0.8, "volume": 1_000_000 + i, "source": "benchmark"}
+
+
+def test_get_set_roundtrip():
+    """Hits return the stored payload and count accesses, including unflushed ones"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = EnhancedCacheSystem(os.path.join(tmp, "cache.db"), access_flush_size=1000,
+                                    l1_max_size_mb=0)
+        cache.set("AAPL", quote(1), category="stock_data")
+
+        for expected in range(2, 5):
+            hit = cache.get("AAPL")
+            assert hit["current_price"] == 101.0
+            assert hit["_cache_hit"] is True
+            assert hit["_access_count"] == expected, hit["_access_count"]
+
+        stats = cache.get_stats()
+        assert stats["total_entries"] == 1
+        assert stats["max_access_count"] == 4, stats["max_access_count"]
+
+        assert cache.get("MISSING") is None
+        assert cache.invalidate(category="stock_data") == 1
+        assert cache.get("AAPL") is None
+        cache.close()
+    print("✅ get/set roundtrip and batched access counts")
+
+
+def test_l1_tier():
+    """L1 serves hits after write-through or promotion, counts them and evicts by bytes"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.db")
+        cache = EnhancedCacheSystem(path)
+        payload = dict(quote(1), history=[1.0, 2.0], meta={"exchange": "NASDAQ"})
+        cache.set("AAPL", payload, category="stock_data")
+        payload["history"].append(-1)  # Nor may the writer's own object
+        payload["meta"]["exchange"] = "changed"
+
+        hit = cache.get("AAPL")
+        hit["current_price"] = -1  # Callers mutating a hit must not touch the cached copy
+        hit["history"].append(-1)
+        hit["meta"]["exchange"] = "changed"
+        hit = cache.get("AAPL")
+        assert hit["current_price"] == 101.0 and hit["history"] == [1.0, 2.0], hit
+        assert hit["meta"] == {"exchange": "NASDAQ"}, hit
+        assert cache.get("AAPL")["_access_count"] == 4
+        l1 = cache.get_stats()["l1"]
+        assert (l1["hits"], l1["misses"], l1["entries"]) == (3, 0, 1), l1
+        cache.close()
+
+        # A fresh process starts with an empty L1 and promotes from SQLite
+        cache = EnhancedCacheSystem(path)
+        assert cache.get("AAPL")["current_price"] == 101.0
+        assert cache.get("AAPL")["current_price"] == 101.0
+        l1 = cache.get_stats()["l1"]
+        assert (l1["hits"], l1["misses"]) == (1, 1), l1
+
+        assert cache.invalidate(key_pattern="AAPL") == 1
+        assert cache.get("AAPL") is None
+        cache.close()
+
+        # Byte budget: only the most recently used entries stay resident
+        cache = EnhancedCacheSystem(os.path.join(tmp, "small.db"), l1_max_size_mb=0.001)
+        for i in range(50):
+            cache.set(f"K{i}", quote(i))
+        l1 = cache.get_stats()["l1"]
+        assert l1["size_bytes"] <= 1048 and l1["evictions"] == 50 - l1["entries"], l1
+        assert cache.get("K0")["symbol"] == "SYM0"  # Evicted from L1, still in SQLite
+        cache.close()
+    print("✅ L1 write-through, promotion, stats and byte-bounded eviction")
+
+
+def stored_size(cache):
+    """Running size counter and the real total, read straight from SQLite"""
+    conn = sqlite3.connect(cache.cache_file)
+    counter = conn.execute("SELECT total_size FROM enhanced_cache_meta").fetchone()[0]
+    actual = conn.execute("SELECT COALESCE(SUM(data_size), 0) FROM enhanced_cache").fetchone()[0]
+    conn.close()
+    return counter, actual
+
+
+def survivors(cache, keys):
+    conn = sqlite3.connect(cache.cache_file)
+    present = {row[0] for row in conn.execute("SELECT key FROM enhanced_cache")}
+    conn.close()
+    return [key for key in keys if key in present]
+
+
+def test_eviction_policies():
+    """Each policy evicts in one pass, keeps its favoured entries and the size counter exact"""
+    budget_mb = 0.01  # ~10 KB, roughly 90 quotes
+    with tempfile.TemporaryDirectory() as tmp:
+        # LRU: a key read just before the overflow survives
+        cache = EnhancedCacheSystem(os.path.join(tmp, "lru.db"), max_size_mb=budget_mb, l1_max_size_mb=0)
+        for i in range(80):
+            cache.set(f"K{i}", quote(i))
+        cache.get("K0")
+        for i in range(80, 120):
+            cache.set(f"K{i}", quote(i))
+        assert survivors(cache, ["K0", "K1"]) == ["K0"]
+        counter, actual = stored_size(cache)
+        assert counter == actual <= cache.max_size_bytes, (counter, actual)
+        assert cache.get_stats()["evictions"]["runs"] >= 1
+        cache.close()
+
+        # LFU: frequently read keys outlive recently written ones
+        cache = EnhancedCacheSystem(os.path.join(tmp, "lfu.db"), max_size_mb=budget_mb,
+                                    l1_max_size_mb=0, eviction_policy="lfu")
+        for i in range(80):
+            cache.set(f"K{i}", quote(i))
+            if i < 5:
+                for _ in range(3):
+                    cache.get(f"K{i}")
+        for i in range(80, 120):
+            cache.set(f"K{i}", quote(i))
+        assert survivors(cache, [f"K{i}" for i in range(5)]) == [f"K{i}" for i in range(5)]
+        counter, actual = stored_size(cache)
+        assert counter == actual <= cache.max_size_bytes, (counter, actual)
+        cache.close()
+
+        # GDSF: at equal frequency, large entries go before small ones
+        cache = EnhancedCacheSystem(os.path.join(tmp, "gdsf.db"), max_size_mb=budget_mb,
+                                    l1_max_size_mb=0, eviction_policy="gdsf")
+        cache.set("BIG", {"rows": [os.urandom(50).hex() for _ in range(40)]})  # Barely compressible
+        for i in range(100):
+            cache.set(f"K{i}", quote(i))
+        assert survivors(cache, ["BIG"]) == []
+        assert len(survivors(cache, [f"K{i}" for i in range(100)])) > 50
+        counter, actual = stored_size(cache)
+        assert counter == actual <= cache.max_size_bytes, (counter, actual)
+        cache.close()
+
+        try:
+            EnhancedCacheSystem(os.path.join(tmp, "bad.db"), eviction_policy="fifo")
+            assert False, "unknown policy accepted"
+        except ValueError:
+            pass
+    print("✅ LRU, LFU and GDSF eviction with an exact running size")
+
+
+def indicators_payload(i):
+    """Indicator-style payload: repetitive keys and long float series"""
+    return {
+        "symbol": f"SYM{i}",
+        "timestamp": "2024-01-02T15:30:00",
+        "history": [{"date": f"2024-01-{d % 28 + 1:02d}", "open": 100.0 + d, "high": 101.5 + d,
+                     "low": 99.25 + d, "close": 100.75 + d, "volume": 1_000_000 + d * 10,
+                     "sma_20": 100.1 + d, "rsi": 55.5} for d in range(60)],
+        "signals": ["bullish", "above_sma_20", "volume_spike"] * 3
+    }
+
+
+def available_codecs():
+    codecs = [CacheCodec("json", "none"), CacheCodec("json", "zlib")]
+    if ORJSON_AVAILABLE:
+        codecs += [CacheCodec("orjson", "none"), CacheCodec("orjson", "zlib")]
+    if MSGPACK_AVAILABLE:
+        codecs += [CacheCodec("msgpack", "zlib")]
+    if ZSTD_AVAILABLE:
+        codecs += [CacheCodec(serializer, "zstd") for serializer in ("json", "orjson", "msgpack")
+                   if serializer != "orjson" or ORJSON_AVAILABLE
+                   if serializer != "msgpack" or MSGPACK_AVAILABLE]
+    return codecs
+
+
+def test_codecs_roundtrip_and_legacy_rows():
+    """Every codec round-trips, and rows written by other codecs or as json text still read"""
+    payload = indicators_payload(7)
+    for codec in available_codecs():
+        blob, tag, raw_size = codec.encode(payload)
+        assert codec.decode(blob, tag) == payload, codec.name
+        assert CacheCodec("json", "zlib").decode(blob, tag) == payload, codec.name
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.db")
+        cache = EnhancedCacheSystem(path, l1_max_size_mb=0)
+        cache.close()
+
+        # A row as the json-text schema wrote it: no codec tag
+        conn = sqlite3.connect(path)
+        legacy = json.dumps(quote(3))
+        now = time.time()
+        conn.execute("""
+            INSERT INTO enhanced_cache (key, data, timestamp, last_accessed, data_size, category)
+            VALUES (?, ?, ?, ?, ?, 'stock_data')
+        """, ("LEGACY", legacy, now, now, len(legacy)))
+        conn.commit()
+        conn.close()
+
+        cache = EnhancedCacheSystem(path, l1_max_size_mb=0)
+        assert cache.get("LEGACY")["symbol"] == "SYM3"
+        cache.set("NEW", indicators_payload(1))
+        assert cache.get("NEW")["history"][59]["close"] == 159.75
+        stats = cache.get_stats()
+        assert stats["codecs"]["json"] == 1 and stats["compression_ratio"] > 1, stats
+        cache.close()
+    print(f"✅ {len(available_codecs())} codecs round-trip; legacy json rows still read")
+
+
+def test_codecs_keep_non_finite_floats():
+    """NaN and +/-inf (warm-up indicator values) survive every codec instead of turning into None"""
+    payload = {"sma_200": [float("nan")] * 3 + [101.5], "upper": float("inf"), "lower": float("-inf"),
+               "note": None}
+    for codec in available_codecs():
+        blob, tag, _ = codec.encode(payload)
+        decoded = codec.decode(blob, tag)
+        assert all(math.isnan(v) for v in decoded["sma_200"][:3]) and decoded["sma_200"][3] == 101.5, codec.name
+        assert decoded["upper"] == float("inf") and decoded["lower"] == float("-inf"), codec.name
+        assert decoded["note"] is None, codec.name
+    print("✅ NaN and inf round-trip through every codec")
+
+
+def test_concurrent_readers_and_writer():
+    """Readers on several threads see committed rows while a writer keeps inserting"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = EnhancedCacheSystem(os.path.join(tmp, "cache.db"))
+        for i in range(KEYS):
+            cache.set(f"K{i}", quote(i))
+
+        errors = []
+
+        def reader():
+            for i in range(KEYS):
+                hit = cache.get(f"K{i}")
+                if hit is None or hit["symbol"] != f"SYM{i}":
+                    errors.append(i)
+
+        def writer():
+            for i in range(KEYS, KEYS * 2):
+                cache.set(f"K{i}", quote(i))
+
+        threads = [threading.Thread(target=reader) for _ in range(READER_THREADS)]
+        threads.append(threading.Thread(target=writer))
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert not errors, f"{len(errors)} reads failed"
+        assert cache.get_stats()["total_entries"] == KEYS * 2
+        cache.close()
+    print(f"✅ {READER_THREADS} reader threads alongside a writer")
+
+
+def run_ops(cache):
+    """Time sets, single-thread gets and multi-thread gets against one cache"""
+    start_time = time.perf_counter()
+    for i in range(OPS):
+        cache.set(f"K{i % KEYS}", quote(i))
+    set_rate = OPS / (time.perf_counter() - start_time)
+
+    start_time = time.perf_counter()
+    for i in range(OPS):
+        cache.get(f"K{i % KEYS}")
+    get_rate = OPS / (time.perf_counter() - start_time)
+
+    def reader():
+        for i in range(OPS // READER_THREADS):
+            cache.get(f"K{i % KEYS}")
+
+    threads = [threading.Thread(target=reader) for _ in range(READER_THREADS)]
+    start_time = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    threaded_rate = OPS / (time.perf_counter() - start_time)
+
+    return set_rate, get_rate, threaded_rate
+
+
+def benchmark_codecs():
+    """Encoded size and encode/decode speed per codec on indicator payloads"""
+    payloads = [indicators_payload(i) for i in range(200)]
+    baseline = sum(len(json.dumps(p).encode('utf-8')) for p in payloads)
+
+    print(f"\n📦 Codecs over {len(payloads)} indicator payloads ({baseline / len(payloads):.0f} B json each)")
+    print(f"   {'':>14}  {'ratio':>6} {'enc/s':>8} {'dec/s':>8}")
+    for codec in available_codecs():
+        start_time = time.perf_counter()
+        encoded = [codec.encode(p) for p in payloads]
+        encode_rate = len(payloads) / (time.perf_counter() - start_time)
+
+        start_time = time.perf_counter()
+        for blob, tag, _ in encoded:
+            codec.decode(blob, tag)
+        decode_rate = len(payloads) / (time.perf_counter() - start_time)
+
+        stored = sum(len(blob) for blob, _, _ in encoded)
+        print(f"   {codec.name:>14}: {baseline / stored:>6.1f} {encode_rate:>8.0f} {decode_rate:>8.0f}")
+
+
+def benchmark():
+    """Compare ops/sec of the connect-per-call pattern, the pooled WAL store and L1 + WAL"""
+    results = {}
+    variants = (
+        ('per-call', ConnectPerCallCache),
+        ('pooled WAL', lambda path: EnhancedCacheSystem(path, l1_max_size_mb=0)),
+        ('L1 + WAL', EnhancedCacheSystem),
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, factory in variants:
+            cache = factory(os.path.join(tmp, f"{label.replace(' ', '_')}.db"))
+            results[label] = run_ops(cache)
+            cache.close()
+
+    print(f"\n⏱️ {OPS} ops over {KEYS} keys ({READER_THREADS} threads for concurrent gets)")
+    print(f"   {'':>10}  {'set/s':>10} {'get/s':>10} {'get/s MT':>10}")
+    for label, (set_rate, get_rate, threaded_rate) in results.items():
+        print(f"   {label:>10}: {set_rate:>10.0f} {get_rate:>10.0f} {threaded_rate:>10.0f}")
+    before = results['per-call']
+    for label in ('pooled WAL', 'L1 + WAL'):
+        after = results[label]
+        print(f"🚀 {label}: set {after[0] / before[0]:.1f}x, get {after[1] / before[1]:.1f}x, "
+              f"concurrent get {after[2] / before[2]:.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    print("🗄️ Enhanced Cache Test")
+    print("=" * 50)
+    test_get_set_roundtrip()
+    test_l1_tier()
+    test_eviction_policies()
+    test_codecs_roundtrip_and_legacy_rows()
+    test_codecs_keep_non_finite_floats()
+    test_concurrent_readers_and_writer()
+    benchmark()
+    benchmark_codecs()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Hedged requests test script
+Checks that HedgedRequester fires a backup once the primary overruns its
+p90, takes the first valid answer, cancels the losers, fails over on errors
+and respects provider budgets and the hedge-rate cap. Compares tail latency
+against trying providers one after another.
+"""
+
+import asyncio
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from hedged_requests import HedgedRequester
+
+FAST, SLOW = 0.02, 0.5
+
+
+class FakeProvider:
+    """Answers in FAST seconds, or SLOW seconds for `slow_share` of calls"""
+
+    def __init__(self, name, slow_share=0.0, fails=False):
+        self.name = name
+        self.slow_share = slow_share
+        self.fails = fails
+        self.calls = 0
+        self.cancelled = 0
+
+    async def quote(self):
+        self.calls += 1
+        try:
+            await asyncio.sleep(SLOW if random.random() < self.slow_share else FAST)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fails:
+            raise RuntimeError(f"{self.name} unavailable")
+        return {'price': 100.0, 'source': self.name}
+
+
+def p99(samples):
+    return sorted(samples)[int(len(samples) * 0.99) - 1]
+
+
+async def test_hedge_and_cancel():
+    hedger = HedgedRequester('test', default_delay=0.05)
+    primary, backup = FakeProvider('primary', slow_share=1.0), FakeProvider('backup')
+
+    source, answer = await hedger.fetch([('primary', primary.quote), ('backup', backup.quote)])
+    assert source == 'backup' and answer['source'] == 'backup', source
+    await asyncio.sleep(0)
+    assert primary.cancelled == 1, "the losing primary should be cancelled"
+
+    stats = hedger.get_stats()
+    assert stats['hedges_fired'] == 1 and stats['backup_wins'] == 1 and stats['cancelled'] == 1, stats
+    print("✅ Slow primary hedged after its delay, backup won, primary cancelled")
+
+
+async def test_failover_and_budget():
+    hedger = HedgedRequester('test', default_delay=5.0)
+    broken, backup = FakeProvider('broken', fails=True), FakeProvider('backup')
+
+    start = time.perf_counter()
+    source, _ = await hedger.fetch([('broken', broken.quote), ('backup', backup.quote)])
+    assert source == 'backup' and time.perf_counter() - start < 1, "a failure should fail over at once"
+    assert hedger.stats['failovers'] == 1 and hedger.stats['hedges_fired'] == 0
+
+    # A provider without budget is never called
+    skipped = FakeProvider('skipped')
+    source, _ = await hedger.fetch([('skipped', skipped.quote), ('backup', backup.quote)],
+                                   budget=lambda name: name != 'skipped')
+    assert source == 'backup' and skipped.calls == 0 and hedger.stats['budget_denied'] == 1
+
+    source, answer = await hedger.fetch([('broken', broken.quote)])
+    assert source is None and answer is None and hedger.stats['all_failed'] == 1
+    print("✅ Errors fail over immediately, out-of-budget providers are skipped")
+
+
+async def test_hedge_rate_cap():
+    hedger = HedgedRequester('test', default_delay=0.01, max_hedge_ratio=0.25)
+    primary, backup = FakeProvider('primary', slow_share=1.0), FakeProvider('backup')
+
+    for _ in range(20):
+        await hedger.fetch([('primary', primary.quote), ('backup', backup.quote)])
+    stats = hedger.get_stats()
+    assert stats['hedged_requests'] <= 5, stats
+    assert stats['ratio_denied'] > 0 and stats['hedge_rate'] <= 25, stats
+    print(f"✅ Hedge rate capped at {stats['hedge_rate']}% of requests")
+
+
+async def tail_latency_comparison():
+    """1 in 20 primary calls stalls; sequential waits it out, hedging does not"""
+    random.seed(7)
+    requests = 200
+    hedger = HedgedRequester('compare', default_delay=0.1, max_hedge_ratio=0.3)
+    primary, backup = FakeProvider('primary', slow_share=0.05), FakeProvider('backup')
+
+    sequential, hedged = [], []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await primary.quote()
+        sequential.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await hedger.fetch([('primary', primary.quote), ('backup', backup.quote)])
+        hedged.append(time.perf_counter() - start)
+
+    stats = hedger.get_stats()
+    print(f"\n⏱️ {requests} quotes, primary stalls {SLOW * 1000:.0f} ms on 5% of calls")
+    print(f"   sequential p99: {p99(sequential) * 1000:>6.0f} ms")
+    print(f"   hedged p99:     {p99(hedged) * 1000:>6.0f} ms "
+          f"(hedge rate {stats['hedge_rate']}%, backup wins {stats['backup_win_rate']}%)")
+    assert p99(hedged) < p99(sequential) / 2, (p99(hedged), p99(sequential))
+    assert stats['hedge_rate'] <= 30, stats
+
+
+def test_fetch_sync():
+    hedger = HedgedRequester('sync', default_delay=0.05)
+
+    def slow():
+        time.sleep(SLOW)
+        return {'price': 1}
+
+    source, _ = hedger.fetch_sync([('slow', slow), ('fast', lambda: {'price': 2})])
+    assert source == 'fast', source
+    print("✅ fetch_sync hedges blocking providers on worker threads")
+
+
+def test_fetch_sync_from_threads():
+    """fast_api_server calls one shared hedger from a thread pool; stats and samples must stay consistent"""
+    hedger = HedgedRequester('threads', default_delay=0.005)
+    errors = []
+    done = threading.Event()
+
+    def provider(delay):
+        def call():
+            time.sleep(delay * random.random())
+            return {'price': 1}
+        return call
+
+    def read_stats():
+        while not done.is_set():
+            try:
+                hedger.get_stats()
+            except Exception as e:
+                errors.append(e)
+
+    reader = threading.Thread(target=read_stats)
+    reader.start()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: hedger.fetch_sync([('a', provider(0.02)), ('b', provider(0.005))]),
+                                range(200)))
+    done.set()
+    reader.join()
+
+    stats = hedger.get_stats()
+    assert not errors, errors
+    assert all(source for source, _ in results) and stats['requests'] == 200, stats
+    print("✅ 200 fetch_sync calls from 8 threads on one hedger; stats read concurrently without errors")
+
+
+async def test_blocking_providers_from_coroutine():
+    """FastAPI handlers call in from a running loop: fetch_sync refuses, the async paths work"""
+    hedger = HedgedRequester('async', default_delay=0.05)
+
+    def slow():
+        time.sleep(SLOW)
+        return {'price': 1}
+
+    try:
+        hedger.fetch_sync([('fast', lambda: {'price': 2})])
+        assert False, "fetch_sync inside a running loop should raise"
+    except RuntimeError:
+        pass
+    source, _ = await hedger.fetch_blocking([('slow', slow), ('fast', lambda: {'price': 2})])
+    assert source == 'fast', source
+
+    from simplified_multi_source import EnhancedCacheSystem, SimplifiedDataProvider
+    with tempfile.TemporaryDirectory() as tmp:
+        provider = SimplifiedDataProvider(EnhancedCacheSystem(os.path.join(tmp, "quotes.db")))
+        provider.fetch_yahoo_data = lambda symbol: (time.sleep(SLOW), {'current_price': 1.0, 'source': 'yahoo'})[1]
+        provider.fetch_alpha_vantage_data = lambda symbol: {'current_price': 2.0, 'source': 'alpha_vantage'}
+        provider.hedger.default_delay = 0.05
+
+        provider.adaptive_routing = False
+
+        quote = await provider.get_stock_quote_async('AAPL')
+        assert quote['source'] == 'alpha_vantage', quote
+        # The sync entry point falls back to trying sources in order instead of raising
+        quote = provider.get_stock_quote('MSFT')
+        assert quote['source'] == 'yahoo', quote
+        provider.cache.close()
+    print("✅ Blocking providers hedged from a coroutine; get_stock_quote falls back to sequential")
+
+
+def test_quote_sources_routed_by_latency():
+    """get_stock_quote learns to lead with the source that answers fastest"""
+    from rate_limiter import smart_api_manager
+    from simplified_multi_source import EnhancedCacheSystem, SimplifiedDataProvider
+    smart_api_manager.api_stats.clear()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        provider = SimplifiedDataProvider(EnhancedCacheSystem(os.path.join(tmp, "quotes.db")))
+        provider.quote_budgets = {source: 10_000 for source in provider.quote_sources}
+        provider.hedger.default_delay = 0.05
+        provider.fetch_yahoo_data = lambda symbol: (time.sleep(0.3), {'current_price': 1.0, 'source': 'yahoo'})[1]
+        provider.fetch_alpha_vantage_data = lambda symbol: None
+        provider.fetch_finnhub_data = lambda symbol: {'current_price': 3.0, 'source': 'finnhub'}
+
+        latencies, sources = [], []
+        for i in range(30):
+            start = time.perf_counter()
+            sources.append(provider.get_stock_quote(f"SYM{i}")['source'])
+            latencies.append(time.perf_counter() - start)
+            time.sleep(0.01)
+        primary = provider._quote_candidates('X')[0][0]
+        provider.cache.close()
+
+    # Yahoo's slow answers and alpha_vantage's failures, timed from the real fetches, put finnhub first
+    assert primary == 'finnhub', smart_api_manager.rank(provider.quote_sources)
+    assert set(sources) == {'finnhub'}, sources
+    assert max(latencies[-10:]) < latencies[0], latencies
+    print(f"✅ Quote routing learned {primary} leads: first quote {latencies[0] * 1000:.0f} ms, "
+          f"last 10 max {max(latencies[-10:]) * 1000:.0f} ms")
+
+
+async def main():
+    await test_hedge_and_cancel()
+    await test_failover_and_budget()
+    await test_hedge_rate_cap()
+    await test_blocking_providers_from_coroutine()
+    await tail_latency_comparison()
+
+
+if __name__ == "__main__":
+    print("🏁 Hedged Requests Test")
+    print("=" * 50)
+    test_fetch_sync()
+    test_fetch_sync_from_threads()
+    test_quote_sources_routed_by_latency()
+    asyncio.run(main())
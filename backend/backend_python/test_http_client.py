@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP client test script
+Checks AsyncHTTPClient and the shared SessionRegistry pool against a local
+slow server, and load-tests concurrent handlers using blocking requests.get
+versus the shared async session
+"""
+
+import asyncio
+import threading
+import time
+
+import requests
+from aiohttp import web
+
+from http_client import AsyncHTTPClient, SessionRegistry
+
+DELAY = 0.2
+CONCURRENT_REQUESTS = 20
+
+
+def start_server():
+    """Local JSON endpoint that answers after DELAY seconds, on its own thread and loop"""
+    async def slow(request):
+        await asyncio.sleep(DELAY)
+        return web.json_response({'data': [{'value': request.query.get('n', '0')}]})
+
+    async def missing(request):
+        return web.json_response({'error': 'not found'}, status=404)
+
+    loop = asyncio.new_event_loop()
+    app = web.Application()
+    app.router.add_get('/slow', slow)
+    app.router.add_get('/missing', missing)
+    runner = web.AppRunner(app)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    loop.run_until_complete(site.start())
+    port = runner.addresses[0][1]
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return f"http://127.0.0.1:{port}"
+
+
+async def test_get_json(base_url):
+    client = AsyncHTTPClient(SessionRegistry())
+    status, payload = await client.get_json(f"{base_url}/slow", params={'n': '7'})
+    assert status == 200 and payload['data'][0]['value'] == '7', payload
+
+    status, payload = await client.get_json(f"{base_url}/missing")
+    assert status == 404 and payload is None
+
+    try:
+        await client.get_json(f"{base_url}/slow", timeout=DELAY / 4)
+        assert False, "expected a timeout"
+    except asyncio.TimeoutError:
+        pass
+
+    stats = client.get_stats()
+    assert stats['requests'] == 3 and stats['errors'] == 1, stats
+    assert stats['pool']['sessions']['default']['sessions_created'] == 1, stats
+
+    await client.close()
+    assert not client.get_stats()['pool']['open']
+    print("✅ get_json status, payload, timeout and stats")
+
+
+async def test_shared_pool(base_url):
+    """Named sessions share one connector, its per-host limit and its idle connections"""
+    registry = SessionRegistry(limit_per_host=2)
+
+    async def fetch(name):
+        async with registry.session(name) as session:
+            async with session.get(f"{base_url}/slow") as response:
+                return await response.json()
+
+    await asyncio.gather(*(fetch('providers' if i % 2 else 'sentiment') for i in range(8)))
+    await asyncio.gather(*(fetch('providers') for _ in range(2)))
+
+    stats = registry.get_stats()
+    assert stats['connections_created'] == 2, stats
+    assert stats['connections_reused'] == 8, stats
+    assert sum(s['queued'] for s in stats['sessions'].values()) == 6, stats
+    assert stats['in_flight'] == 0 and set(stats['sessions']) == {'providers', 'sentiment'}, stats
+
+    # Closing a session leaves the pool to the others
+    await (await registry.get_session('sentiment')).close()
+    await fetch('providers')
+    assert registry.get_stats()['connections_reused'] == 9
+
+    await registry.close()
+    print(f"✅ Shared pool: 11 requests over {stats['connections_created']} connections across 2 sessions")
+
+
+async def load_test(base_url):
+    """Concurrent handlers: blocking requests.get vs the shared async client"""
+    async def blocking_handler(n):
+        # The previous pattern: a synchronous call inside async def
+        resp = requests.get(f"{base_url}/slow", params={'n': n}, timeout=10)
+        return resp.json()
+
+    client = AsyncHTTPClient(SessionRegistry())
+
+    async def async_handler(n):
+        _, payload = await client.get_json(f"{base_url}/slow", params={'n': n})
+        return payload
+
+    results = {}
+    for label, handler in (('requests.get', blocking_handler), ('shared client', async_handler)):
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(handler(str(i)) for i in range(CONCURRENT_REQUESTS)))
+        elapsed = time.perf_counter() - start
+        assert len(responses) == CONCURRENT_REQUESTS
+        results[label] = CONCURRENT_REQUESTS / elapsed
+    await client.close()
+
+    print(f"\n⏱️ {CONCURRENT_REQUESTS} concurrent handlers, upstream latency {DELAY * 1000:.0f} ms")
+    for label, rate in results.items():
+        print(f"   {label:>14}: {rate:>7.1f} req/s")
+    print(f"🚀 Shared client: {results['shared client'] / results['requests.get']:.1f}x throughput")
+    # The blocking handlers run one at a time, so they cannot beat 1 / DELAY
+    assert results['shared client'] > 2 * results['requests.get'], results
+    return results
+
+
+async def main(base_url):
+    await test_get_json(base_url)
+    await test_shared_pool(base_url)
+    await load_test(base_url)
+
+
+if __name__ == "__main__":
+    print("🌐 Shared HTTP Client Test")
+    print("=" * 50)
+    asyncio.run(main(start_server()))
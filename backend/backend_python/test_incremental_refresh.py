@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Incremental refresh test script
+Checks that MarketDataFetcher._refresh_incremental extends a cached frame to
+the same indicators a full recompute gives, and that a frame too short to
+seed the rolling windows goes straight to a full download
+"""
+
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from analytics.data_fetcher import INDICATOR_LOOKBACK, MarketDataFetcher
+
+COLUMNS = ['SMA_20', 'SMA_50', 'EMA_12', 'EMA_26', 'RSI', 'MACD', 'MACD_Signal', 'MACD_Histogram',
+           'BB_Middle', 'BB_Upper', 'BB_Lower', 'Volume_SMA', 'Volume_Ratio']
+
+
+def make_bars(bars, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, bars)))
+    return pd.DataFrame({
+        'Open': close,
+        'High': close * 1.01,
+        'Low': close * 0.99,
+        'Close': close,
+        'Volume': rng.integers(100_000, 5_000_000, bars).astype(float)
+    }, index=pd.bdate_range('2020-01-01', periods=bars))
+
+
+def stub_upstream(fetcher, bars):
+    """Serve _fetch_yahoo_since from `bars` and count the calls"""
+    calls = []
+
+    async def fetch_since(symbol, start, interval):
+        calls.append(start)
+        return bars[bars.index >= start].copy()
+
+    fetcher._fetch_yahoo_since = fetch_since
+    return calls
+
+
+async def test_incremental_matches_full_recompute():
+    fetcher = MarketDataFetcher()
+    data = make_bars(300, seed=3)
+    # The last cached bar was still forming: upstream now has its final values
+    cached = data.iloc[:250].copy()
+    cached.iloc[-1, cached.columns.get_loc('Close')] *= 0.99
+    previous = fetcher._add_basic_indicators(cached)
+    calls = stub_upstream(fetcher, data)
+
+    refreshed = await fetcher._refresh_incremental('TEST', 'max', '1d', previous.copy())
+    expected = fetcher._add_basic_indicators(data.copy())
+
+    assert len(calls) == 1 and refreshed.index.equals(expected.index)
+    for column in COLUMNS:
+        np.testing.assert_allclose(refreshed[column].to_numpy(dtype=float), expected[column].to_numpy(dtype=float),
+                                   rtol=1e-9, equal_nan=True, err_msg=column)
+    assert fetcher.refresh_stats['bars_appended'] == 51, fetcher.refresh_stats
+    print("✅ Incremental refresh matches a full recompute (partial last bar replaced)")
+
+
+async def test_short_history_skips_fetch():
+    fetcher = MarketDataFetcher()
+    data = make_bars(100, seed=4)
+    previous = fetcher._add_basic_indicators(data.iloc[:INDICATOR_LOOKBACK - 1].copy())
+    calls = stub_upstream(fetcher, data)
+
+    assert await fetcher._refresh_incremental('TEST', 'max', '1d', previous) is None
+    assert not calls, "a frame shorter than INDICATOR_LOOKBACK should not fetch"
+    print("✅ Frames shorter than the indicator lookback fall back without an extra request")
+
+
+async def main():
+    await test_incremental_matches_full_recompute()
+    await test_short_history_skips_fetch()
+
+
+if __name__ == "__main__":
+    print("🔁 Incremental Refresh Test")
+    print("=" * 50)
+    asyncio.run(main())
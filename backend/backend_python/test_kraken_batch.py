@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Kraken batch quotes test script
+Checks that KrakenProvider.fetch_batch_quotes packs distinct pairs into as
+few Ticker requests as possible, maps canonical result keys (XXBTZUSD) back
+to every symbol that asked for them, and retries pairs one by one when a
+batch is rejected. Runs against a stubbed _make_request.
+"""
+
+import asyncio
+
+from providers.crypto.kraken_provider import KrakenProvider
+
+# Kraken answers these legacy pairs under their canonical names
+CANONICAL = {'XBTUSD': 'XXBTZUSD', 'ETHUSD': 'XETHZUSD', 'LTCUSD': 'XLTCZUSD', 'XRPUSD': 'XXRPZUSD'}
+
+OTHER_COINS = ['AAVE', 'UNI', 'AVAX', 'MATIC', 'NEAR', 'ALGO', 'FIL', 'ETC', 'TRX', 'XTZ', 'EOS', 'MKR',
+               'COMP', 'SNX', 'GRT', 'CRV', 'SAND', 'MANA', 'AXS', 'APE', 'OP', 'ARB', 'INJ', 'SUI']
+
+
+def stub_kraken(unknown=()):
+    """KrakenProvider whose Ticker endpoint is served in memory; returns (provider, requests)"""
+    provider = KrakenProvider({'id': 'kraken_test', 'name': 'Kraken'})
+    requests = []
+
+    async def make_request(endpoint, method='GET', params=None, data=None):
+        pairs = params['pair'].split(',')
+        requests.append(pairs)
+        if any(pair in unknown for pair in pairs):
+            return {'error': ['EQuery:Unknown asset pair'], 'result': {}}
+        return {'error': [], 'result': {
+            CANONICAL.get(pair, pair): {'c': [str(100.0 + i), '1'], 'o': '100.0', 'v': ['1', '500'],
+                                        'h': ['1', '110'], 'l': ['1', '90']}
+            for i, pair in enumerate(pairs)
+        }}
+
+    provider._make_request = make_request
+    return provider, requests
+
+
+async def test_fifty_symbol_batch():
+    provider, requests = stub_kraken()
+    coin_ids = list(provider.coin_ids)
+    symbols = list(provider.symbol_mappings) + coin_ids + OTHER_COINS + ['btc', 'eth']
+    assert len(symbols) == 50, len(symbols)
+
+    quotes = await provider.fetch_batch_quotes(symbols)
+    pairs = {provider._get_kraken_symbol(symbol) for symbol in symbols}
+    assert len(requests) == -(-len(pairs) // KrakenProvider.BATCH_SIZE), requests
+    assert sum(len(batch) for batch in requests) == len(pairs), "every pair requested once"
+
+    assert set(quotes) == set(symbols), set(symbols) - set(quotes)
+    # XBTUSD comes back as XXBTZUSD and fills BTC, bitcoin and btc alike
+    assert quotes['BTC']['price'] == quotes['bitcoin']['price'] == quotes['btc']['price']
+    assert [quotes[s]['symbol'] for s in ('BTC', 'bitcoin', 'btc')] == ['BTC', 'bitcoin', 'btc']
+    assert quotes['DOGE']['price'] == quotes['dogecoin']['price']
+    print(f"✅ {len(symbols)} symbols ({len(pairs)} pairs) in {len(requests)} Ticker requests; "
+          f"XXBTZUSD mapped back to BTC/bitcoin/btc")
+
+
+async def test_rejected_batch_falls_back_per_pair():
+    provider, requests = stub_kraken(unknown={'FAKEUSD'})
+    symbols = ['BTC', 'bitcoin', 'ETH', 'FAKE', 'SOL']
+
+    quotes = await provider.fetch_batch_quotes(symbols)
+    assert set(quotes) == {'BTC', 'bitcoin', 'ETH', 'SOL'}, set(quotes)
+    # One rejected batch, then one request per distinct pair (BTC and bitcoin share XBTUSD)
+    assert len(requests) == 1 + 4 and sorted(map(tuple, requests[1:])) == [
+        ('ETHUSD',), ('FAKEUSD',), ('SOLUSD',), ('XBTUSD',)], requests
+    print("✅ Rejected batch retried once per pair; the unknown pair is dropped, aliases kept")
+
+
+async def main():
+    await test_fifty_symbol_batch()
+    await test_rejected_batch_falls_back_per_pair()
+
+
+if __name__ == "__main__":
+    print("🐙 Kraken Batch Quotes Test")
+    print("=" * 50)
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Panel screener test script
+Checks the cross-sectional panel scans against the per-symbol scans
+and benchmarks a 2,000 symbol universe once data is resident
+"""
+
+import asyncio
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from analytics.data_fetcher import MarketDataFetcher
+from analytics.scan_panel import ScanPanel
+from analytics.scan_session import ScanSession
+from analytics.screener import StockScreener, ScanType
+
+BARS = 130  # ~6 months of daily bars
+UNIVERSE = 2000
+
+
+def make_frame(fetcher, seed, bars=BARS):
+    """Random-walk OHLCV frame with indicators, occasional volume and price shocks"""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, 0.02, bars)
+    returns[-1] += rng.choice([0, 0.06, -0.06], p=[0.8, 0.1, 0.1])
+    close = 100 * np.exp(np.cumsum(returns))
+    open_ = close * (1 + rng.normal(0, 0.01, bars))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, bars)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, bars)))
+    volume = rng.integers(100_000, 5_000_000, bars).astype(float)
+    volume[-1] *= rng.choice([1, 4])
+    data = pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume},
+                        index=pd.bdate_range(end='2026-10-15', periods=bars))
+    return fetcher._add_basic_indicators(data)
+
+
+def make_session(count):
+    fetcher = MarketDataFetcher()
+    session = ScanSession(fetcher, period="6mo")
+    session.frames = {f"SYM{i}.NS": make_frame(fetcher, i) for i in range(count)}
+    return StockScreener(fetcher), session
+
+
+def result_key(result):
+    return (result.symbol, result.scan_type, round(float(result.signal_strength), 6),
+            round(float(result.current_price), 6))
+
+
+def test_panel_matches_per_symbol_scans():
+    """Panel scans return the same results as the per-symbol scans on a shared session"""
+    screener, session = make_session(300)
+    symbols = list(session.frames)
+
+    per_symbol = asyncio.run(screener.run_multiple_scans(list(ScanType), symbols, session=session))
+    panel = screener.scan_panel(ScanPanel.from_session(session), list(ScanType))
+
+    total = 0
+    for code, expected in per_symbol.items():
+        assert [result_key(r) for r in expected] == [result_key(r) for r in panel[code]], code
+        total += len(expected)
+    print(f"✅ {total} scan results match across {len(per_symbol)} scan types")
+
+
+def benchmark():
+    """Time all scan types over the universe, per-symbol vs panel"""
+    screener, session = make_session(UNIVERSE)
+    symbols = list(session.frames)
+
+    start_time = time.perf_counter()
+    asyncio.run(screener.run_multiple_scans(list(ScanType), symbols, session=session))
+    per_symbol_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    panel = ScanPanel.from_session(session)
+    build_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    screener.scan_panel(panel, list(ScanType))
+    scan_time = time.perf_counter() - start_time
+
+    print(f"\n⏱️ {UNIVERSE} symbols x {len(ScanType)} scan types")
+    print(f"   per-symbol scans: {per_symbol_time:.3f}s")
+    print(f"   panel build:      {build_time:.3f}s")
+    print(f"   panel scans:      {scan_time:.3f}s")
+    print(f"🚀 Speedup: {per_symbol_time / scan_time:.0f}x")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    print("📊 Panel Screener Test")
+    print("=" * 50)
+    test_panel_matches_per_symbol_scans()
+    benchmark()
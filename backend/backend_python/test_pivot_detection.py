@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Pivot detection test script
+Checks PatternScanner's sliding-window pivot highs/lows against the original
+O(n*w) bar-by-bar comparison, including ties, NaNs and short series, and
+benchmarks both
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from analytics.pattern_scanner import PatternScanner
+
+
+def reference_pivots(data, window, kind):
+    """The original implementation: compare every bar with each neighbour in its window"""
+    pivots = []
+    for i in range(window, len(data) - window):
+        if kind == 'high':
+            hit = all(data.iloc[i] >= data.iloc[j] for j in range(i - window, i + window + 1) if j != i)
+        else:
+            hit = all(data.iloc[i] <= data.iloc[j] for j in range(i - window, i + window + 1) if j != i)
+        if hit:
+            pivots.append({'index': i, 'value': data.iloc[i]})
+    return pivots
+
+
+def make_series(bars, seed=0):
+    rng = np.random.default_rng(seed)
+    # Rounded to cents so neighbouring bars tie now and then
+    return pd.Series(np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.01, bars))), 2))
+
+
+def test_matches_reference():
+    scanner = PatternScanner()
+    cases = [make_series(500, seed) for seed in range(5)]
+    with_nans = make_series(300, 9)
+    with_nans.iloc[[0, 17, 150, 151, 299]] = np.nan
+    cases += [with_nans, pd.Series([5.0] * 30), make_series(7), make_series(11)]
+
+    checked = 0
+    for series in cases:
+        for window in (1, 2, 3, 5, 8, 13):
+            assert scanner._find_pivot_highs(series, window) == reference_pivots(series, window, 'high'), window
+            assert scanner._find_pivot_lows(series, window) == reference_pivots(series, window, 'low'), window
+            checked += 2
+    print(f"✅ {checked} pivot lists match the O(n*w) implementation (ties, NaNs, short series)")
+
+
+def benchmark():
+    scanner = PatternScanner()
+    series = make_series(5 * 252)
+    for window in (5, 20):
+        start_time = time.perf_counter()
+        reference_pivots(series, window, 'high')
+        reference_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        for _ in range(100):
+            scanner._find_pivot_highs(series, window)
+        sliding_time = (time.perf_counter() - start_time) / 100
+
+        print(f"⏱️ window {window:>2}: {reference_time * 1000:8.1f} ms -> {sliding_time * 1000:6.3f} ms "
+              f"({reference_time / sliding_time:.0f}x)")
+
+
+if __name__ == "__main__":
+    print("📍 Pivot Detection Test")
+    print("=" * 50)
+    test_matches_reference()
+    benchmark()
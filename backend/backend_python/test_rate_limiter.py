@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Rate limiter test script
+Checks that AsyncRateLimiter's token buckets allow bursts, never let
+concurrent callers exceed the per-second and per-minute budgets, and follow
+Retry-After / X-RateLimit-* feedback, including failing fast while a
+throttled provider cools down, and that SmartAPIManager routes around a
+slow upstream. Runs on a virtual clock.
+"""
+
+import asyncio
+import bisect
+import time
+
+from rate_limiter import AsyncRateLimiter, ProviderCoolingDown, SmartAPIManager
+
+
+class VirtualClock:
+    """Clock whose sleep advances time instantly"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+def max_in_window(timestamps, window):
+    """Largest number of timestamps inside any half-open window of the given length"""
+    timestamps = sorted(timestamps)
+    return max(bisect.bisect_left(timestamps, t + window) - i for i, t in enumerate(timestamps))
+
+
+async def test_burst_from_idle():
+    clock = VirtualClock()
+    limiter = AsyncRateLimiter('burst', per_minute=60, burst=10, clock=clock, sleep=clock.sleep)
+
+    start = clock()
+    for _ in range(10):
+        await limiter.acquire()
+    assert clock() == start, "a full burst should not wait"
+
+    await limiter.acquire()
+    assert clock() > start, "the request after the burst should wait for a refill"
+    print(f"✅ Burst of 10 admitted immediately, 11th waited {clock() - start:.2f}s")
+
+
+async def test_full_burst_stays_within_window():
+    """A burst as large as the limit must not let a full refill land in the same window"""
+    clock = VirtualClock()
+    limiter = AsyncRateLimiter('oversized', per_minute=60, burst=60, clock=clock, sleep=clock.sleep)
+    admitted = []
+    for _ in range(240):
+        await limiter.acquire()
+        admitted.append(clock())
+
+    worst_minute = max_in_window(admitted, 60)
+    assert admitted[59] == admitted[0], "the whole burst should go out at once"
+    assert worst_minute <= 60, f"{worst_minute} requests in one minute"
+    print(f"✅ burst=limit: 60 sent at once, max {worst_minute}/min (budget 60)")
+
+
+async def test_sustained_throughput_is_full_limit():
+    """Bursting must not cost sustained throughput: 600 requests at 60/min take ~10 minutes"""
+    clock = VirtualClock()
+    limiter = AsyncRateLimiter('sustained', per_minute=60, clock=clock, sleep=clock.sleep)
+    admitted = []
+    start = clock()
+    for _ in range(600):
+        await limiter.acquire()
+        admitted.append(clock())
+
+    elapsed = clock() - start
+    worst_minute = max_in_window(admitted, 60)
+    assert worst_minute <= 60, f"{worst_minute} requests in one minute"
+    assert elapsed <= 600, f"600 requests took {elapsed:.0f}s at 60/min"
+    print(f"✅ 600 requests at 60/min in {elapsed:.0f} virtual seconds ({600 / elapsed * 60:.0f}/min sustained)")
+
+
+async def test_concurrent_callers_stay_within_budget():
+    clock = VirtualClock()
+    per_minute, per_second = 120, 5
+    limiter = AsyncRateLimiter('concurrent', per_minute=per_minute, per_second=per_second,
+                               burst=30, clock=clock, sleep=clock.sleep)
+    admitted = []
+
+    async def caller():
+        await limiter.acquire()
+        admitted.append(clock())
+
+    start = clock()
+    await asyncio.gather(*(caller() for _ in range(600)))
+
+    assert len(admitted) == 600
+    worst_minute = max_in_window(admitted, 60)
+    worst_second = max_in_window(admitted, 1)
+    assert worst_minute <= per_minute, f"{worst_minute} requests in one minute"
+    assert worst_second <= per_second, f"{worst_second} requests in one second"
+    print(f"✅ 600 concurrent callers over {clock() - start:.0f} virtual seconds: "
+          f"max {worst_minute}/min (budget {per_minute}), max {worst_second}/s (budget {per_second})")
+
+
+async def test_retry_after_blocks_all_callers():
+    clock = VirtualClock()
+    limiter = AsyncRateLimiter('retry', per_minute=600, clock=clock, sleep=clock.sleep)
+
+    limiter.update_from_headers({'Retry-After': '30'}, 429)
+    start = clock()
+    await asyncio.gather(*(limiter.acquire() for _ in range(3)))
+    assert clock() - start >= 30, clock() - start
+    assert limiter.get_stats()['server_throttles'] == 1
+    print(f"✅ Retry-After: 30 held every caller for {clock() - start:.1f}s")
+
+
+async def test_ratelimit_headers():
+    clock = VirtualClock()
+    limiter = AsyncRateLimiter('headers', per_minute=100, burst=50, clock=clock, sleep=clock.sleep)
+
+    limiter.update_from_headers({'X-RateLimit-Remaining': '2'}, 200)
+    assert limiter.get_stats()['buckets']['minute']['available'] == 2
+
+    limiter.update_from_headers({'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '12'}, 200)
+    start = clock()
+    await limiter.acquire()
+    assert clock() - start >= 12, clock() - start
+
+    # Epoch-style reset values are converted against wall-clock time
+    limiter.update_from_headers({'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(int(time.time()) + 5)}, 200)
+    assert 3 <= limiter.get_stats()['blocked_for_seconds'] <= 6
+    print("✅ X-RateLimit-Remaining caps the bucket, Reset blocks until the window resets")
+
+
+async def test_cooldown_fails_fast():
+    clock = VirtualClock()
+    limiter = AsyncRateLimiter('cooldown', per_minute=600, clock=clock, sleep=clock.sleep)
+
+    limiter.update_from_headers({'Retry-After': '45'}, 429)
+    start = clock()
+    try:
+        await limiter.acquire(wait_for_cooldown=False)
+        assert False, "expected ProviderCoolingDown"
+    except ProviderCoolingDown as e:
+        assert e.retry_in == 45, e.retry_in
+    assert clock() == start, "a cooling provider must not be slept on"
+    assert limiter.get_stats()['cooldown_rejections'] == 1
+
+    clock.now += 45
+    assert not limiter.is_cooling_down()
+    await limiter.acquire(wait_for_cooldown=False)
+    print("✅ Cooling provider rejected without waiting, admitted again after Retry-After")
+
+
+def p95(samples):
+    return sorted(samples)[int(len(samples) * 0.95) - 1]
+
+
+async def test_adaptive_routing():
+    clock = VirtualClock()
+    manager = SmartAPIManager(clock=clock)
+    # Yahoo slows from 0.2s to 2s halfway through; Alpha Vantage stays at 0.4s
+    latency = {'yahoo_finance': 0.2, 'alpha_vantage': 0.4, 'twelve_data': 0.6}
+    manager.record_call('alpha_vantage', 0.4, True)
+    manager.record_call('twelve_data', 0.6, True)
+
+    static, adaptive = [], []
+    for i in range(400):
+        if i == 200:
+            latency['yahoo_finance'] = 2.0
+        static.append(latency['yahoo_finance'])
+        api = manager.get_best_api('stock_data')
+        adaptive.append(latency[api])
+        manager.record_call(api, latency[api], True)
+        clock.now += 1
+
+    assert manager.get_best_api('stock_data') == 'alpha_vantage'
+    assert p95(adaptive) < p95(static), (p95(adaptive), p95(static))
+    summary = manager.get_api_health_summary()
+    assert summary['routing']['stock_data'][0] == 'alpha_vantage' and summary['routing']['stock_data'][-1] == 'mock'
+    assert summary['scores']['yahoo_finance']['latency'] > summary['scores']['alpha_vantage']['latency']
+
+    # Errors and an idle estimate both move routing
+    for _ in range(5):
+        manager.record_call('alpha_vantage', 0.4, False)
+    assert manager.get_best_api('stock_data') != 'alpha_vantage'
+    clock.now += 3600
+    assert manager.score_api('yahoo_finance')['latency'] < 1.1, "stale estimates decay to the prior"
+    print(f"✅ Adaptive routing: p95 {p95(adaptive):.2f}s vs {p95(static):.2f}s with a static priority list")
+
+
+async def main():
+    await test_burst_from_idle()
+    await test_full_burst_stays_within_window()
+    await test_sustained_throughput_is_full_limit()
+    await test_concurrent_callers_stay_within_budget()
+    await test_retry_after_blocks_all_callers()
+    await test_ratelimit_headers()
+    await test_cooldown_fails_fast()
+    await test_adaptive_routing()
+
+
+if __name__ == "__main__":
+    print("🚦 Rate Limiter Test")
+    print("=" * 50)
+    asyncio.run(main())
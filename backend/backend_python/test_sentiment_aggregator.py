@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Sentiment aggregator test script
+Checks that SentimentAggregator gathers its sources concurrently, drops a
+source that misses its timeout or fails, keeps the last good value for the
+stale path instead of caching failures, and weights stale stand-ins down.
+"""
+
+import asyncio
+import time
+
+from sentiment_endpoints import SentimentAggregator
+
+
+def make_aggregator(news=0.4, social=0.2, fear_greed=-0.5, news_delay=0.0):
+    """Aggregator whose sources are stubs; set a score to None to make that source fail"""
+    aggregator = SentimentAggregator()
+    aggregator.components['news']['timeout'] = 0.2
+    scores = {'news': news, 'social': social, 'fear_greed': fear_greed}
+
+    async def get_news(symbols, timeframe):
+        await asyncio.sleep(news_delay)
+        return scores['news']
+
+    async def get_social(symbols):
+        return scores['social']
+
+    async def get_fear_greed():
+        return scores['fear_greed']
+
+    aggregator.get_news_sentiment = get_news
+    aggregator.get_social_sentiment = get_social
+    aggregator.get_fear_greed_index = get_fear_greed
+    return aggregator, scores
+
+
+def status(result, component):
+    return next(b['status'] for b in result['source_breakdown'] if b['source_name'] == component)
+
+
+async def test_late_source_is_dropped():
+    aggregator, _ = make_aggregator(news_delay=0.5)
+
+    start = time.perf_counter()
+    result = await aggregator.aggregate_sentiment(['btc'])
+    assert time.perf_counter() - start < 0.4, "a late source must not hold the response"
+    assert result['sources_missing'] == ['news'] and status(result, 'news') == 'missing', result
+    # Remaining weights are renormalised: (0.2 * 0.25 + 0 * 0.25 - 0.5 * 0.2) / 0.7
+    assert abs(result['overall_sentiment'] - (0.05 - 0.1) / 0.7) < 1e-9, result['overall_sentiment']
+
+    # The late fetch finishes in the background and serves the next request from cache
+    await asyncio.sleep(0.4)
+    result = await aggregator.aggregate_sentiment(['btc'])
+    assert status(result, 'news') == 'cached' and result['sentiment_sources']['news'] == 0.4, result
+    print("✅ Late source dropped at its timeout, then served from cache once it arrived")
+
+
+async def test_failure_is_not_cached():
+    aggregator, scores = make_aggregator(fear_greed=None)
+
+    result = await aggregator.aggregate_sentiment()
+    assert 'fear_greed_index' in result['sources_missing'], result
+    assert 'fear_greed_index' not in {key.split(':')[0] for key in aggregator.cache}, aggregator.cache
+    print("✅ Failed source reported missing and not cached")
+
+
+async def test_stale_value_stands_in_at_reduced_weight():
+    aggregator, scores = make_aggregator()
+    await aggregator.aggregate_sentiment()
+
+    # Expire fear & greed, then make its upstream fail
+    aggregator.cache['fear_greed_index']['fetched_at'] -= aggregator.components['fear_greed_index']['ttl'] + 1
+    scores['fear_greed'] = None
+    result = await aggregator.aggregate_sentiment()
+
+    assert status(result, 'fear_greed_index') == 'stale', result
+    assert result['sentiment_sources']['fear_greed_index'] == -0.5, "the last good value must survive"
+    assert result['source_ages']['fear_greed_index'] > aggregator.components['fear_greed_index']['ttl']
+    breakdown = {b['source_name']: b for b in result['source_breakdown']}
+    total = 0.3 + 0.25 + 0.25 + 0.2 * aggregator.stale_weight
+    assert abs(breakdown['fear_greed_index']['effective_weight'] - round(0.1 / total, 4)) < 1e-9, breakdown
+    assert result['data_freshness'] == 'stale'
+    print("✅ Failed refresh falls back to the last good value at reduced weight")
+
+
+async def test_cache_is_bounded():
+    aggregator, _ = make_aggregator()
+    aggregator.cache_max_entries = 6
+
+    for symbol in ['btc', 'eth', 'sol', 'ada']:
+        await aggregator.aggregate_sentiment([symbol])
+    assert len(aggregator.cache) == 6, list(aggregator.cache)
+    assert not any('BTC' in key.split(':') for key in aggregator.cache), "least recently used keys go first"
+
+    # A value past stale_max_age is dropped instead of standing in
+    aggregator.cache['fear_greed_index']['fetched_at'] -= aggregator.stale_max_age
+    aggregator.get_fear_greed_index = lambda: asyncio.sleep(0, None)
+    result = await aggregator.aggregate_sentiment(['ada'])
+    assert status(result, 'fear_greed_index') == 'missing', result
+    assert 'fear_greed_index' not in aggregator.cache
+    print("✅ Sentiment cache is LRU-bounded and drops values past stale_max_age")
+
+
+async def main():
+    await test_late_source_is_dropped()
+    await test_failure_is_not_cached()
+    await test_stale_value_stands_in_at_reduced_weight()
+    await test_cache_is_bounded()
+
+
+if __name__ == "__main__":
+    print("📰 Sentiment Aggregator Test")
+    print("=" * 50)
+    asyncio.run(main())
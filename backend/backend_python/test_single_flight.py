@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Single-flight test script
+Checks that SingleFlight runs one fetch per key for concurrent callers, that
+a cancelled caller leaves the shared fetch running, that background refreshes
+are deduplicated, and that SimpleCryptoProvider keeps its cached value when a
+revalidation fails
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from crypto_endpoints import SimpleCryptoProvider
+from single_flight import RefreshFailed, SingleFlight
+
+
+def counting_loader(delay=0.05, result="value"):
+    """Loader that sleeps, then returns `result` and counts its calls"""
+    calls = []
+
+    async def load(key):
+        calls.append(key)
+        await asyncio.sleep(delay)
+        return result
+
+    return load, calls
+
+
+async def test_concurrent_calls_share_one_fetch():
+    flight = SingleFlight("test")
+    load, calls = counting_loader()
+
+    results = await asyncio.gather(*(flight.do("BTC", load, "BTC") for _ in range(20)))
+    assert results == ["value"] * 20, results
+    assert calls == ["BTC"], calls
+    stats = flight.get_stats()
+    assert (stats['calls'], stats['upstream_fetches'], stats['coalesced_requests']) == (20, 1, 19), stats
+    assert flight.in_flight() == 0
+    print("✅ 20 concurrent do() calls made one loader call")
+
+
+async def test_cancelled_waiter_keeps_fetch_running():
+    flight = SingleFlight("test")
+    load, calls = counting_loader(delay=0.1)
+
+    first = asyncio.ensure_future(flight.do("BTC", load, "BTC"))
+    second = asyncio.ensure_future(flight.do("BTC", load, "BTC"))
+    await asyncio.sleep(0.02)
+    first.cancel()
+
+    assert await second == "value", "the remaining caller must still get the result"
+    assert first.cancelled()
+    assert calls == ["BTC"], calls
+    print("✅ Cancelling one waiter left the shared fetch running for the other")
+
+
+async def test_refresh_is_deduplicated():
+    flight = SingleFlight("test")
+    load, calls = counting_loader()
+
+    assert flight.refresh("BTC", load, "BTC") is True
+    assert flight.refresh("BTC", load, "BTC") is False, "a second refresh must join the running one"
+    assert await flight.do("BTC", load, "BTC") == "value", "do() joins the running refresh"
+    assert calls == ["BTC"], calls
+    assert flight.get_stats()['background_refreshes'] == 1
+
+    # Once finished the key is free again
+    assert flight.refresh("BTC", load, "BTC") is True
+    await asyncio.sleep(0.1)
+    assert calls == ["BTC", "BTC"], calls
+    print("✅ refresh() deduplicated against running fetches")
+
+
+async def test_failed_refresh_keeps_cached_value():
+    provider = SimpleCryptoProvider()
+    cached = {"status": "success", "data": {"symbol": "BTC", "price": 50000.0}, "timestamp": "t0"}
+    provider._cache_data("crypto_BTC", cached)
+    cached_at = provider.last_cache_time["crypto_BTC"]
+
+    async def upstream_down(symbol):
+        raise ConnectionError("upstream down")
+
+    provider._fetch_simple_crypto_data = upstream_down
+
+    # The refresher sees the failure...
+    try:
+        await provider.refresh_crypto("BTC")
+        raise AssertionError("a failed refresh must raise RefreshFailed")
+    except RefreshFailed:
+        pass
+    # ...and the cached answer is untouched rather than replaced by mock data
+    assert provider.cache["crypto_BTC"] is cached
+    assert provider.last_cache_time["crypto_BTC"] == cached_at
+
+    # Stale-while-revalidate: the stale value is served while a failing refresh runs behind it
+    provider.last_cache_time["crypto_BTC"] = datetime.now() - timedelta(seconds=provider.cache_ttl + 1)
+    result = await provider.get_crypto_data("BTC")
+    assert result["cache_status"] == "stale" and result["data"]["price"] == 50000.0, result
+    await asyncio.sleep(0.05)
+    assert provider.cache["crypto_BTC"] is cached, "the failed background refresh must not overwrite the cache"
+    assert provider.single_flight.get_stats()['errors'] == 2
+    print("✅ A failed refresh left the cached value in place")
+
+
+async def main():
+    await test_concurrent_calls_share_one_fetch()
+    await test_cancelled_waiter_keeps_fetch_running()
+    await test_refresh_is_deduplicated()
+    await test_failed_refresh_keeps_cached_value()
+
+
+if __name__ == "__main__":
+    print("🛫 Single-Flight Test")
+    print("=" * 50)
+    asyncio.run(main())
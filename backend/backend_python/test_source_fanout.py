@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Source fan-out test script
+Checks that SimplifiedDataProvider.get_comprehensive_stock_data queries its
+sources concurrently, cross-validates what answered by the deadline, reports
+late and never-started sources apart, and that get_multiple_stocks_data
+keeps at most max_parallel symbols in flight. Sources are stubbed.
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from simplified_multi_source import EnhancedCacheSystem, SimplifiedDataProvider
+
+FAST, SLOW = 0.05, 1.0
+
+
+class StubSources:
+    """Replaces every fetch_* method; records calls and symbols in flight"""
+
+    def __init__(self, provider, delays):
+        self.delays = delays
+        self.calls = []
+        self.active = {}
+        self.max_symbols = 0
+        self._lock = threading.Lock()
+        for source, method in provider._api_methods().items():
+            setattr(provider, method.__name__, self._fetch(source))
+
+    def _fetch(self, source):
+        def fetch(symbol):
+            with self._lock:
+                self.calls.append((source, symbol))
+                self.active[symbol] = self.active.get(symbol, 0) + 1
+                self.max_symbols = max(self.max_symbols, len(self.active))
+            time.sleep(self.delays.get(source, FAST))
+            with self._lock:
+                self.active[symbol] -= 1
+                if not self.active[symbol]:
+                    del self.active[symbol]
+            return {'symbol': symbol, 'current_price': 100.0, 'source': source}
+        return fetch
+
+
+def make_provider(tmp, delays, workers=16):
+    provider = SimplifiedDataProvider(EnhancedCacheSystem(os.path.join(tmp, "fanout.db")))
+    provider.fanout_workers = workers
+    return provider, StubSources(provider, delays)
+
+
+def test_deadline_cuts_off_slow_source():
+    with tempfile.TemporaryDirectory() as tmp:
+        provider, stubs = make_provider(tmp, {'yahoo': SLOW})
+        start = time.perf_counter()
+        result = provider.get_comprehensive_stock_data('AAPL', deadline=0.3)
+        elapsed = time.perf_counter() - start
+        provider.cache.close()
+
+    assert elapsed < 0.6, f"waited {elapsed:.2f}s past a 0.3s deadline"
+    assert result['sources_timed_out'] == ['yahoo'] and not result['sources_not_started'], result
+    # The best source that did answer becomes primary
+    assert result['primary_data']['source'] == 'alpha_vantage'
+    assert len(result['sources_used']) == len(provider.api_priority) - 1
+    print(f"✅ 9 sources in {elapsed * 1000:.0f} ms; slow yahoo cut off at the deadline, "
+          f"{len(result['sources_used'])} cross-validated")
+
+
+def test_queued_sources_reported_as_not_started():
+    with tempfile.TemporaryDirectory() as tmp:
+        provider, stubs = make_provider(tmp, {source: SLOW for source in ('yahoo', 'alpha_vantage')}, workers=2)
+        result = provider.get_comprehensive_stock_data('MSFT', deadline=0.3)
+        provider.cache.close()
+
+    # Two workers, both stuck on slow sources: the other seven never ran and were cancelled
+    assert result['sources_timed_out'] == ['yahoo', 'alpha_vantage'], result['sources_timed_out']
+    assert len(result['sources_not_started']) == 7 and result['summary']['not_started_sources'] == 7
+    assert {source for source, _ in stubs.calls} == {'yahoo', 'alpha_vantage'}, stubs.calls
+    print("✅ Sources still queued at the deadline are cancelled and reported as not started")
+
+
+def test_symbol_parallelism_is_bounded():
+    symbols = [f"SYM{i}" for i in range(10)]
+    with tempfile.TemporaryDirectory() as tmp:
+        provider, stubs = make_provider(tmp, {}, workers=64)
+        start = time.perf_counter()
+        results = provider.get_multiple_stocks_data(symbols, max_parallel=3)
+        elapsed = time.perf_counter() - start
+        provider.cache.close()
+
+    assert all(results[symbol]['primary_data'] for symbol in symbols)
+    assert stubs.max_symbols <= 3, stubs.max_symbols
+    assert len(stubs.calls) == len(symbols) * len(provider.api_priority)
+    print(f"✅ {len(symbols)} symbols with at most {stubs.max_symbols} in flight, {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    print("🌐 Source Fan-out Test")
+    print("=" * 50)
+    test_deadline_cuts_off_slow_source()
+    test_queued_sources_reported_as_not_started()
+    test_symbol_parallelism_is_bounded()